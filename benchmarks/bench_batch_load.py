@@ -0,0 +1,46 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Batch Load Benchmark
+
+Loads every character in a save directory one at a time and with
+load_characters at several thread counts.
+
+Usage: python benchmarks/bench_batch_load.py [save_count] [save_dir]
+
+Pass save_dir to benchmark a directory on slower or network storage,
+where the thread pool helps most.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+
+def run(count, save_directory):
+    chars = [character_manager.create_character(f"hero_{i}", "Warrior") for i in range(count)]
+    saved = character_manager.save_characters(chars, save_directory, workers=8)
+    print(f"{count} saves in {save_directory}")
+    print(f"  save_characters (8 threads): {saved['per_second']:10,.0f}/s")
+
+    names = [char["name"] for char in chars]
+    start = time.perf_counter()
+    for name in names:
+        character_manager.load_character(name, save_directory)
+    serial = count / (time.perf_counter() - start)
+    print(f"  load_character loop:         {serial:10,.0f}/s")
+
+    for workers in (1, 4, 8, 16, 32):
+        loaded = character_manager.load_characters(names, save_directory, workers)
+        print(f"  load_characters ({workers:2} threads): {loaded['per_second']:10,.0f}/s")
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    if len(sys.argv) > 2:
+        run(count, sys.argv[2])
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            run(count, workdir)
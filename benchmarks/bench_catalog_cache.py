@@ -0,0 +1,51 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Catalog Cache Benchmark
+
+Compares a cold start (parse and validate the text catalog, then write the
+compiled cache) with a warm start (load the compiled cache directly).
+
+Usage: python benchmarks/bench_catalog_cache.py [record_count]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_data
+from synthetic_data import write_quest_catalog, write_item_catalog
+
+def time_call(function, *args, **kwargs):
+    """Return (seconds, result) for a single call"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+def run(count):
+    """Benchmark cold and warm loads of count quests and count items"""
+    with tempfile.TemporaryDirectory() as workdir:
+        quest_file = os.path.join(workdir, "quests.txt")
+        item_file = os.path.join(workdir, "items.txt")
+        cache_dir = os.path.join(workdir, ".cache")
+
+        write_quest_catalog(quest_file, count)
+        write_item_catalog(item_file, count)
+
+        for label, loader, filename in (
+            ("quests", game_data.load_quests, quest_file),
+            ("items", game_data.load_items, item_file)
+        ):
+            cold, records = time_call(loader, filename, cache_dir=cache_dir)
+            warm, cached = time_call(loader, filename, cache_dir=cache_dir)
+            assert cached == records
+
+            print(f"{label}: {len(records)} records")
+            print(f"  cold start (parse + validate + write cache): {cold:.3f}s")
+            print(f"  warm start (cache hit):                     {warm:.3f}s")
+            print(f"  speedup: {cold / warm:.1f}x")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
@@ -0,0 +1,70 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Character Memory Benchmark
+
+Measures with tracemalloc how much memory many live characters hold as
+plain dictionaries versus slotted Character objects, and the cost of a
+key lookup on each. Characters share their lists between the two runs,
+so only the per-character container is compared. Like in main.py, each
+one has a reference to the item catalog.
+
+Usage: python benchmarks/bench_character_memory.py [character_count]
+"""
+
+import gc
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+
+def make_fields(count, seed=163):
+    """Build count character dictionaries as a loader would"""
+    rng = random.Random(seed)
+    catalog = {}
+    characters = []
+    for i in range(count):
+        fields = dict(character_manager.create_character(
+            f"hero_{i}", rng.choice(character_manager.CHARACTER_CLASSES)
+        ))
+        fields["level"] = rng.randint(1, 50)
+        fields["inventory"] = [f"item_{rng.randrange(1000)}" for _ in range(rng.randint(0, 5))]
+        fields["completed_quests"] = [f"quest_{rng.randrange(1000)}" for _ in range(rng.randint(0, 5))]
+        fields["equipped_weapon"] = None
+        fields["equipped_armor"] = None
+        fields["item_data"] = catalog
+        characters.append(fields)
+    return characters
+
+def retained_bytes(build, fields):
+    """Return the bytes still allocated by the characters build makes"""
+    gc.collect()
+    tracemalloc.start()
+    characters = build(fields)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del characters
+    return current
+
+def run(count):
+    """Compare count dictionary and Character characters"""
+    as_dicts = retained_bytes(lambda rows: [dict(row) for row in rows], make_fields(count))
+    as_objects = retained_bytes(lambda rows: [character_manager.Character(row) for row in rows],
+                                make_fields(count))
+    print(f"{count} characters")
+    print(f"  dict:       {as_dicts / 1e6:8.1f} MB ({as_dicts / count:.0f} B/character)")
+    print(f"  Character:  {as_objects / 1e6:8.1f} MB ({as_objects / count:.0f} B/character)")
+    print(f"  saved: {100 * (1 - as_objects / as_dicts):.0f}%")
+
+    row = make_fields(1)[0]
+    for label, char in (("dict", dict(row)), ("Character", character_manager.Character(row))):
+        seconds = timeit.timeit(lambda: char["gold"], number=1000000)
+        print(f"  {label:10} char['gold']: {seconds * 1000:.0f} ns")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
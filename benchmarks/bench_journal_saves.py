@@ -0,0 +1,77 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Journal Save Benchmark
+
+Plays the same sequence of small actions (gold, quests, items, damage)
+against full saves after every action and against JournalSaver, and
+reports bytes written per action and time per save.
+
+Usage: python benchmarks/bench_journal_saves.py [action_count]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+
+def make_character():
+    """A mid-game character with a realistic amount of history"""
+    char = character_manager.create_character("Journal", "Warrior")
+    char["level"] = 20
+    char["inventory"] = [f"item_{i}" for i in range(15)]
+    char["completed_quests"] = [f"quest_{i}" for i in range(120)]
+    char["equipped_weapon"] = "iron_sword"
+    return char
+
+def actions(count, seed=163):
+    """Yield functions that each make one small change to a character"""
+    rng = random.Random(seed)
+    choices = [
+        lambda c: character_manager.add_gold(c, rng.randint(1, 50)),
+        lambda c: character_manager.heal_character(c, 5),
+        lambda c: (c["completed_quests"].append(f"quest_{rng.randrange(10 ** 6)}"),
+                   character_manager.mark_dirty(c)),
+        lambda c: (c.__setitem__("inventory", c["inventory"][1:] + [f"item_{rng.randrange(1000)}"]),
+                   character_manager.mark_dirty(c)),
+    ]
+    for _ in range(count):
+        yield rng.choice(choices)
+
+def run(count):
+    with tempfile.TemporaryDirectory() as workdir:
+        full_dir = os.path.join(workdir, "full")
+        journal_dir = os.path.join(workdir, "journal")
+
+        char = make_character()
+        written = 0
+        start = time.perf_counter()
+        for action in actions(count):
+            action(char)
+            character_manager.save_character(char, full_dir)
+            written += os.path.getsize(character_manager.get_save_path("Journal", full_dir))
+        full_seconds = time.perf_counter() - start
+
+        char = make_character()
+        saver = character_manager.JournalSaver(journal_dir)
+        saver.save(char)
+        saver.bytes_written = 0
+        start = time.perf_counter()
+        for action in actions(count):
+            action(char)
+            saver.save(char)
+        journal_seconds = time.perf_counter() - start
+        stats = saver.stats()
+
+        print(f"{count} actions")
+        print(f"  full saves: {written / count:8.0f} B/action  {full_seconds / count * 1e6:8.1f} us/save")
+        print(f"  journal:    {stats['bytes_written'] / count:8.0f} B/action  "
+              f"{journal_seconds / count * 1e6:8.1f} us/save  ({stats['compactions']} compactions)")
+        print(f"  write amplification cut {written / stats['bytes_written']:.1f}x")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,53 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Record Memory Benchmark
+
+Measures with tracemalloc how much memory a loaded catalog holds when its
+values are plain dictionaries versus slotted Quest/Item records.
+
+Usage: python benchmarks/bench_record_memory.py [record_count]
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_data
+from synthetic_data import write_quest_catalog, write_item_catalog
+
+def retained_bytes(loader, filename, as_records):
+    """Return the bytes still allocated by a loaded catalog"""
+    gc.collect()
+    tracemalloc.start()
+    catalog = loader(filename, as_records=as_records)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del catalog
+    return current
+
+def run(count):
+    """Compare dictionary and record catalogs of count entries"""
+    with tempfile.TemporaryDirectory() as workdir:
+        quest_file = os.path.join(workdir, "quests.txt")
+        item_file = os.path.join(workdir, "items.txt")
+        write_quest_catalog(quest_file, count)
+        write_item_catalog(item_file, count)
+
+        for label, loader, filename in (
+            ("quests", game_data.load_quests, quest_file),
+            ("items", game_data.load_items, item_file)
+        ):
+            as_dicts = retained_bytes(loader, filename, False)
+            as_records = retained_bytes(loader, filename, True)
+            print(f"{label}: {count} records")
+            print(f"  dict values:   {as_dicts / 1e6:8.1f} MB ({as_dicts / count:.0f} B/record)")
+            print(f"  slot records:  {as_records / 1e6:8.1f} MB ({as_records / count:.0f} B/record)")
+            print(f"  saved: {100 * (1 - as_records / as_dicts):.0f}%")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
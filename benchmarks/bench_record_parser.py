@@ -0,0 +1,77 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Record Parser Benchmark
+
+Compares the original parse_*_block + validate_*_data pair with the
+single-pass parsers compiled from QUEST_SCHEMA and ITEM_SCHEMA. The item
+parser also parses effects, which the original pair never did, so that
+cost is timed on its own line and left out of the speedup.
+
+Usage: python benchmarks/bench_record_parser.py [record_count]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_data
+from synthetic_data import write_quest_catalog, write_item_catalog
+
+def read_blocks(filename):
+    """Read every block of a catalog into memory so only parsing is timed"""
+    return [lines for _, lines in game_data._iter_blocks(filename, "record")]
+
+def parse_then_validate(blocks, parse_block, validate):
+    """The original two-pass path"""
+    for lines in blocks:
+        record = parse_block(lines)
+        validate(record)
+
+def parse_compiled(blocks, parse_record):
+    """The schema-compiled single-pass path"""
+    for lines in blocks:
+        parse_record(lines)
+
+def best_of(repeats, function, *args):
+    """Return the fastest of several timed runs"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def run(count):
+    """Benchmark both parsers on count quests and count items"""
+    with tempfile.TemporaryDirectory() as workdir:
+        quest_file = os.path.join(workdir, "quests.txt")
+        item_file = os.path.join(workdir, "items.txt")
+        write_quest_catalog(quest_file, count)
+        write_item_catalog(item_file, count)
+
+        # Same work as parse_item_block + validate_item_data, no effects
+        parse_item_fields = game_data.compile_record_parser("item", game_data.ITEM_SCHEMA)
+        cases = (
+            ("quests", read_blocks(quest_file), game_data.parse_quest_block,
+             game_data.validate_quest_data, game_data._parse_quest_record, None),
+            ("items", read_blocks(item_file), game_data.parse_item_block,
+             game_data.validate_item_data, parse_item_fields, game_data._parse_item_record)
+        )
+
+        for label, blocks, parse_block, validate, parse_record, parse_derived in cases:
+            old = best_of(3, parse_then_validate, blocks, parse_block, validate)
+            new = best_of(3, parse_compiled, blocks, parse_record)
+            print(f"{label}: {len(blocks)} records")
+            print(f"  parse + validate:            {old:.3f}s")
+            print(f"  compiled schema:             {new:.3f}s")
+            print(f"  speedup: {old / new:.2f}x")
+            if parse_derived is not None:
+                derived = best_of(3, parse_compiled, blocks, parse_derived)
+                print(f"  compiled schema + effects:   {derived:.3f}s "
+                      f"(effects add {derived - new:.3f}s)")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,82 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Backend Benchmark
+
+Compares the file and SQLite save backends: populating the store,
+single saves, random loads, and a "level above 10" query.
+
+Usage: python benchmarks/bench_save_backends.py [character_count] [sample_count]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+
+CLASSES = ["Warrior", "Mage", "Rogue", "Cleric"]
+
+def make_characters(count, seed=163):
+    rng = random.Random(seed)
+    characters = []
+    for i in range(count):
+        char = character_manager.create_character(f"hero_{i}", CLASSES[i % 4])
+        char["level"] = rng.randint(1, 50)
+        char["gold"] = rng.randint(0, 100000)
+        char["completed_quests"] = [f"quest_{rng.randrange(1000)}" for _ in range(rng.randint(0, 10))]
+        characters.append(char)
+    return characters
+
+def populate(backend, characters):
+    """Fill the store as fast as the backend allows"""
+    if isinstance(backend, character_manager.SqliteSaveBackend):
+        for start in range(0, len(characters), 10000):
+            backend.write_many(
+                (char["name"], character_manager.encode_character(char),
+                 (char["class"], char["level"], char["gold"]))
+                for char in characters[start:start + 10000]
+            )
+    else:
+        character_manager.save_characters(characters, workers=8, backend=backend)
+
+def timed(label, count, function):
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    rate = f"{count / seconds:12,.0f}/s" if count else ""
+    print(f"  {label:22} {seconds:9.3f}s {rate}")
+    return result
+
+def run(count, samples):
+    characters = make_characters(count)
+    rng = random.Random(7)
+    sample = rng.sample(characters, min(samples, count))
+    print(f"{count} characters, {len(sample)} sampled operations")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        backends = (
+            ("file", character_manager.FileSaveBackend(os.path.join(workdir, "saves"))),
+            ("sqlite", character_manager.SqliteSaveBackend(os.path.join(workdir, "saves.db")))
+        )
+        for label, backend in backends:
+            print(label)
+            timed("populate", count, lambda: populate(backend, characters))
+            timed("save_character", len(sample), lambda: [
+                character_manager.save_character(char, backend=backend) for char in sample
+            ])
+            timed("load_character", len(sample), lambda: [
+                character_manager.load_character(char["name"], backend=backend) for char in sample
+            ])
+            found = timed("query level > 10", 0, lambda: backend.query(min_level=11))
+            timed("query again", 0, lambda: backend.query(min_level=11))
+            print(f"  {len(found)} characters above level 10")
+            backend.close()
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    run(count, samples)
@@ -0,0 +1,80 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Codec Benchmark
+
+Encodes and decodes characters drawn from synthetic catalogs in every save
+format, zlib with and without a preset dictionary built from the catalog
+ids, and reports bytes per save and microseconds per save and load.
+
+Usage: python benchmarks/bench_save_codecs.py [character_count] [catalog_size]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import game_data
+from synthetic_data import write_quest_catalog, write_item_catalog
+
+def make_characters(count, item_ids, quest_ids, seed=163):
+    """Build count characters holding items and quests from the catalogs"""
+    rng = random.Random(seed)
+    characters = []
+    for i in range(count):
+        char = character_manager.create_character(f"hero_{i}", rng.choice(character_manager.CHARACTER_CLASSES))
+        char["level"] = rng.randint(1, 50)
+        char["gold"] = rng.randint(0, 100000)
+        char["inventory"] = rng.sample(item_ids, rng.randint(0, 20))
+        char["active_quests"] = rng.sample(quest_ids, rng.randint(0, 3))
+        char["completed_quests"] = rng.sample(quest_ids, rng.randint(0, 30))
+        char["equipped_weapon"] = rng.choice([None] + item_ids[:10])
+        characters.append(char)
+    return characters
+
+def measure(label, save_format, characters):
+    start = time.perf_counter()
+    encoded = [character_manager.encode_character(char, save_format) for char in characters]
+    encode_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for data in encoded:
+        character_manager.decode_character(data)
+    decode_seconds = time.perf_counter() - start
+
+    count = len(characters)
+    size = sum(len(data) for data in encoded) / count
+    print(f"  {label:12} {size:6.0f} B/save  save {encode_seconds / count * 1e6:7.1f} us"
+          f"  load {decode_seconds / count * 1e6:7.1f} us")
+    return size
+
+def run(count, catalog_size):
+    """Benchmark every codec on count characters"""
+    with tempfile.TemporaryDirectory() as workdir:
+        quest_file = os.path.join(workdir, "quests.txt")
+        item_file = os.path.join(workdir, "items.txt")
+        write_quest_catalog(quest_file, catalog_size)
+        write_item_catalog(item_file, catalog_size)
+        quests = game_data.load_quests(quest_file)
+        items = game_data.load_items(item_file)
+    characters = make_characters(count, list(items), list(quests))
+    print(f"{count} characters, {catalog_size} items and quests")
+
+    text = measure("text", character_manager.SAVE_FORMAT_TEXT, characters)
+    measure("binary", character_manager.SAVE_FORMAT_BINARY, characters)
+    measure("zlib", character_manager.SAVE_FORMAT_ZLIB, characters)
+    character_manager.register_save_dictionary(
+        character_manager.build_save_dictionary(items, quests)
+    )
+    zlib_size = measure("zlib + dict", character_manager.SAVE_FORMAT_ZLIB, characters)
+    lzma_size = measure("lzma", character_manager.SAVE_FORMAT_LZMA, characters)
+    print(f"  zlib + dict is {100 * (1 - zlib_size / text):.0f}% smaller than text, "
+          f"lzma {100 * (1 - lzma_size / text):.0f}%")
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    catalog_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    run(count, catalog_size)
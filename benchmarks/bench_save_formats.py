@@ -0,0 +1,81 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Format Benchmark
+
+Saves and loads many characters in the text and binary save formats and
+reports throughput for each, both in memory (encode/decode only) and
+through save_character/load_character on disk.
+
+Usage: python benchmarks/bench_save_formats.py [character_count]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+
+CLASSES = ["Warrior", "Mage", "Rogue", "Cleric"]
+
+def make_characters(count, seed=163):
+    """Build count characters with a few items and quests each"""
+    rng = random.Random(seed)
+    characters = []
+    for i in range(count):
+        char = character_manager.create_character(f"hero_{i}", rng.choice(CLASSES))
+        char["level"] = rng.randint(1, 50)
+        char["experience"] = rng.randint(0, 5000)
+        char["gold"] = rng.randint(0, 100000)
+        char["inventory"] = [f"item_{rng.randrange(100000)}" for _ in range(rng.randint(0, 20))]
+        char["active_quests"] = [f"quest_{rng.randrange(100000)}" for _ in range(rng.randint(0, 3))]
+        char["completed_quests"] = [f"quest_{rng.randrange(100000)}" for _ in range(rng.randint(0, 30))]
+        char["equipped_weapon"] = rng.choice([None, "iron_sword"])
+        char["equipped_armor"] = None
+        characters.append(char)
+    return characters
+
+def rate(count, seconds):
+    return f"{count / seconds:>10,.0f}/s"
+
+def run(count):
+    """Benchmark both formats on count characters"""
+    characters = make_characters(count)
+    print(f"{count} characters")
+
+    codecs = (
+        ("text", lambda c: character_manager.serialize_character(c).encode("utf-8"),
+         lambda d: character_manager.deserialize_character(d.decode("utf-8").splitlines())),
+        ("binary", character_manager.serialize_character_binary,
+         character_manager.deserialize_character_binary)
+    )
+    for label, encode, decode in codecs:
+        start = time.perf_counter()
+        encoded = [encode(char) for char in characters]
+        encode_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        for data in encoded:
+            decode(data)
+        decode_seconds = time.perf_counter() - start
+        size = sum(len(data) for data in encoded) / count
+        print(f"  {label:6} in memory: encode {rate(count, encode_seconds)}"
+              f"  decode {rate(count, decode_seconds)}  {size:.0f} B/save")
+
+    for save_format in (character_manager.SAVE_FORMAT_TEXT, character_manager.SAVE_FORMAT_BINARY):
+        with tempfile.TemporaryDirectory() as workdir:
+            start = time.perf_counter()
+            for char in characters:
+                character_manager.save_character(char, workdir, save_format)
+            save_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            for char in characters:
+                character_manager.load_character(char["name"], workdir)
+            load_seconds = time.perf_counter() - start
+        print(f"  {save_format:6} on disk:   save   {rate(count, save_seconds)}"
+              f"  load   {rate(count, load_seconds)}")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,54 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Listing Benchmark
+
+Times getting the name, class and level of every save in a large save
+directory: by opening every save, by rebuilding the manifest, and by
+reading an up-to-date manifest (first read and cached).
+
+Usage: python benchmarks/bench_save_listing.py [save_count]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+
+CLASSES = ["Warrior", "Mage", "Rogue", "Cleric"]
+
+def write_saves(save_directory, count):
+    """Write count small text saves directly, without the manifest"""
+    for i in range(count):
+        char = character_manager.create_character(f"hero_{i}", CLASSES[i % 4])
+        char["level"] = 1 + i % 50
+        with open(character_manager.get_save_path(char["name"], save_directory), "wb") as f:
+            f.write(character_manager.encode_character(char))
+
+def open_every_save(save_directory):
+    """The old way: list the directory, then load each save"""
+    return [
+        character_manager.load_character(name, save_directory)["level"]
+        for name in character_manager._scan_save_names(save_directory)
+    ]
+
+def timed(label, function, *args):
+    start = time.perf_counter()
+    function(*args)
+    print(f"  {label:24} {time.perf_counter() - start:8.3f}s")
+
+def run(count):
+    with tempfile.TemporaryDirectory() as save_directory:
+        write_saves(save_directory, count)
+        print(f"{count} saves")
+        timed("open every save", open_every_save, save_directory)
+        timed("rebuild manifest", character_manager.rebuild_manifest, save_directory)
+        character_manager._manifest_cache.clear()
+        timed("read manifest", character_manager.list_saved_character_summaries, save_directory)
+        timed("read manifest (cached)", character_manager.list_saved_character_summaries, save_directory)
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
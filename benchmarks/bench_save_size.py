@@ -0,0 +1,63 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Size Benchmark
+
+Compares the old save writer, which wrote every character key including
+the item catalog attached as item_data, with the current save_character
+that writes only character-owned fields.
+
+Usage: python benchmarks/bench_save_size.py [item_count] [repeats]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import game_data
+from synthetic_data import write_item_catalog
+
+def legacy_save(character, save_directory):
+    """The old writer: every key, values written with their repr"""
+    filename = os.path.join(save_directory, f"{character['name']}_save.txt")
+    with open(filename, "w", encoding="utf-8") as f:
+        for key, value in character.items():
+            f.write(f"{key.upper()}: {value}\n")
+
+def time_saves(save, character, save_directory, repeats):
+    """Return average seconds per save and the size of the file written"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        save(character, save_directory)
+    seconds = (time.perf_counter() - start) / repeats
+    filename = os.path.join(save_directory, f"{character['name']}_save.txt")
+    return seconds, os.path.getsize(filename)
+
+def run(item_count, repeats):
+    """Save one character with an item_count catalog attached"""
+    with tempfile.TemporaryDirectory() as workdir:
+        item_file = os.path.join(workdir, "items.txt")
+        item_ids = write_item_catalog(item_file, item_count)
+
+        char = character_manager.create_character("Benchmark", "Warrior")
+        char["inventory"] = item_ids[:20]
+        char["completed_quests"] = [f"quest_{i}" for i in range(50)]
+        char["equipped_weapon"] = None
+        char["equipped_armor"] = None
+        char["item_data"] = game_data.load_items(item_file)
+
+        old_seconds, old_bytes = time_saves(legacy_save, char, workdir, repeats)
+        new_seconds, new_bytes = time_saves(character_manager.save_character, char, workdir, repeats)
+
+        print(f"catalog: {item_count} items, {repeats} saves each")
+        print(f"  all keys:        {old_bytes:>12,} bytes  {old_seconds * 1e3:9.3f} ms/save")
+        print(f"  character-owned: {new_bytes:>12,} bytes  {new_seconds * 1e3:9.3f} ms/save")
+        print(f"  smaller by {old_bytes / new_bytes:.0f}x, faster by {old_seconds / new_seconds:.0f}x")
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    run(count, repeats)
@@ -0,0 +1,45 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Verify Benchmark
+
+Checks every save in a directory with verify_saves at several process
+counts and reports saves and megabytes checked per second.
+
+Usage: python benchmarks/bench_verify_saves.py [save_count] [save_dir]
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+
+def run(count, save_directory):
+    chars = []
+    for i in range(count):
+        char = character_manager.create_character(f"hero_{i}", "Warrior")
+        char["inventory"] = [f"item_{j}" for j in range(i % 20)]
+        char["completed_quests"] = [f"quest_{j}" for j in range(i % 50)]
+        chars.append(char)
+    character_manager.save_characters(chars, save_directory, workers=8)
+
+    total_bytes = sum(
+        os.path.getsize(path) for path in character_manager._scan_saves(save_directory).values()
+    )
+    print(f"{count} saves, {total_bytes / 1e6:.1f} MB in {save_directory}")
+
+    for workers in (1, 2, 4, 8):
+        result = character_manager.verify_saves(save_directory, workers)
+        seconds = result["seconds"]
+        print(f"  {workers} processes: {count / seconds:10,.0f} saves/s "
+              f"{total_bytes / 1e6 / seconds:7.1f} MB/s")
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    if len(sys.argv) > 2:
+        run(count, sys.argv[2])
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            run(count, workdir)
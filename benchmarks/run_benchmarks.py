@@ -0,0 +1,179 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Benchmark Suite
+
+Times catalog loading and the main quest and inventory operations on
+synthetic catalogs of several sizes, records peak memory, and writes the
+results as JSON so runs on different commits can be compared.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--scales 1000,100000,1000000]
+                                        [--chain-depth 5] [--seed 163]
+                                        [--output results.json] [--no-memory]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import game_data
+import inventory_system
+import quest_handler
+from synthetic_data import write_quest_catalog, write_item_catalog
+
+# How many times each per-call operation is repeated
+OPERATION_REPEATS = 2000
+
+def measure(function, repeats=1, trace_memory=True):
+    """
+    Time function called repeats times, then rerun it under tracemalloc
+
+    Returns: Dictionary with seconds, per-call microseconds and peak bytes
+    """
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    seconds = time.perf_counter() - start
+
+    result = {
+        "seconds": round(seconds, 6),
+        "calls": repeats,
+        "per_call_us": round(seconds / repeats * 1e6, 3)
+    }
+
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        for _ in range(repeats):
+            function()
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return result
+
+def make_character(quest_ids, rng):
+    """Build a mid-game character that has finished some quests"""
+    char = character_manager.create_character("Benchmark", "Warrior")
+    char["level"] = 25
+    char["gold"] = 10 ** 9
+    char["completed_quests"] = rng.sample(quest_ids, min(50, len(quest_ids)))
+    return char
+
+def run_scale(scale, workdir, options):
+    """Run every benchmark for one catalog size"""
+    rng = random.Random(options.seed)
+    quest_file = os.path.join(workdir, f"quests_{scale}.txt")
+    item_file = os.path.join(workdir, f"items_{scale}.txt")
+    quest_ids = write_quest_catalog(quest_file, scale, options.chain_depth, options.seed)
+    write_item_catalog(item_file, scale, seed=options.seed)
+
+    results = {}
+    trace = options.memory
+
+    results["load_quests"] = measure(lambda: game_data.load_quests(quest_file), trace_memory=trace)
+    results["load_items"] = measure(lambda: game_data.load_items(item_file), trace_memory=trace)
+
+    quests = game_data.load_quests(quest_file)
+    items = game_data.load_items(item_file)
+    char = make_character(quest_ids, rng)
+
+    results["get_available_quests"] = measure(
+        lambda: quest_handler.get_available_quests(char, quests), trace_memory=trace
+    )
+
+    chain_ends = [rng.choice(quest_ids) for _ in range(OPERATION_REPEATS)]
+    chain_iter = iter(chain_ends * 2)
+    results["get_quest_prerequisite_chain"] = measure(
+        lambda: quest_handler.get_quest_prerequisite_chain(next(chain_iter), quests),
+        OPERATION_REPEATS, trace
+    )
+
+    item_ids = list(items)
+    purchase_ids = [rng.choice(item_ids) for _ in range(OPERATION_REPEATS)]
+    purchase_iter = iter(purchase_ids * 2)
+
+    def purchase():
+        if not inventory_system.get_inventory_space_remaining(char):
+            char["inventory"].clear()
+        item_id = next(purchase_iter)
+        inventory_system.purchase_item(char, item_id, items[item_id])
+
+    results["purchase_item"] = measure(purchase, OPERATION_REPEATS, trace)
+
+    consumables = [iid for iid in item_ids if items[iid]["type"] == "consumable"]
+    use_ids = [rng.choice(consumables) for _ in range(OPERATION_REPEATS)]
+    use_iter = iter(use_ids * 2)
+
+    def use():
+        item_id = next(use_iter)
+        char["inventory"].clear()
+        char["inventory"].append(item_id)
+        inventory_system.use_item(char, item_id, items[item_id])
+
+    results["use_item"] = measure(use, OPERATION_REPEATS, trace)
+
+    return results
+
+def git_commit():
+    """Get the current commit hash, or None outside a git checkout"""
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        )
+        return output.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def parse_arguments(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Quest Chronicles benchmarks")
+    parser.add_argument("--scales", default="1000,100000,1000000",
+                        help="comma-separated catalog sizes")
+    parser.add_argument("--chain-depth", type=int, default=5,
+                        help="quests per prerequisite chain")
+    parser.add_argument("--seed", type=int, default=163)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="skip the tracemalloc peak memory runs")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    options = parse_arguments(argv)
+    scales = [int(scale) for scale in options.scales.split(",")]
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": options.seed,
+        "chain_depth": options.chain_depth,
+        "scales": {}
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in scales:
+            print(f"Running scale {scale}...", file=sys.stderr)
+            report["scales"][str(scale)] = run_scale(scale, workdir, options)
+
+    text = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Synthetic Data Generator
+
+Writes large quest and item catalogs in the same text format as
+data/quests.txt and data/items.txt so the loaders can be benchmarked.
+Output is fully determined by the arguments and the seed.
+
+Usage: python benchmarks/synthetic_data.py quest_count item_count [output_dir]
+"""
+
+import os
+import random
+import sys
+
+ITEM_EFFECTS = {
+    "weapon": ["strength", "magic"],
+    "armor": ["max_health", "magic"],
+    "consumable": ["health", "strength", "magic"]
+}
+
+# Share of each item type when no mix is given
+DEFAULT_TYPE_MIX = {"weapon": 0.3, "armor": 0.3, "consumable": 0.4}
+
+def write_quest_catalog(filename, count, chain_depth=5, seed=163):
+    """
+    Write count quests to filename
+
+    Quests are grouped into prerequisite chains of chain_depth quests:
+    the first quest of a chain has no prerequisite and each later one
+    requires the quest before it. Required levels rise along a chain.
+
+    Returns: List of quest IDs written
+    """
+    rng = random.Random(seed)
+    chain_depth = max(1, chain_depth)
+    quest_ids = []
+
+    with open(filename, "w", encoding="utf-8") as f:
+        for i in range(count):
+            quest_id = f"quest_{i}"
+            step = i % chain_depth
+            prerequisite = quest_ids[-1] if step else "NONE"
+            f.write(
+                f"QUEST_ID: {quest_id}\n"
+                f"TITLE: Quest {i}\n"
+                f"DESCRIPTION: Synthetic quest number {i}\n"
+                f"REWARD_XP: {rng.randint(10, 500)}\n"
+                f"REWARD_GOLD: {rng.randint(5, 300)}\n"
+                f"REQUIRED_LEVEL: {min(50, 1 + step + rng.randint(0, 10))}\n"
+                f"PREREQUISITE: {prerequisite}\n\n"
+            )
+            quest_ids.append(quest_id)
+
+    return quest_ids
+
+def write_item_catalog(filename, count, type_mix=None, seed=163):
+    """
+    Write count items to filename
+
+    Args:
+        type_mix: Dictionary of {item_type: weight}, DEFAULT_TYPE_MIX if None
+
+    Returns: List of item IDs written
+    """
+    rng = random.Random(seed)
+    type_mix = type_mix or DEFAULT_TYPE_MIX
+    item_types = list(type_mix)
+    weights = [type_mix[item_type] for item_type in item_types]
+    item_ids = []
+
+    with open(filename, "w", encoding="utf-8") as f:
+        for i in range(count):
+            item_id = f"item_{i}"
+            item_type = rng.choices(item_types, weights)[0]
+            stat = rng.choice(ITEM_EFFECTS[item_type])
+            f.write(
+                f"ITEM_ID: {item_id}\n"
+                f"NAME: Item {i}\n"
+                f"TYPE: {item_type}\n"
+                f"EFFECT: {stat}:{rng.randint(1, 50)}\n"
+                f"COST: {rng.randint(1, 1000)}\n"
+                f"DESCRIPTION: Synthetic {item_type} number {i}\n\n"
+            )
+            item_ids.append(item_id)
+
+    return item_ids
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+
+    output_dir = sys.argv[3] if len(sys.argv) > 3 else "."
+    os.makedirs(output_dir, exist_ok=True)
+    write_quest_catalog(os.path.join(output_dir, "quests.txt"), int(sys.argv[1]))
+    write_item_catalog(os.path.join(output_dir, "items.txt"), int(sys.argv[2]))
@@ -9,7 +9,24 @@ AI Usage: used to check for errors
 This module handles character creation, loading, and saving.
 """
 
+import argparse
+import ast
+import hashlib
+import lzma
 import os
+import shutil
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import zlib
+import level_curve
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from custom_exceptions import (
     InvalidCharacterClassError,
     CharacterNotFoundError,
@@ -18,6 +35,20 @@ from custom_exceptions import (
     CharacterDeadError
 )
 
+# Save formats accepted by save_character
+SAVE_FORMAT_TEXT = "text"
+SAVE_FORMAT_BINARY = "binary"
+SAVE_FORMAT_ZLIB = "zlib"
+SAVE_FORMAT_LZMA = "lzma"
+
+# Classes create_character accepts
+CHARACTER_CLASSES = ("Warrior", "Mage", "Rogue", "Cleric")
+
+# Stat increases for every level gained
+LEVEL_UP_MAX_HEALTH = 10
+LEVEL_UP_STRENGTH = 2
+LEVEL_UP_MAGIC = 2
+
 # ============================================================================
 # CHARACTER MANAGEMENT FUNCTIONS
 # ============================================================================
@@ -28,7 +59,7 @@ def create_character(name, character_class):
     
     Valid classes: Warrior, Mage, Rogue, Cleric
     
-    Returns: Dictionary with character data including:
+    Returns: Character (used like a dictionary) with:
             - name, class, level, health, max_health, strength, magic
             - experience, gold, inventory, active_quests, completed_quests
     
@@ -50,7 +81,7 @@ def create_character(name, character_class):
 
     stats = valid_classes[character_class]
 
-    return {
+    return Character({
         "name": name,
         "class": character_class,
         "level": 1,
@@ -63,7 +94,7 @@ def create_character(name, character_class):
         "inventory": [],
         "active_quests": [],
         "completed_quests": []
-    }
+    })
 
     # Validate character_class first
     # Example base stats:
@@ -75,7 +106,8 @@ def create_character(name, character_class):
     # - level=1, experience=0, gold=100
     # - inventory=[], active_quests=[], completed_quests=[]
 
-def save_character(character, save_directory="data/save_games"):
+def save_character(character, save_directory="data/save_games", save_format=None,
+                   backend=None):
     """
     Save character to file
     
@@ -94,34 +126,51 @@ def save_character(character, save_directory="data/save_games"):
     INVENTORY: item1,item2,item3
     ACTIVE_QUESTS: quest1,quest2
     COMPLETED_QUESTS: quest1,quest2
+    EQUIPPED_WEAPON: item_id (empty if nothing equipped)
+    EQUIPPED_ARMOR: item_id (empty if nothing equipped)
+    
+    Only the fields in SAVE_FIELDS are written. Catalog data such as
+    item_data is left out, items and quests are saved by ID only.
+    
+    Args:
+        save_format: SAVE_FORMAT_TEXT for the format above,
+                     SAVE_FORMAT_BINARY for the packed binary format,
+                     SAVE_FORMAT_ZLIB or SAVE_FORMAT_LZMA for compressed
+                     binary, or None for the backend's save_format
+        backend: SaveBackend to store the save in, see get_save_backend
     
     Returns: True if successful
     Raises: PermissionError, IOError (let them propagate or handle)
     """
-    os.makedirs(save_directory, exist_ok=True)
-    filename = os.path.join(save_directory, f"{character['name']}_save.txt")
-
+    backend = get_save_backend(save_directory, backend)
+    contents = encode_character(character, save_format or backend.save_format)
+    revision = get_revision(character)
     try:
-        with open(filename, "w", encoding="utf-8") as f:
-            for key, value in character.items():
-                key_str = key.upper()  # required by tests
-                f.write(f"{key_str}: {value}\n")
-        return True
+        backend.write(character["name"], contents, _character_summary(character))
+    except SaveFileCorruptedError:
+        raise
     except Exception as e:
         raise SaveFileCorruptedError(str(e))
+
+    mark_saved(character, revision)
+    return True
     
     # TODO: Implement save functionality
     # Create save_directory if it doesn't exist
     # Handle any file I/O errors appropriately
     # Lists should be saved as comma-separated values
 
-def load_character(character_name, save_directory="data/save_games"):
+def load_character(character_name, save_directory="data/save_games", backend=None):
     """
     Load character from save file
     
     Args:
         character_name: Name of character to load
         save_directory: Directory containing save files
+        backend: SaveBackend to read from, see get_save_backend
+    
+    Text and binary saves are told apart by the binary magic bytes.
+    A journal left by JournalSaver is replayed over the save file.
     
     Returns: Character dictionary
     Raises: 
@@ -130,94 +179,41 @@ def load_character(character_name, save_directory="data/save_games"):
         InvalidSaveDataError if data format is wrong
     """
     # TODO: Implement load functionality
-    filename = os.path.join(save_directory, f"{character_name}_save.txt")
-
-    if not os.path.exists(filename):
-        raise CharacterNotFoundError(f"No save found for {character_name}.")
-
-    try:
-        with open(filename, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-    except Exception as e:
-        raise SaveFileCorruptedError(str(e))
-
-    data = {}
-
-    try:
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            if ": " not in line:
-                raise InvalidSaveDataError("Invalid line in save file.")
-
-            key, value = line.split(": ", 1)
-            key = key.strip().lower()
-            data[key] = value.strip()
-    except InvalidSaveDataError:
-        raise
-    except Exception as e:
-        raise SaveFileCorruptedError(str(e))
-
-    # Convert lists saved as strings
-    def parse_list(value):
-        return [] if value == "" else [x for x in value.split(",")]
-
-    character = {
-        "name": data["name"],
-        "class": data["class"],
-        "level": int(data["level"]),
-        "health": int(data["health"]),
-        "max_health": int(data["max_health"]),
-        "strength": int(data["strength"]),
-        "magic": int(data["magic"]),
-        "experience": int(data["experience"]),
-        "gold": int(data["gold"]),
-        "inventory": parse_list(data.get("inventory", "")),
-        "active_quests": parse_list(data.get("active_quests", "")),
-        "completed_quests": parse_list(data.get("completed_quests", ""))
-    }
-
+    backend = get_save_backend(save_directory, backend)
+    contents = backend.read(character_name)
+    character = decode_character(contents, backend)
+    if isinstance(backend, FileSaveBackend):
+        journal_path = get_journal_path(character_name, backend.save_directory)
+        replay_journal(character, read_journal(journal_path, contents)[0])
+    mark_saved(character)
     return character
 
-
-def list_saved_characters(save_directory="data/save_games"):
+def list_saved_characters(save_directory="data/save_games", backend=None):
     """
     Get list of all saved character names
     
+    Save files are listed from the directory's manifest, see
+    get_save_summaries.
+    
     Returns: List of character names (without _save.txt extension)
     """
     # TODO: Implement this function
-    if not os.path.exists(save_directory):
-        return []
-
-    entries = []
-    try:
-        for fn in os.listdir(save_directory):
-            if fn.endswith("_save.txt"):
-                entries.append(fn[:-9])  # remove "_save.txt"
-    except Exception:
-        # If directory can't be read, return empty list rather than crashing
-        return []
-
-    return entries
+    return get_save_backend(save_directory, backend).list_names()
     # Return empty list if directory doesn't exist
     # Extract character names from filenames
 
-def delete_character(character_name, save_directory="data/save_games"):
+def _scan_save_names(save_directory):
+    """List character names by scanning the save directory (either layout)"""
+    return list(_scan_saves(save_directory))
+
+def delete_character(character_name, save_directory="data/save_games", backend=None):
     """
     Delete a character's save file
     
     Returns: True if deleted successfully
     Raises: CharacterNotFoundError if character doesn't exist
     """
-    filename = os.path.join(save_directory, f"{character_name}_save.txt")
-
-    if not os.path.exists(filename):
-        raise CharacterNotFoundError(f"{character_name} does not exist.")
-
-    os.remove(filename)
+    get_save_backend(save_directory, backend).remove(character_name)
     return True
 
     # TODO: Implement character deletion
@@ -231,7 +227,8 @@ def gain_experience(character, xp_amount):
     """
     Add experience to character and handle level ups
     
-    Level up formula: level_up_xp = current_level * 100
+    Level up formula: level_up_xp = current_level * 100, or the curve set
+    for the character's class with level_curve.set_class_curve
     Example when leveling up:
     - Increase level by 1
     - Increase max_health by 10
@@ -239,25 +236,31 @@ def gain_experience(character, xp_amount):
     - Increase magic by 2
     - Restore health to max_health
     
+    Any number of levels gained at once are applied in one step.
+    
+    Returns: True if the character leveled up
     Raises: CharacterDeadError if character health is 0
     """
     if character["health"] <= 0:
         raise CharacterDeadError("Cannot gain XP while dead.")
 
     character["experience"] += xp_amount
+    mark_dirty(character)
 
-    leveled_up = False
-
-    while character["experience"] >= character["level"] * 100:
-        character["experience"] -= character["level"] * 100
-        character["level"] += 1
-        character["max_health"] += 10
-        character["strength"] += 2
-        character["magic"] += 2
-        character["health"] = character["max_health"]
-        leveled_up = True
+    level = character["level"]
+    curve = level_curve.get_class_curve(character["class"])
+    if character["experience"] < curve.xp_to_next(level):
+        return False
 
-    return leveled_up
+    total_xp = curve.threshold(level) + character["experience"]
+    new_level, character["experience"] = curve.level_for(total_xp)
+    gained = new_level - level
+    character["level"] = new_level
+    character["max_health"] += LEVEL_UP_MAX_HEALTH * gained
+    character["strength"] += LEVEL_UP_STRENGTH * gained
+    character["magic"] += LEVEL_UP_MAGIC * gained
+    character["health"] = character["max_health"]
+    return True
     # TODO: Implement experience gain and leveling
     # Check if character is dead first
     # Add experience
@@ -281,6 +284,7 @@ def add_gold(character, amount):
         raise ValueError("Gold cannot go negative.")
 
     character["gold"] = new_total
+    mark_dirty(character)
     return character["gold"]
 
     # TODO: Implement gold management
@@ -300,6 +304,7 @@ def heal_character(character, amount):
 
     original = character["health"]
     character["health"] = min(character["health"] + amount, character["max_health"])
+    mark_dirty(character)
     return character["health"] - original
 
     # TODO: Implement healing
@@ -326,57 +331,2592 @@ def revive_character(character):
         return False
     
     character["health"] = character["max_health"] // 2
+    mark_dirty(character)
 
     return True
     # TODO: Implement revival
     # Restore health to half of max_health
 
 # ============================================================================
-# VALIDATION
+# CHANGE TRACKING
 # ============================================================================
 
-def validate_character_data(character):
+# Revision counters. A Character keeps them in its revision and
+# saved_revision attributes, outside its keys, so they never show up in
+# the game data. Plain dictionaries, which have nowhere else to put them,
+# keep them under these keys (never written to save files).
+REVISION_KEY = "_revision"
+SAVED_REVISION_KEY = "_saved_revision"
+
+def get_revision(character):
+    """Get character's revision number, bumped by every mark_dirty"""
+    if isinstance(character, Character):
+        return character.revision
+    return character.get(REVISION_KEY, 0)
+
+def mark_dirty(character):
     """
-    Validate that character dictionary has all required fields
-    
-    Required fields: name, class, level, health, max_health, 
-                    strength, magic, experience, gold, inventory,
-                    active_quests, completed_quests
-    
-    Returns: True if valid
-    Raises: InvalidSaveDataError if missing fields or invalid types
+    Record that character changed since it was last saved
+
+    Every function that changes saved character state calls this.
+
+    Returns: The character's new revision number
     """
-    required = [
-        "name", "class", "level", "health", "max_health",
-        "strength", "magic", "experience", "gold",
-        "inventory", "active_quests", "completed_quests"
-    ]
+    if isinstance(character, Character):
+        character.revision += 1
+        return character.revision
+    revision = character.get(REVISION_KEY, 0) + 1
+    character[REVISION_KEY] = revision
+    return revision
 
-    for key in required:
-        if key not in character:
-            raise InvalidSaveDataError(f"Missing field: {key}")
+def mark_saved(character, revision=None):
+    """
+    Record that character's save file matches the given revision
 
-    for field in ["level", "health", "max_health", "strength", "magic", "experience", "gold"]:
-        if not isinstance(character[field], int):
-            raise InvalidSaveDataError(f"Field {field} must be an integer.")
+    Args:
+        revision: Revision that was written, the current one if None
+    """
+    if revision is None:
+        revision = get_revision(character)
+    if isinstance(character, Character):
+        character.saved_revision = revision
+    else:
+        character[SAVED_REVISION_KEY] = revision
 
-    for field in ["inventory", "active_quests", "completed_quests"]:
-        if not isinstance(character[field], list):
-            raise InvalidSaveDataError(f"Field {field} must be a list.")
+def is_dirty(character):
+    """
+    Check if character changed since it was last saved or loaded
+
+    Characters that were never saved or loaded count as dirty.
+
+    Returns: True if character needs saving
+    """
+    if isinstance(character, Character):
+        saved = character.saved_revision
+    else:
+        saved = character.get(SAVED_REVISION_KEY)
+    return saved is None or saved != get_revision(character)
+
+def autosave_character(character, save_directory="data/save_games", save_format=None):
+    """
+    Save character only if it changed since it was last saved
+
+    Returns: True if the file was written, False if nothing changed
+    Raises: SaveFileCorruptedError if the save fails
+    """
+    if not is_dirty(character):
+        return False
+    return save_character(character, save_directory, save_format)
+
+# ============================================================================
+# BACKGROUND SAVING
+# ============================================================================
+
+class SaveService:
+    """
+    Writes saves on a background thread
+
+    submit() encodes a snapshot of the character on the caller's thread and
+    queues the bytes. A writer thread stores them in the save backend and
+    marks the character saved at the revision it wrote. If a character is
+    submitted again before its last save was written, only the newest
+    snapshot is written.
+    """
+
+    def __init__(self, save_directory="data/save_games", save_format=None, backend=None):
+        """
+        Args:
+            save_format: Format to encode saves in, or None for the
+                         backend's save_format
+            backend: SaveBackend to write to, see get_save_backend
+        """
+        self.save_directory = save_directory
+        self.backend = get_save_backend(save_directory, backend)
+        self.save_format = save_format or self.backend.save_format
+        self._condition = threading.Condition()
+        self._pending = {}      # name -> (contents, summary, character, revision), oldest first
+        self._writing = False
+        self._closed = False
+        self._thread = None
+        self._errors = []
+
+        # Counters, see stats()
+        self.submitted = 0
+        self.coalesced = 0
+        self.writes = 0
+        self.max_queue_depth = 0
+        self.total_write_seconds = 0.0
+        self.max_write_seconds = 0.0
+
+    def submit(self, character):
+        """
+        Queue a save of character
+
+        The character stays dirty until the writer thread has written the
+        snapshot, and stays dirty if the write fails.
+
+        Returns: True if queued
+        Raises: SaveFileCorruptedError if the service has been shut down
+        """
+        contents = encode_character(character, self.save_format)
+        revision = get_revision(character)
+        name = character["name"]
+
+        with self._condition:
+            if self._closed:
+                raise SaveFileCorruptedError("Save service is shut down.")
+            if name in self._pending:
+                # Keep the queue position, replace the contents
+                self.coalesced += 1
+            self._pending[name] = (contents, _character_summary(character), character, revision)
+            self.submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, len(self._pending))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="save-writer", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify_all()
+        return True
+
+    def _run(self):
+        """Writer thread: write queued saves until shut down"""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                name = next(iter(self._pending))
+                contents, summary, character, revision = self._pending.pop(name)
+                self._writing = True
+
+            start = time.perf_counter()
+            try:
+                self.backend.write(name, contents, summary)
+                mark_saved(character, revision)
+                error = None
+            except Exception as e:
+                error = f"{name}: {e}"
+            seconds = time.perf_counter() - start
+
+            with self._condition:
+                self._writing = False
+                if error:
+                    self._errors.append(error)
+                else:
+                    self.writes += 1
+                    self.total_write_seconds += seconds
+                    self.max_write_seconds = max(self.max_write_seconds, seconds)
+                self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued save has been written
+
+        Returns: True if the queue drained, False on timeout
+        Raises: SaveFileCorruptedError if any write failed since the last flush
+        """
+        with self._condition:
+            drained = self._condition.wait_for(
+                lambda: not self._pending and not self._writing, timeout
+            )
+            errors, self._errors = self._errors, []
+        if errors:
+            raise SaveFileCorruptedError("Failed to save: " + "; ".join(errors))
+        return drained
+
+    def shutdown(self, timeout=None):
+        """
+        Write everything still queued and stop the writer thread
+
+        Returns: True if the queue drained, False on timeout
+        Raises: SaveFileCorruptedError if any write failed
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        try:
+            return self.flush(timeout)
+        finally:
+            if self._thread is not None:
+                self._thread.join(timeout)
+
+    def queue_depth(self):
+        """Get the number of saves waiting to be written"""
+        with self._condition:
+            return len(self._pending)
+
+    def stats(self):
+        """
+        Get the service counters
+
+        Returns: Dictionary with queue_depth, max_queue_depth, submitted,
+                 coalesced, writes, and average/max write latency in seconds
+        """
+        with self._condition:
+            return {
+                "queue_depth": len(self._pending),
+                "max_queue_depth": self.max_queue_depth,
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "writes": self.writes,
+                "avg_write_seconds": self.total_write_seconds / self.writes if self.writes else 0.0,
+                "max_write_seconds": self.max_write_seconds
+            }
+
+# ============================================================================
+# SAVE MANIFEST
+# ============================================================================
+
+# Append-only log in each save directory describing every save in it, so
+# listings don't have to open the saves. Lines are tab-separated:
+#   S  name  class  level  gold  mtime_ns  size     (character saved)
+#   D  name                                         (character deleted)
+MANIFEST_FILENAME = ".manifest"
+MANIFEST_HEADER = "QC-MANIFEST 1\n"
+
+# Rewrite the log once it holds this many more lines than characters
+MANIFEST_COMPACT_SLACK = 1000
+
+_manifest_lock = threading.Lock()
+_manifest_cache = {}    # manifest path -> (mtime_ns, size, summaries)
+
+# Save directory -> {"writers": changes in progress, "current": whether
+# the manifest was current before the first of them started}
+_manifest_changes = {}
+
+def get_manifest_path(save_directory="data/save_games"):
+    """Get the path of a save directory's manifest"""
+    return os.path.join(save_directory, MANIFEST_FILENAME)
+
+def _character_summary(character):
+    """The manifest fields taken from a character: class, level, gold"""
+    return (character["class"], character["level"], character["gold"])
+
+def is_manifest_current(save_directory="data/save_games"):
+    """
+    Check if the manifest exists and no save was added or removed since
+    it was last written
+
+    In the sharded layout only the top directory is checked, so saves
+    written there by other tools need an explicit rebuild_manifest.
+
+    Returns: True if the manifest can be trusted
+    """
+    try:
+        manifest_mtime = os.stat(get_manifest_path(save_directory)).st_mtime_ns
+        directory_mtime = os.stat(save_directory).st_mtime_ns
+    except OSError:
+        return False
+    return directory_mtime <= manifest_mtime
+
+def _format_manifest_entry(name, summary):
+    return "S\t{}\t{}\t{}\t{}\t{}\t{}\n".format(
+        name, summary["class"], summary["level"], summary["gold"],
+        summary["mtime"], summary["size"]
+    )
 
+def _read_manifest_lines(path):
+    """
+    Parse a manifest into {name: summary}
+
+    Returns: (summaries, line count), or None if the file is missing or bad
+    """
+    summaries = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.readline() != MANIFEST_HEADER:
+                return None
+            count = 0
+            for count, line in enumerate(f, start=1):
+                fields = line.rstrip("\n").split("\t")
+                if fields[0] == "S" and len(fields) == 7:
+                    summaries[fields[1]] = {
+                        "name": fields[1], "class": fields[2],
+                        "level": int(fields[3]), "gold": int(fields[4]),
+                        "mtime": int(fields[5]), "size": int(fields[6])
+                    }
+                elif fields[0] == "D" and len(fields) == 2:
+                    summaries.pop(fields[1], None)
+                elif line.endswith("\n"):
+                    return None
+                # else: last line torn by a crash mid-append, ignore it
+    except (OSError, ValueError, UnicodeDecodeError):
+        return None
+    return summaries, count
+
+def _write_manifest(save_directory, summaries):
+    """Replace the manifest with one entry per character"""
+    path = get_manifest_path(save_directory)
+    lines = [MANIFEST_HEADER]
+    lines.extend(_format_manifest_entry(name, summary) for name, summary in summaries.items())
+    write_save_file(path, "".join(lines).encode("utf-8"))
+    # Renaming touched the directory after the file, bring the file level
+    os.utime(path)
+
+def rebuild_manifest(save_directory="data/save_games"):
+    """
+    Rebuild the manifest by reading every save in the directory
+
+    Saves that can't be read are listed with an empty class and zero
+    level and gold.
+
+    Returns: Dictionary of {name: summary}
+    """
+    summaries = {}
+    backend = FileSaveBackend(save_directory)
+    for name, filename in _scan_saves(save_directory).items():
+        try:
+            with open(filename, "rb") as f:
+                contents = f.read()
+            stat = os.stat(filename)
+        except OSError:
+            continue
+        try:
+            character = decode_character(contents, backend)
+            journal_path = os.path.join(os.path.dirname(filename), f"{name}{JOURNAL_SUFFIX}")
+            replay_journal(character, read_journal(journal_path, contents)[0])
+            character_class, level, gold = _character_summary(character)
+        except (SaveFileCorruptedError, InvalidSaveDataError):
+            character_class, level, gold = "", 0, 0
+        summaries[name] = {
+            "name": name, "class": character_class, "level": level,
+            "gold": gold, "mtime": stat.st_mtime_ns, "size": stat.st_size
+        }
+
+    try:
+        with _manifest_lock:
+            _write_manifest(save_directory, summaries)
+    except OSError:
+        # Read-only save directory: the scan result is still good
+        pass
+    return summaries
+
+def get_save_summaries(save_directory="data/save_games"):
+    """
+    Get the manifest summaries of every saved character
+
+    Answers from the manifest, rebuilding it first if it is missing,
+    unreadable or older than the directory.
+
+    Returns: Dictionary of {name: {"name", "class", "level", "gold",
+             "mtime", "size"}}, copied so callers may change it
+    """
+    return {name: dict(summary) for name, summary in _get_save_summaries(save_directory).items()}
+
+def _get_save_summaries(save_directory):
+    """get_save_summaries without the copy, the result is shared with the cache"""
+    if not os.path.isdir(save_directory):
+        return {}
+
+    path = get_manifest_path(save_directory)
+    if is_manifest_current(save_directory):
+        stat = os.stat(path)
+        cached = _manifest_cache.get(path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
+        parsed = _read_manifest_lines(path)
+        if parsed is not None:
+            summaries, line_count = parsed
+            if line_count > len(summaries) + MANIFEST_COMPACT_SLACK:
+                try:
+                    with _manifest_lock:
+                        _write_manifest(save_directory, summaries)
+                    stat = os.stat(path)
+                except OSError:
+                    # Read-only save directory: keep using the long log
+                    pass
+            _manifest_cache[path] = (stat.st_mtime_ns, stat.st_size, summaries)
+            return summaries
+
+    summaries = rebuild_manifest(save_directory)
+    try:
+        stat = os.stat(path)
+        _manifest_cache[path] = (stat.st_mtime_ns, stat.st_size, summaries)
+    except OSError:
+        pass
+    return summaries
+
+@contextmanager
+def _manifest_change(save_directory):
+    """
+    Record changes made to a save directory inside the with block
+
+    Yields a list for the block to add manifest lines to, which are
+    appended when it ends. The manifest is checked once before the first
+    of several overlapping changes (from any thread) starts, so one
+    thread's save doesn't make the manifest look stale to another. If it
+    wasn't current it is removed so the next listing rebuilds it instead
+    of trusting a log with gaps, otherwise it is re-stamped even when no
+    lines were added.
+    """
+    key = os.path.abspath(save_directory)
+    with _manifest_lock:
+        change = _manifest_changes.get(key)
+        if change is None:
+            change = {"writers": 0, "current": is_manifest_current(save_directory)}
+            _manifest_changes[key] = change
+        change["writers"] += 1
+
+    lines = []
+    try:
+        yield lines
+    finally:
+        with _manifest_lock:
+            change["writers"] -= 1
+            if change["writers"] == 0:
+                del _manifest_changes[key]
+            path = get_manifest_path(save_directory)
+            try:
+                if not change["current"]:
+                    if os.path.exists(path):
+                        os.remove(path)
+                elif lines:
+                    with open(path, "a", encoding="utf-8") as f:
+                        f.write("".join(lines))
+                else:
+                    # Nothing to record (a journal append, say), but the
+                    # directory may have changed: keep the manifest current
+                    os.utime(path)
+            except OSError:
+                # Read-only or vanished manifest: the next listing rebuilds it
+                change["current"] = False
+
+def store_save(filename, contents, save_directory, name, summary):
+    """
+    Write a save file and record it in the manifest
+
+    Args:
+        summary: (class, level, gold) of the character being saved
+    """
+    with _manifest_change(save_directory) as manifest_lines:
+        directory = os.path.dirname(filename)
+        if directory != save_directory:
+            os.makedirs(directory, exist_ok=True)
+        write_save_file(filename, contents)
+        stat = os.stat(filename)
+
+        # The full save supersedes any journal written by JournalSaver
+        journal_path = os.path.join(directory, f"{name}{JOURNAL_SUFFIX}")
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
+
+        # A copy left in the other layout by a migration is now out of date
+        for layout in (SAVE_LAYOUT_FLAT, SAVE_LAYOUT_SHARDED):
+            stale = get_layout_path(name, save_directory, layout)
+            if stale != filename and os.path.exists(stale):
+                os.remove(stale)
+
+        character_class, level, gold = summary
+        manifest_lines.append(_format_manifest_entry(name, {
+            "class": character_class, "level": level, "gold": gold,
+            "mtime": stat.st_mtime_ns, "size": stat.st_size
+        }))
+
+def list_saved_character_summaries(save_directory="data/save_games", backend=None):
+    """
+    Get class, level and gold of every saved character without opening saves
+
+    Args:
+        backend: SaveBackend to list, see get_save_backend
+
+    Returns: List of summary dictionaries sorted by name
+    """
+    return get_save_backend(save_directory, backend).summaries()
+
+# ============================================================================
+# SAVE LAYOUT
+# ============================================================================
+
+# Flat: save_games/{name}_save.txt
+# Sharded: save_games/ab/cd/{name}_save.txt, where abcd is a hash of the name.
+# A directory is sharded when it holds a layout marker file saying so.
+SAVE_LAYOUT_FLAT = "flat"
+SAVE_LAYOUT_SHARDED = "sharded"
+LAYOUT_FILENAME = ".layout"
+SAVE_SUFFIX = "_save.txt"
+
+def get_save_layout(save_directory="data/save_games"):
+    """
+    Get the layout of a save directory
+
+    Returns: SAVE_LAYOUT_SHARDED if the marker says so, else SAVE_LAYOUT_FLAT
+    """
+    try:
+        with open(os.path.join(save_directory, LAYOUT_FILENAME), "r", encoding="utf-8") as f:
+            layout = f.read().strip()
+    except OSError:
+        return SAVE_LAYOUT_FLAT
+    return SAVE_LAYOUT_SHARDED if layout == SAVE_LAYOUT_SHARDED else SAVE_LAYOUT_FLAT
+
+def set_save_layout(save_directory, layout):
+    """
+    Set which layout new saves in save_directory are written in
+
+    This only writes the marker, use migrate_save_layout to move saves.
+    """
+    if layout not in (SAVE_LAYOUT_FLAT, SAVE_LAYOUT_SHARDED):
+        raise ValueError(f"Unknown save layout: {layout}")
+    os.makedirs(save_directory, exist_ok=True)
+    marker = os.path.join(save_directory, LAYOUT_FILENAME)
+    if layout == SAVE_LAYOUT_FLAT:
+        if os.path.exists(marker):
+            os.remove(marker)
+    else:
+        write_save_file(marker, f"{layout}\n".encode("utf-8"))
+
+def get_layout_path(character_name, save_directory, layout):
+    """Get where a character's save lives in the given layout"""
+    filename = f"{character_name}{SAVE_SUFFIX}"
+    if layout == SAVE_LAYOUT_SHARDED:
+        digest = hashlib.blake2b(character_name.encode("utf-8"), digest_size=2).hexdigest()
+        return os.path.join(save_directory, digest[:2], digest[2:], filename)
+    return os.path.join(save_directory, filename)
+
+def _other_layout(layout):
+    return SAVE_LAYOUT_FLAT if layout == SAVE_LAYOUT_SHARDED else SAVE_LAYOUT_SHARDED
+
+def get_save_path(character_name, save_directory="data/save_games"):
+    """Get the path a character's save is written to"""
+    return get_layout_path(character_name, save_directory, get_save_layout(save_directory))
+
+def find_save_path(character_name, save_directory="data/save_games"):
+    """
+    Get the path of a character's existing save in either layout
+
+    Saves not yet moved by a migration are found at their old path.
+
+    Returns: Path of the save, or the get_save_path path if there is none
+    """
+    layout = get_save_layout(save_directory)
+    filename = get_layout_path(character_name, save_directory, layout)
+    if not os.path.exists(filename):
+        other = get_layout_path(character_name, save_directory, _other_layout(layout))
+        if os.path.exists(other):
+            return other
+    return filename
+
+def _is_shard_name(name):
+    return len(name) == 2 and all(c in "0123456789abcdef" for c in name)
+
+def _scan_saves(save_directory):
+    """
+    Find every save in both layouts by scanning the directory
+
+    Returns: Dictionary of {character_name: path}, preferring the path in
+             the directory's current layout when a name is in both
+    """
+    found = {}
+    sharded = {}
+    try:
+        with os.scandir(save_directory) as top:
+            for entry in top:
+                if entry.name.endswith(SAVE_SUFFIX) and entry.is_file():
+                    found[entry.name[:-len(SAVE_SUFFIX)]] = entry.path
+                elif _is_shard_name(entry.name) and entry.is_dir():
+                    with os.scandir(entry.path) as middle:
+                        for shard in middle:
+                            if not (_is_shard_name(shard.name) and shard.is_dir()):
+                                continue
+                            for fn in os.listdir(shard.path):
+                                if fn.endswith(SAVE_SUFFIX):
+                                    sharded[fn[:-len(SAVE_SUFFIX)]] = os.path.join(shard.path, fn)
+    except OSError:
+        return {}
+
+    if get_save_layout(save_directory) == SAVE_LAYOUT_SHARDED:
+        found.update(sharded)
+    else:
+        for name, path in sharded.items():
+            found.setdefault(name, path)
+    return found
+
+def _move_save(name, source, save_directory, layout):
+    """
+    Move one save into layout
+
+    Returns: True if moved, False if a save already at the destination won
+    """
+    destination = get_layout_path(name, save_directory, layout)
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    if os.path.exists(destination):
+        # Written in the new layout during the migration, so it is newer
+        os.remove(source)
+        return False
+    os.replace(source, destination)
     return True
 
-    # TODO: Implement validation
-    # Check all required keys exist
-    # Check that numeric values are numbers
-    # Check that lists are actually lists
+def migrate_save_layout(save_directory, layout, workers=8):
+    """
+    Move every save in save_directory into layout
+
+    The marker is switched first so saves made during the migration
+    already go to the new layout, and saves not moved yet are still
+    found by find_save_path. Moves run on a thread pool.
+
+    Returns: Dictionary with moved, skipped and errors ({name: message})
+    """
+    set_save_layout(save_directory, layout)
+    moves = [
+        (name, path) for name, path in _scan_saves(save_directory).items()
+        if path != get_layout_path(name, save_directory, layout)
+    ]
 
+    result = {"moved": 0, "skipped": 0, "errors": {}}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(_move_save, name, path, save_directory, layout): name
+            for name, path in moves
+        }
+        for future, name in futures.items():
+            try:
+                if future.result():
+                    result["moved"] += 1
+                else:
+                    result["skipped"] += 1
+            except OSError as e:
+                result["errors"][name] = str(e)
+    return result
 
 # ============================================================================
-# TESTING
+# STORAGE BACKENDS
 # ============================================================================
 
-if __name__ == "__main__":
+class SaveBackend(ABC):
+    """
+    Where save_character, load_character, list_saved_characters and
+    delete_character keep saves
+
+    Backends store encoded save bytes, encoding and decoding stays in the
+    functions above so every backend supports every save format.
+    save_format is what save_character writes when not given a format.
+    """
+
+    save_format = SAVE_FORMAT_TEXT
+
+    @abstractmethod
+    def write(self, character_name, contents, summary):
+        """
+        Store a character's save
+
+        Args:
+            contents: Encoded save bytes
+            summary: (class, level, gold) of the character
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def read(self, character_name):
+        """
+        Get a character's save bytes
+
+        Raises: CharacterNotFoundError, SaveFileCorruptedError
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_names(self):
+        """Get the names of every saved character"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def remove(self, character_name):
+        """
+        Delete a character's save
+
+        Raises: CharacterNotFoundError if there is no save
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def query(self, min_level=None, character_class=None, min_gold=None):
+        """
+        Get names of saved characters matching every given condition
+
+        Returns: List of names sorted by name
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def summaries(self):
+        """
+        Get class, level and gold of every saved character
+
+        Returns: List of summary dictionaries (name, class, level, gold)
+                 sorted by name
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def write_dictionary(self, dictionary_id, dictionary):
+        """
+        Keep a zlib preset dictionary that saves written here refer to
+
+        write() calls this before storing a save that needs one, see
+        find_save_dictionary. Keeping a dictionary twice does nothing.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def read_dictionary(self, dictionary_id):
+        """
+        Get a dictionary kept with write_dictionary
+
+        Raises: SaveFileCorruptedError if it isn't kept here
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the backend"""
+
+class FileSaveBackend(SaveBackend):
+    """One save file per character in a save directory (the default)"""
+
+    def __init__(self, save_directory="data/save_games", save_format=SAVE_FORMAT_TEXT):
+        self.save_directory = save_directory
+        self.save_format = save_format
+
+    def write(self, character_name, contents, summary):
+        os.makedirs(self.save_directory, exist_ok=True)
+        dictionary = find_save_dictionary(contents)
+        if dictionary is not None:
+            self.write_dictionary(*dictionary)
+        filename = get_save_path(character_name, self.save_directory)
+        store_save(filename, contents, self.save_directory, character_name, summary)
+
+    def read(self, character_name):
+        filename = find_save_path(character_name, self.save_directory)
+        if not os.path.exists(filename):
+            raise CharacterNotFoundError(f"No save found for {character_name}.")
+        try:
+            with open(filename, "rb") as f:
+                return f.read()
+        except Exception as e:
+            raise SaveFileCorruptedError(str(e))
+
+    def list_names(self):
+        if not os.path.exists(self.save_directory):
+            return []
+        try:
+            return list(get_save_summaries(self.save_directory))
+        except OSError:
+            # Manifest can't be written here, fall back to scanning
+            return _scan_save_names(self.save_directory)
+
+    def remove(self, character_name):
+        filename = find_save_path(character_name, self.save_directory)
+        if not os.path.exists(filename):
+            raise CharacterNotFoundError(f"{character_name} does not exist.")
+
+        with _manifest_change(self.save_directory) as manifest_lines:
+            journal_path = get_journal_path(character_name, self.save_directory)
+            if os.path.exists(journal_path):
+                os.remove(journal_path)
+            os.remove(filename)
+            manifest_lines.append(f"D\t{character_name}\n")
+
+    def query(self, min_level=None, character_class=None, min_gold=None):
+        summaries = get_save_summaries(self.save_directory)
+        return sorted(
+            name for name, summary in summaries.items()
+            if (min_level is None or summary["level"] >= min_level)
+            and (character_class is None or summary["class"] == character_class)
+            and (min_gold is None or summary["gold"] >= min_gold)
+        )
+
+    def summaries(self):
+        try:
+            summaries = get_save_summaries(self.save_directory)
+        except OSError:
+            # Manifest can't be read or written here, fall back to scanning
+            summaries = rebuild_manifest(self.save_directory)
+        return [summaries[name] for name in sorted(summaries)]
+
+    def _dictionary_path(self, dictionary_id):
+        return os.path.join(
+            self.save_directory, SAVE_DICTIONARY_DIRECTORY,
+            f"{dictionary_id:08x}{SAVE_DICTIONARY_SUFFIX}"
+        )
+
+    def write_dictionary(self, dictionary_id, dictionary):
+        filename = self._dictionary_path(dictionary_id)
+        if os.path.exists(filename):
+            return
+        with _manifest_change(self.save_directory):
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            write_save_file(filename, dictionary)
+
+    def read_dictionary(self, dictionary_id):
+        try:
+            with open(self._dictionary_path(dictionary_id), "rb") as f:
+                return f.read()
+        except OSError:
+            raise SaveFileCorruptedError(
+                f"Save needs preset dictionary {dictionary_id:08x}, which is missing."
+            )
+
+class SqliteSaveBackend(SaveBackend):
+    """
+    Saves stored as rows of a SQLite database
+
+    The database runs in WAL mode so readers don't block the writer. Each
+    thread reuses its own connection, and the fixed SQL strings below are
+    kept prepared by sqlite3's statement cache. class, level and gold are
+    stored in indexed columns next to the encoded save for query(), and
+    preset dictionaries of zlib saves in their own table.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS characters ("
+        " name TEXT PRIMARY KEY, class TEXT NOT NULL, level INTEGER NOT NULL,"
+        " gold INTEGER NOT NULL, data BLOB NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS characters_level ON characters (level)",
+        "CREATE INDEX IF NOT EXISTS characters_class ON characters (class)",
+        "CREATE INDEX IF NOT EXISTS characters_gold ON characters (gold)",
+        "CREATE TABLE IF NOT EXISTS dictionaries (id INTEGER PRIMARY KEY, data BLOB NOT NULL)"
+    )
+    WRITE_SQL = "INSERT OR REPLACE INTO characters (name, class, level, gold, data) VALUES (?, ?, ?, ?, ?)"
+    READ_SQL = "SELECT data FROM characters WHERE name = ?"
+    LIST_SQL = "SELECT name FROM characters ORDER BY name"
+    SUMMARY_SQL = "SELECT name, class, level, gold FROM characters ORDER BY name"
+    DELETE_SQL = "DELETE FROM characters WHERE name = ?"
+    WRITE_DICTIONARY_SQL = "INSERT OR IGNORE INTO dictionaries (id, data) VALUES (?, ?)"
+    READ_DICTIONARY_SQL = "SELECT data FROM dictionaries WHERE id = ?"
+
+    def __init__(self, database_path="data/save_games.db", save_format=SAVE_FORMAT_TEXT):
+        self.database_path = database_path
+        self.save_format = save_format
+        self._local = threading.local()
+        self._connections = []
+        self._generation = 0    # bumped by close(), older connections are closed
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(database_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        with connection:
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+
+    def _connection(self):
+        """Get this thread's connection, opening it on first use or after close()"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.generation != self._generation:
+            try:
+                connection = sqlite3.connect(self.database_path, check_same_thread=False)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+            except sqlite3.Error as e:
+                raise SaveFileCorruptedError(f"Can't open {self.database_path}: {e}")
+            with self._lock:
+                self._connections.append(connection)
+                self._local.generation = self._generation
+            self._local.connection = connection
+        return connection
+
+    def write(self, character_name, contents, summary):
+        self.write_many([(character_name, contents, summary)])
+
+    def write_many(self, saves):
+        """
+        Store several saves in one transaction, all or none
+
+        Args:
+            saves: Iterable of (character_name, contents, summary)
+        """
+        rows = []
+        dictionaries = {}
+        for name, contents, summary in saves:
+            rows.append((name, summary[0], summary[1], summary[2], contents))
+            dictionary = find_save_dictionary(contents)
+            if dictionary is not None:
+                dictionaries[dictionary[0]] = dictionary[1]
+        connection = self._connection()
+        try:
+            with connection:
+                # Same transaction, so no save is stored without its dictionary
+                connection.executemany(self.WRITE_DICTIONARY_SQL, dictionaries.items())
+                connection.executemany(self.WRITE_SQL, rows)
+        except sqlite3.Error as e:
+            raise SaveFileCorruptedError(str(e))
+
+    def read(self, character_name):
+        try:
+            row = self._connection().execute(self.READ_SQL, (character_name,)).fetchone()
+        except sqlite3.Error as e:
+            raise SaveFileCorruptedError(str(e))
+        if row is None:
+            raise CharacterNotFoundError(f"No save found for {character_name}.")
+        return bytes(row[0])
+
+    def list_names(self):
+        try:
+            return [row[0] for row in self._connection().execute(self.LIST_SQL)]
+        except sqlite3.Error as e:
+            raise SaveFileCorruptedError(str(e))
+
+    def remove(self, character_name):
+        connection = self._connection()
+        try:
+            with connection:
+                deleted = connection.execute(self.DELETE_SQL, (character_name,)).rowcount
+        except sqlite3.Error as e:
+            raise SaveFileCorruptedError(str(e))
+        if not deleted:
+            raise CharacterNotFoundError(f"{character_name} does not exist.")
+
+    def query(self, min_level=None, character_class=None, min_gold=None):
+        conditions = []
+        parameters = []
+        for column, operator, value in (
+            ("level", ">=", min_level), ("class", "=", character_class), ("gold", ">=", min_gold)
+        ):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                parameters.append(value)
+        sql = "SELECT name FROM characters"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        try:
+            return [row[0] for row in self._connection().execute(sql + " ORDER BY name", parameters)]
+        except sqlite3.Error as e:
+            raise SaveFileCorruptedError(str(e))
+
+    def summaries(self):
+        try:
+            rows = self._connection().execute(self.SUMMARY_SQL).fetchall()
+        except sqlite3.Error as e:
+            raise SaveFileCorruptedError(str(e))
+        return [
+            {"name": name, "class": character_class, "level": level, "gold": gold}
+            for name, character_class, level, gold in rows
+        ]
+
+    def write_dictionary(self, dictionary_id, dictionary):
+        connection = self._connection()
+        try:
+            with connection:
+                connection.execute(self.WRITE_DICTIONARY_SQL, (dictionary_id, dictionary))
+        except sqlite3.Error as e:
+            raise SaveFileCorruptedError(str(e))
+
+    def read_dictionary(self, dictionary_id):
+        try:
+            row = self._connection().execute(self.READ_DICTIONARY_SQL, (dictionary_id,)).fetchone()
+        except sqlite3.Error as e:
+            raise SaveFileCorruptedError(str(e))
+        if row is None:
+            raise SaveFileCorruptedError(
+                f"Save needs preset dictionary {dictionary_id:08x}, which is missing."
+            )
+        return bytes(row[0])
+
+    def close(self):
+        """
+        Close the connections of every thread
+
+        Threads still holding a closed connection open a new one on their
+        next call, the backend stays usable.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for connection in connections:
+            connection.close()
+
+# Used by the save functions when they aren't given a backend
+_save_backend = None
+
+def set_save_backend(backend):
+    """
+    Set the backend used when save functions aren't given one
+
+    Args:
+        backend: A SaveBackend, or None to go back to save files in
+                 the save_directory each call passes
+    """
+    global _save_backend
+    _save_backend = backend
+
+def get_save_backend(save_directory="data/save_games", backend=None):
+    """
+    Get the backend a save function call should use
+
+    Returns: backend if given, else the one set with set_save_backend,
+             else a FileSaveBackend for save_directory
+    """
+    if backend is not None:
+        return backend
+    if _save_backend is not None:
+        return _save_backend
+    return FileSaveBackend(save_directory)
+
+# ============================================================================
+# BATCH OPERATIONS
+# ============================================================================
+
+# Errors a batch records per character instead of failing the whole batch
+BATCH_ERRORS = (CharacterNotFoundError, SaveFileCorruptedError, InvalidSaveDataError)
+
+# Most characters handed to a batch thread at once
+BATCH_CHUNK_SIZE = 256
+
+def _run_batch(function, jobs, workers):
+    """
+    Run function(argument) for every (key, argument) in jobs on a thread pool
+
+    Jobs are handed out in chunks so the pool overhead stays small next
+    to the file I/O.
+
+    Returns: Dictionary with results, errors, count, seconds and per_second
+    """
+    def run_chunk(chunk):
+        outcomes = []
+        for key, argument in chunk:
+            try:
+                outcomes.append((key, True, function(argument)))
+            except BATCH_ERRORS as e:
+                outcomes.append((key, False, e))
+        return outcomes
+
+    results = {}
+    errors = {}
+    workers = max(1, workers)
+    chunk_size = max(1, min(BATCH_CHUNK_SIZE, len(jobs) // (workers * 4)))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+        for outcomes in pool.map(run_chunk, chunks):
+            for key, ok, value in outcomes:
+                if ok:
+                    results[key] = value
+                else:
+                    errors[key] = value
+    seconds = time.perf_counter() - start
+
+    return {
+        "results": results,
+        "errors": errors,
+        "count": len(jobs),
+        "seconds": seconds,
+        "per_second": len(jobs) / seconds if seconds else 0.0
+    }
+
+def load_characters(names, save_directory="data/save_games", workers=8, backend=None):
+    """
+    Load many characters, reading the files on a thread pool
+
+    Args:
+        names: Character names to load
+        workers: Number of threads
+
+    Returns: Dictionary with:
+        results: {name: character} for every character that loaded
+        errors: {name: exception} for CharacterNotFoundError,
+                SaveFileCorruptedError and InvalidSaveDataError
+        count, seconds, per_second: batch size and throughput
+    """
+    return _run_batch(
+        lambda name: load_character(name, save_directory, backend),
+        [(name, name) for name in names], workers
+    )
+
+def save_characters(characters, save_directory="data/save_games", workers=8,
+                    save_format=None, backend=None):
+    """
+    Save many characters, writing the files on a thread pool
+
+    Returns: Dictionary like load_characters, with results {name: True}
+    """
+    return _run_batch(
+        lambda character: save_character(character, save_directory, save_format, backend),
+        [(character["name"], character) for character in characters], workers
+    )
+
+# ============================================================================
+# CHARACTER CACHE
+# ============================================================================
+
+def estimate_character_bytes(character):
+    """Estimate the memory a character dictionary holds"""
+    total = sys.getsizeof(character)
+    for key, value in character.items():
+        total += sys.getsizeof(key) + sys.getsizeof(value)
+        if isinstance(value, list):
+            total += sum(sys.getsizeof(item) for item in value)
+    return total
+
+class CharacterCache:
+    """
+    In-process LRU cache of loaded characters
+
+    get() checks the save file's mtime and size on every call and reloads
+    characters whose file changed underneath a clean entry. Characters
+    changed by the caller (see is_dirty) are written back when they are
+    evicted or on flush(). The cache is bounded by entry count and,
+    optionally, by the estimated bytes of its characters.
+
+    Entries are validated against save files, so the cache only works
+    with a FileSaveBackend.
+    """
+
+    def __init__(self, save_directory="data/save_games", max_entries=1000,
+                 max_bytes=None, save_format=SAVE_FORMAT_TEXT, backend=None):
+        """
+        Args:
+            backend: FileSaveBackend to cache, see get_save_backend
+
+        Raises: ValueError if the backend doesn't keep save files
+        """
+        backend = get_save_backend(save_directory, backend)
+        if not isinstance(backend, FileSaveBackend):
+            raise ValueError(
+                f"CharacterCache needs save files, not a {type(backend).__name__}"
+            )
+        self.backend = backend
+        self.save_directory = backend.save_directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.save_format = save_format
+        self._entries = OrderedDict()   # name -> [character, mtime_ns, size, bytes]
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        # Counters, see stats()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evictions = 0
+        self.write_backs = 0
+
+    def get(self, character_name):
+        """
+        Get a character, loading it on a miss
+
+        Returns: Character dictionary, shared with later get() calls
+        Raises: Same as load_character
+        """
+        with self._lock:
+            entry = self._entries.get(character_name)
+            if entry is not None:
+                if is_dirty(entry[0]) or self._file_matches(character_name, entry):
+                    self.hits += 1
+                    self._entries.move_to_end(character_name)
+                    return entry[0]
+                # Changed on disk and nothing to keep here: load again
+                self.reloads += 1
+                self._remove(character_name)
+
+            self.misses += 1
+            filename = find_save_path(character_name, self.save_directory)
+            character = load_character(character_name, self.save_directory, self.backend)
+            self._insert(character, os.stat(filename))
+            return character
+
+    def put(self, character):
+        """
+        Add or replace a character, written back on eviction or flush
+        if it has unsaved changes
+        """
+        with self._lock:
+            name = character["name"]
+            if name in self._entries:
+                self._remove(name)
+            filename = find_save_path(name, self.save_directory)
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                stat = None
+            self._insert(character, stat)
+
+    def flush(self):
+        """
+        Write back every character with unsaved changes
+
+        Returns: Number of characters written
+        """
+        written = 0
+        with self._lock:
+            for name, entry in self._entries.items():
+                if is_dirty(entry[0]):
+                    self._write_back(entry)
+                    written += 1
+        return written
+
+    def invalidate(self, character_name):
+        """Drop a character without writing it back"""
+        with self._lock:
+            if character_name in self._entries:
+                self._remove(character_name)
+
+    def clear(self):
+        """Write back unsaved changes, then empty the cache"""
+        with self._lock:
+            self.flush()
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, character_name):
+        return character_name in self._entries
+
+    def stats(self):
+        """
+        Get the cache counters
+
+        Returns: Dictionary with entries, bytes, hits, misses, reloads,
+                 evictions, write_backs and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "evictions": self.evictions,
+                "write_backs": self.write_backs,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def _file_matches(self, character_name, entry):
+        """Check the save file still has the mtime and size cached with entry"""
+        try:
+            stat = os.stat(find_save_path(character_name, self.save_directory))
+        except OSError:
+            return False
+        return (stat.st_mtime_ns, stat.st_size) == (entry[1], entry[2])
+
+    def _insert(self, character, stat):
+        size = estimate_character_bytes(character)
+        if stat is None:
+            entry = [character, None, None, size]
+        else:
+            entry = [character, stat.st_mtime_ns, stat.st_size, size]
+        self._entries[character["name"]] = entry
+        self._bytes += size
+        self._evict()
+
+    def _remove(self, character_name):
+        entry = self._entries.pop(character_name)
+        self._bytes -= entry[3]
+        return entry
+
+    def _evict(self):
+        """Drop least recently used entries until within both limits"""
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            name = next(iter(self._entries))
+            entry = self._entries[name]
+            if is_dirty(entry[0]):
+                # Written before removal so a failed write loses nothing
+                self._write_back(entry)
+            self._remove(name)
+            self.evictions += 1
+
+    def _write_back(self, entry):
+        character = entry[0]
+        save_character(character, self.save_directory, self.save_format, self.backend)
+        stat = os.stat(find_save_path(character["name"], self.save_directory))
+        entry[1], entry[2] = stat.st_mtime_ns, stat.st_size
+        self.write_backs += 1
+
+# ============================================================================
+# JOURNAL SAVES
+# ============================================================================
+
+# A journal sits next to a character's save file as {name}.journal.
+# Records are framed as: payload length, crc32 of payload (both unsigned
+# 32-bit little-endian), payload. The first record is "SNAPSHOT: crc32"
+# of the save file the journal applies to, so a journal left behind by a
+# crash after a full save is recognised as stale and ignored. Each later
+# record holds the save file lines of the fields that changed. A list that
+# only grew is written as "FIELD+: new,items" instead of the whole list.
+JOURNAL_SUFFIX = ".journal"
+_JOURNAL_RECORD = struct.Struct("<II")
+
+def get_journal_path(character_name, save_directory="data/save_games"):
+    """Get the path of a character's journal, next to its save file"""
+    directory = os.path.dirname(find_save_path(character_name, save_directory))
+    return os.path.join(directory, f"{character_name}{JOURNAL_SUFFIX}")
+
+def _journal_record(text):
+    payload = text.encode("utf-8")
+    return _JOURNAL_RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+
+def read_journal(journal_path, snapshot):
+    """
+    Read every intact record of a journal written for a save file
+
+    Reading stops at the first record that is cut short or fails its
+    checksum, which is what a crash during an append leaves behind.
+
+    Args:
+        snapshot: Bytes of the save file the journal should apply to
+
+    Returns: (list of {field: raw value} dictionaries, bytes of intact
+             records). Both are empty if the journal is for another snapshot.
+    """
+    try:
+        with open(journal_path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return [], 0
+    except OSError as e:
+        raise SaveFileCorruptedError(str(e))
+
+    records = []
+    offset = 0
+    while offset + _JOURNAL_RECORD.size <= len(data):
+        length, checksum = _JOURNAL_RECORD.unpack_from(data, offset)
+        start = offset + _JOURNAL_RECORD.size
+        payload = data[start:start + length]
+        if len(payload) != length or zlib.crc32(payload) != checksum:
+            break
+        try:
+            records.append(_read_save_lines(payload.decode("utf-8").splitlines()))
+        except (UnicodeDecodeError, InvalidSaveDataError):
+            break
+        offset = start + length
+
+    if not records or records[0].get("snapshot") != str(zlib.crc32(snapshot)):
+        return [], 0
+    return records[1:], offset
+
+def replay_journal(character, records):
+    """Apply journal records to a character loaded from its save file"""
+    for record in records:
+        for field, value in record.items():
+            if field.endswith("+") and field[:-1] in LIST_FIELDS:
+                character[field[:-1]].extend(_parse_save_list(value))
+            elif field in SAVE_FIELDS and field != "name":
+                character[field] = _parse_save_value(field, value)
+    return character
+
+def _journal_line(field, old_line, new_line):
+    """The journal line for a changed field, an append for grown lists"""
+    if field in LIST_FIELDS and old_line is not None:
+        prefix_length = len(field) + 2
+        old_value = old_line[prefix_length:-1]
+        new_value = new_line[prefix_length:-1]
+        if not old_value:
+            return f"{field.upper()}+: {new_value}\n"
+        if new_value.startswith(old_value + ","):
+            return f"{field.upper()}+: {new_value[len(old_value) + 1:]}\n"
+    return new_line
+
+class JournalSaver:
+    """
+    Saves characters by appending the fields that changed to a journal
+
+    The first save of a character this saver hasn't loaded or saved
+    writes a full save file. Later saves append one small record with the
+    changed fields. After max_records records or max_bytes of journal the
+    state is folded into a new save file and the journal removed.
+    load_character replays journals, so characters saved here load
+    normally everywhere.
+    """
+
+    def __init__(self, save_directory="data/save_games", max_records=64,
+                 max_bytes=64 * 1024, save_format=SAVE_FORMAT_TEXT):
+        self.save_directory = save_directory
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.save_format = save_format
+        # Journals live next to save files, whatever set_save_backend says
+        self._backend = FileSaveBackend(save_directory)
+        # name -> {"lines": save_field_lines as of the last save,
+        #          "snapshot": crc32 of the save file,
+        #          "file": (mtime_ns, size) of the save file,
+        #          "records": journal records, "bytes": journal size}
+        self._state = {}
+
+        # Counters
+        self.appends = 0
+        self.compactions = 0
+        self.bytes_written = 0
+
+    def load(self, character_name):
+        """
+        Load a character, replaying its journal and cutting off a torn
+        last record or a stale journal
+
+        Returns: Character dictionary
+        """
+        contents = self._backend.read(character_name)
+        character = decode_character(contents, self._backend)
+        journal_path = get_journal_path(character_name, self.save_directory)
+        records, intact = read_journal(journal_path, contents)
+        replay_journal(character, records)
+        if os.path.exists(journal_path) and os.path.getsize(journal_path) > intact:
+            os.truncate(journal_path, intact)
+
+        mark_saved(character)
+        self._state[character_name] = {
+            "lines": save_field_lines(character), "snapshot": zlib.crc32(contents),
+            "file": self._save_file_stat(character_name),
+            "records": len(records), "bytes": intact
+        }
+        return character
+
+    def save(self, character):
+        """
+        Save the fields of character that changed since its last save
+
+        Returns: True if anything was written
+        Raises: SaveFileCorruptedError if the write fails
+        """
+        name = character["name"]
+        state = self._state.get(name)
+        journal_path = get_journal_path(name, self.save_directory)
+        journal_exists = os.path.exists(journal_path)
+        if (state is None or self._save_file_stat(name) != state["file"]
+                or (state["bytes"] and not journal_exists)):
+            # New to this saver, or the save file was replaced (and the
+            # journal removed) by a full save made elsewhere
+            self.compact(character)
+            return True
+
+        baseline = state["lines"]
+        lines = save_field_lines(character)
+        changed = {field: line for field, line in lines.items() if baseline.get(field) != line}
+        if not changed:
+            mark_saved(character)
+            return False
+
+        revision = get_revision(character)
+        record = _journal_record("".join(
+            _journal_line(field, baseline.get(field), line) for field, line in changed.items()
+        ))
+        if not journal_exists:
+            record = _journal_record(f"SNAPSHOT: {state['snapshot']}\n") + record
+
+        with _manifest_change(self.save_directory) as manifest_lines:
+            try:
+                with open(journal_path, "ab") as f:
+                    f.write(record)
+            except OSError as e:
+                raise SaveFileCorruptedError(str(e))
+            if changed.keys() & {"class", "level", "gold"}:
+                # Keep the manifest's class, level and gold current
+                manifest_lines.append(self._manifest_entry(character))
+
+        self.appends += 1
+        self.bytes_written += len(record)
+        state["lines"] = lines
+        state["records"] += 1
+        state["bytes"] += len(record)
+        mark_saved(character, revision)
+
+        if state["records"] >= self.max_records or state["bytes"] >= self.max_bytes:
+            self.compact(character)
+        return True
+
+    def compact(self, character):
+        """
+        Write a full save file for character, replacing its journal
+
+        Raises: SaveFileCorruptedError if the write fails
+        """
+        name = character["name"]
+        contents = encode_character(character, self.save_format)
+        revision = get_revision(character)
+        try:
+            # Removes the journal once the save file is in place
+            self._backend.write(name, contents, _character_summary(character))
+        except OSError as e:
+            raise SaveFileCorruptedError(str(e))
+        mark_saved(character, revision)
+
+        self.compactions += 1
+        self.bytes_written += len(contents)
+        self._state[name] = {
+            "lines": save_field_lines(character), "snapshot": zlib.crc32(contents),
+            "file": self._save_file_stat(name), "records": 0, "bytes": 0
+        }
+
+    def _save_file_stat(self, character_name):
+        """Get (mtime_ns, size) of a character's save file, None if missing"""
+        try:
+            stat = os.stat(find_save_path(character_name, self.save_directory))
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _manifest_entry(self, character):
+        filename = find_save_path(character["name"], self.save_directory)
+        stat = os.stat(filename)
+        character_class, level, gold = _character_summary(character)
+        return _format_manifest_entry(character["name"], {
+            "class": character_class, "level": level, "gold": gold,
+            "mtime": stat.st_mtime_ns, "size": stat.st_size
+        })
+
+    def stats(self):
+        """Get appends, compactions and bytes_written so far"""
+        return {
+            "appends": self.appends,
+            "compactions": self.compactions,
+            "bytes_written": self.bytes_written
+        }
+
+# ============================================================================
+# SAVE FILE FORMAT
+# ============================================================================
+
+# Character-owned fields written to save files, in file order
+SAVE_FIELDS = [
+    "name", "class", "level", "health", "max_health",
+    "strength", "magic", "experience", "gold",
+    "inventory", "active_quests", "completed_quests",
+    "equipped_weapon", "equipped_armor"
+]
+
+INTEGER_FIELDS = ["level", "health", "max_health", "strength", "magic", "experience", "gold"]
+LIST_FIELDS = ["inventory", "active_quests", "completed_quests"]
+EQUIPMENT_FIELDS = ["equipped_weapon", "equipped_armor"]
+
+# Keys older saves wrote that are not character data (the whole item catalog)
+IGNORED_SAVE_KEYS = ("ITEM_DATA",)
+
+# Every save ends with "CHECKSUM: xxxxxxxx\n", the crc32 in hex of the
+# bytes before it. Saves written before checksums have no trailer.
+CHECKSUM_PREFIX = b"CHECKSUM: "
+_CHECKSUM_LENGTH = len(CHECKSUM_PREFIX) + 9
+
+def encode_character(character, save_format=SAVE_FORMAT_TEXT):
+    """
+    Convert a character to save file bytes in the given format
+
+    Returns: Save file contents as bytes, checksum trailer included
+    Raises: ValueError if save_format is unknown
+    """
+    if save_format == SAVE_FORMAT_BINARY:
+        contents = serialize_character_binary(character)
+    elif save_format in _SAVE_CODECS:
+        contents = compress_save(serialize_character_binary(character), save_format)
+    elif save_format == SAVE_FORMAT_TEXT:
+        contents = serialize_character(character).encode("utf-8")
+    else:
+        raise ValueError(f"Unknown save format: {save_format}")
+    return contents + b"%s%08x\n" % (CHECKSUM_PREFIX, zlib.crc32(contents))
+
+def split_checksum(contents):
+    """
+    Check and remove the checksum trailer of save file bytes
+
+    Returns: (contents without the trailer, True if a trailer was checked)
+    Raises: SaveFileCorruptedError if the trailer doesn't match the contents
+    """
+    trailer = contents[-_CHECKSUM_LENGTH:]
+    if not (trailer.startswith(CHECKSUM_PREFIX) and trailer.endswith(b"\n")):
+        return contents, False
+
+    body = contents[:-_CHECKSUM_LENGTH]
+    try:
+        stored = int(trailer[len(CHECKSUM_PREFIX):-1], 16)
+    except ValueError:
+        raise SaveFileCorruptedError("Malformed checksum trailer.")
+    actual = zlib.crc32(body)
+    if stored != actual:
+        raise SaveFileCorruptedError(f"Checksum mismatch: file says {stored:08x}, contents are {actual:08x}")
+    return body, True
+
+def decode_character(contents, backend=None):
+    """
+    Build a character from save file bytes of any format
+
+    Args:
+        backend: SaveBackend the save came from, which keeps the preset
+                 dictionary of zlib saves
+
+    Returns: Character dictionary
+    Raises:
+        SaveFileCorruptedError if the checksum fails, a compressed save
+        doesn't decompress or a text save isn't valid UTF-8
+        InvalidSaveDataError if data format is wrong
+    """
+    contents, _ = split_checksum(contents)
+    if contents.startswith(COMPRESSED_SAVE_MAGIC):
+        contents = decompress_save(contents, backend)
+    if contents.startswith(BINARY_SAVE_MAGIC):
+        return deserialize_character_binary(contents)
+    try:
+        lines = contents.decode("utf-8").splitlines()
+    except UnicodeDecodeError as e:
+        raise SaveFileCorruptedError(str(e))
+    return deserialize_character(lines)
+
+def write_save_file(filename, contents):
+    """
+    Write save contents atomically
+
+    The bytes go to a temporary file in the same directory which then
+    replaces filename, so a crash mid-write never leaves a partial save.
+    """
+    temp_name = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_name, "wb") as f:
+            f.write(contents)
+        os.replace(temp_name, filename)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+
+def serialize_character(character):
+    """
+    Convert a character to save file text
+
+    Lists are written comma-separated and equipment as the item ID, or
+    empty when nothing is equipped. Fields the character doesn't have
+    are skipped, anything not in SAVE_FIELDS is never written.
+
+    Returns: Save file contents as a string
+    """
+    return "".join(save_field_lines(character).values())
+
+def save_field_lines(character):
+    """
+    Get the save file line of each field the character saves
+
+    Returns: Dictionary of {field: "FIELD: value\\n"} in SAVE_FIELDS order
+    """
+    lines = {}
+    for field in SAVE_FIELDS:
+        if field in EQUIPMENT_FIELDS:
+            value = character.get(field) or ""
+        elif field not in character:
+            continue
+        elif field in LIST_FIELDS:
+            value = ",".join(character[field])
+        else:
+            value = character[field]
+        lines[field] = f"{field.upper()}: {value}\n"
+    return lines
+
+def _parse_save_list(value):
+    """Parse a comma-separated list, or the list repr older saves wrote"""
+    if value.startswith("["):
+        try:
+            parsed = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            raise InvalidSaveDataError(f"Invalid list in save file: {value}")
+        return [str(x) for x in parsed]
+    return [] if value == "" else [x for x in value.split(",")]
+
+def deserialize_character(lines):
+    """
+    Build a character from the lines of a save file
+
+    Older saves that contain an ITEM_DATA line still load, that line
+    is skipped without being parsed.
+
+    Returns: Character dictionary
+    Raises: InvalidSaveDataError if data format is wrong
+    """
+    data = _read_save_lines(lines)
+
+    try:
+        character = Character({"name": data["name"], "class": data["class"]})
+        for field in INTEGER_FIELDS:
+            character[field] = _parse_save_value(field, data[field])
+    except KeyError as e:
+        raise InvalidSaveDataError(f"Missing field: {e.args[0]}")
+
+    for field in LIST_FIELDS + EQUIPMENT_FIELDS:
+        character[field] = _parse_save_value(field, data.get(field, ""))
+
+    return character
+
+def _read_save_lines(lines):
+    """Split save file lines into {field: raw value string}"""
+    data = {}
+
+    for line in lines:
+        if line.startswith(IGNORED_SAVE_KEYS):
+            continue
+        line = line.strip()
+        if not line:
+            continue
+
+        key, separator, value = line.partition(":")
+        if not separator:
+            raise InvalidSaveDataError("Invalid line in save file.")
+        data[key.strip().lower()] = value.strip()
+
+    return data
+
+def _parse_save_value(field, value):
+    """
+    Convert a raw save file value to the field's type
+
+    Raises: InvalidSaveDataError if an integer field isn't a number
+    """
+    if field in INTEGER_FIELDS:
+        try:
+            return int(value)
+        except ValueError as e:
+            raise InvalidSaveDataError(str(e))
+    if field in LIST_FIELDS:
+        return _parse_save_list(value)
+    if field in EQUIPMENT_FIELDS:
+        return None if value in ("", "None") else value
+    return value
+
+# Binary saves: packed header, string length table, then the string bytes.
+# Bump BINARY_SAVE_VERSION and add a reader whenever the layout changes.
+BINARY_SAVE_MAGIC = b"QCSV"
+BINARY_SAVE_VERSION = 1
+
+# magic, version, then level, health, max_health, strength, magic,
+# experience, gold, then the inventory, active and completed quest counts
+_BINARY_HEADER = struct.Struct("<4sBiiiiiqqIII")
+
+# Strings stored before the lists: name, class, equipped_weapon, equipped_armor
+_BINARY_FIXED_STRINGS = 4
+
+def serialize_character_binary(character):
+    """
+    Convert a character to the binary save format
+
+    Layout (little-endian):
+    _BINARY_HEADER, then one unsigned 16-bit length per string, then the
+    UTF-8 bytes of every string back to back. Strings are ordered name,
+    class, equipped_weapon, equipped_armor, then the inventory, active
+    quests and completed quests. Unequipped slots are empty strings.
+
+    Returns: Save file contents as bytes
+    Raises: InvalidSaveDataError if a stat is not an integer or out of
+            range, or a string is longer than 65535 bytes
+    """
+    lists = [character.get(field, []) for field in LIST_FIELDS]
+    strings = [
+        character["name"], character["class"],
+        character.get("equipped_weapon") or "",
+        character.get("equipped_armor") or ""
+    ]
+    for values in lists:
+        strings.extend(values)
+
+    blob = "".join(strings).encode("utf-8")
+    lengths = [len(value) for value in strings]
+    if len(blob) != sum(lengths):
+        # Non-ASCII text: character counts differ from byte counts
+        lengths = [len(value.encode("utf-8")) for value in strings]
+
+    try:
+        header = _BINARY_HEADER.pack(
+            BINARY_SAVE_MAGIC, BINARY_SAVE_VERSION,
+            *[character[field] for field in INTEGER_FIELDS],
+            *[len(values) for values in lists]
+        )
+        packed_lengths = struct.pack(f"<{len(lengths)}H", *lengths)
+    except struct.error as e:
+        raise InvalidSaveDataError(f"Character doesn't fit the binary save format: {e}")
+    return header + packed_lengths + blob
+
+def deserialize_character_binary(data):
+    """
+    Build a character from binary save contents
+
+    Returns: Character dictionary
+    Raises: InvalidSaveDataError if the version is unknown or data is truncated
+    """
+    version_offset = len(BINARY_SAVE_MAGIC)
+    if len(data) <= version_offset:
+        raise InvalidSaveDataError("Binary save is missing its version.")
+    if data[version_offset] != BINARY_SAVE_VERSION:
+        raise InvalidSaveDataError(f"Unsupported binary save version: {data[version_offset]}")
+
+    try:
+        fields = _BINARY_HEADER.unpack_from(data)
+        stats = fields[2:2 + len(INTEGER_FIELDS)]
+        counts = fields[2 + len(INTEGER_FIELDS):]
+
+        string_count = _BINARY_FIXED_STRINGS + sum(counts)
+        lengths_offset = _BINARY_HEADER.size
+        lengths = struct.unpack_from(f"<{string_count}H", data, lengths_offset)
+        blob = data[lengths_offset + 2 * string_count:]
+        if len(blob) != sum(lengths):
+            raise InvalidSaveDataError("Binary save string table is truncated.")
+
+        text = blob.decode("utf-8")
+        if len(text) != len(blob):
+            # Non-ASCII text: slice the bytes, then decode each string
+            text = blob
+        strings = []
+        start = 0
+        for length in lengths:
+            end = start + length
+            strings.append(text[start:end])
+            start = end
+        if text is blob:
+            strings = [value.decode("utf-8") for value in strings]
+    except (struct.error, ValueError) as e:
+        raise InvalidSaveDataError(f"Corrupt binary save: {e}")
+
+    character = Character({"name": strings[0], "class": strings[1]})
+    character.update(zip(INTEGER_FIELDS, stats))
+    start = _BINARY_FIXED_STRINGS
+    for field, count in zip(LIST_FIELDS, counts):
+        character[field] = strings[start:start + count]
+        start += count
+    character["equipped_weapon"] = strings[2] or None
+    character["equipped_armor"] = strings[3] or None
+    return character
+
+# Compressed saves: _COMPRESSED_HEADER, then a binary save compressed by
+# the codec. zlib saves are raw deflate primed with the preset dictionary
+# named in the header (0 for none), lzma saves are raw LZMA2.
+COMPRESSED_SAVE_MAGIC = b"QCZ"
+
+# magic, codec id, preset dictionary id
+_COMPRESSED_HEADER = struct.Struct("<3sBI")
+_SAVE_CODECS = {SAVE_FORMAT_ZLIB: 1, SAVE_FORMAT_LZMA: 2}
+
+ZLIB_SAVE_LEVEL = 6
+_LZMA_FILTERS = [{"id": lzma.FILTER_LZMA2, "preset": 9 | lzma.PRESET_EXTREME, "dict_size": 64 * 1024}]
+
+# zlib only looks back 32 KB, so longer dictionaries are cut to this
+SAVE_DICTIONARY_LIMIT = 32 * 1024
+
+# Saves only carry their dictionary's id, the backend they are written to
+# keeps the dictionary itself (see SaveBackend.write_dictionary). Save
+# directories keep them as dictionaries/{id:08x}.zdict.
+SAVE_DICTIONARY_DIRECTORY = "dictionaries"
+SAVE_DICTIONARY_SUFFIX = ".zdict"
+
+# id -> (compressor, decompressor, dictionary), the primed zlib objects
+# are copied per save
+_save_dictionaries = {0: (None, None, None)}
+_save_dictionary_id = 0
+# Function building the dictionary on the first zlib save, if registered
+_save_dictionary_builder = None
+_save_dictionary_lock = threading.Lock()
+
+def build_save_dictionary(*catalogs):
+    """
+    Build a zlib preset dictionary from catalog ids
+
+    Ids are packed back to back like in binary saves. Earlier catalog
+    entries are kept when the ids don't all fit in SAVE_DICTIONARY_LIMIT
+    and go last, where matches are cheapest.
+
+    Args:
+        catalogs: Quest or item catalogs, or any iterables of ids
+
+    Returns: Dictionary bytes
+    """
+    pieces = [character_class.encode("utf-8") for character_class in CHARACTER_CLASSES]
+    size = sum(len(piece) for piece in pieces)
+    for catalog in catalogs:
+        for record_id in catalog:
+            piece = str(record_id).encode("utf-8")
+            if size + len(piece) > SAVE_DICTIONARY_LIMIT:
+                break
+            pieces.append(piece)
+            size += len(piece)
+    return b"".join(reversed(pieces))
+
+def _prime_dictionary(dictionary):
+    return (
+        zlib.compressobj(ZLIB_SAVE_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=dictionary),
+        zlib.decompressobj(-zlib.MAX_WBITS, zdict=dictionary),
+        dictionary
+    )
+
+def register_save_dictionary(dictionary):
+    """
+    Make dictionary the one new zlib saves are compressed with
+
+    Args:
+        dictionary: Dictionary bytes, or a function returning them which
+                    is called on the first zlib save, so the catalogs it
+                    is built from needn't be loaded before then
+
+    Returns: The dictionary's id (its crc32), None if it is built later
+    """
+    global _save_dictionary_id, _save_dictionary_builder
+    if callable(dictionary):
+        _save_dictionary_builder = dictionary
+        return None
+
+    dictionary_id = zlib.crc32(dictionary)
+    with _save_dictionary_lock:
+        if dictionary_id not in _save_dictionaries:
+            _save_dictionaries[dictionary_id] = _prime_dictionary(dictionary)
+        _save_dictionary_id = dictionary_id
+        _save_dictionary_builder = None
+    return dictionary_id
+
+def _current_save_dictionary_id():
+    """
+    Get the id of the dictionary new zlib saves use, building a
+    registered builder's dictionary first
+
+    Raises: Whatever the builder raises, it is tried again next save
+    """
+    builder = _save_dictionary_builder
+    if builder is not None:
+        dictionary = builder()
+        if _save_dictionary_builder is builder:
+            register_save_dictionary(dictionary)
+    return _save_dictionary_id
+
+def _get_save_dictionary(dictionary_id, backend=None):
+    """
+    Get the primed (compressor, decompressor, dictionary) for a dictionary
+    id, reading it from backend if this process hasn't seen it
+
+    Raises: SaveFileCorruptedError if the dictionary can't be found
+    """
+    primed = _save_dictionaries.get(dictionary_id)
+    if primed is not None:
+        return primed
+
+    if backend is None:
+        raise SaveFileCorruptedError(f"Save needs preset dictionary {dictionary_id:08x}, which is missing.")
+    dictionary = backend.read_dictionary(dictionary_id)
+    if zlib.crc32(dictionary) != dictionary_id:
+        raise SaveFileCorruptedError(f"Preset dictionary {dictionary_id:08x} is damaged.")
+
+    with _save_dictionary_lock:
+        return _save_dictionaries.setdefault(dictionary_id, _prime_dictionary(dictionary))
+
+def find_save_dictionary(contents):
+    """
+    Get the preset dictionary save bytes were compressed with, which the
+    backend storing them has to keep
+
+    Returns: (dictionary id, dictionary bytes), or None if contents don't
+             use a preset dictionary
+    """
+    if not contents.startswith(COMPRESSED_SAVE_MAGIC):
+        return None
+    dictionary_id = _COMPRESSED_HEADER.unpack_from(contents)[2]
+    if not dictionary_id:
+        return None
+    return dictionary_id, _get_save_dictionary(dictionary_id)[2]
+
+def compress_save(contents, save_format):
+    """Compress binary save bytes with the codec for save_format"""
+    if save_format == SAVE_FORMAT_LZMA:
+        body = lzma.compress(contents, format=lzma.FORMAT_RAW, filters=_LZMA_FILTERS)
+        dictionary_id = 0
+    else:
+        dictionary_id = _current_save_dictionary_id()
+        compressor = _get_save_dictionary(dictionary_id)[0]
+        compressor = compressor.copy() if compressor else zlib.compressobj(
+            ZLIB_SAVE_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS
+        )
+        body = compressor.compress(contents) + compressor.flush()
+    header = _COMPRESSED_HEADER.pack(COMPRESSED_SAVE_MAGIC, _SAVE_CODECS[save_format], dictionary_id)
+    return header + body
+
+def decompress_save(contents, backend=None):
+    """
+    Get the binary save inside compressed save bytes
+
+    Args:
+        backend: SaveBackend keeping the save's preset dictionary
+
+    Raises:
+        SaveFileCorruptedError if the data doesn't decompress or its
+        dictionary is missing
+        InvalidSaveDataError if the codec is unknown
+    """
+    try:
+        _, codec, dictionary_id = _COMPRESSED_HEADER.unpack_from(contents)
+    except struct.error:
+        raise InvalidSaveDataError("Compressed save is missing its header.")
+    body = contents[_COMPRESSED_HEADER.size:]
+
+    try:
+        if codec == _SAVE_CODECS[SAVE_FORMAT_LZMA]:
+            return lzma.decompress(body, format=lzma.FORMAT_RAW, filters=_LZMA_FILTERS)
+        if codec == _SAVE_CODECS[SAVE_FORMAT_ZLIB]:
+            decompressor = _get_save_dictionary(dictionary_id, backend)[1]
+            decompressor = decompressor.copy() if decompressor else zlib.decompressobj(-zlib.MAX_WBITS)
+            data = decompressor.decompress(body) + decompressor.flush()
+            if not decompressor.eof:
+                raise SaveFileCorruptedError("Compressed save is truncated.")
+            return data
+    except (zlib.error, lzma.LZMAError) as e:
+        raise SaveFileCorruptedError(f"Compressed save doesn't decompress: {e}")
+    raise InvalidSaveDataError(f"Unknown save codec: {codec}")
+
+# ============================================================================
+# CHARACTER RECORD
+# ============================================================================
+
+# Keys a Character keeps in slots: the save fields, the catalog main.py
+# attaches and the change tracking revisions
+_CHARACTER_SLOTS = tuple(SAVE_FIELDS) + ("item_data",)
+_CHARACTER_SLOT_SET = frozenset(_CHARACTER_SLOTS)
+
+class Character(MutableMapping):
+    """
+    Compact character that reads and writes like the character dictionary
+
+    Known keys live in __slots__ rather than a per-character dictionary,
+    which saves most of the memory of a live character. Every module keeps
+    using string keys (char["gold"] += 5, char.get("equipped_weapon"),
+    char.setdefault(...), "item_data" in char). A slot that was never set
+    is a missing key, as in the dictionary. Other keys are kept in extra.
+    Class names are interned so all characters of a class share one string.
+    The revision counters of mark_dirty and mark_saved are attributes, not
+    keys, so copies, comparisons and iteration only see game data.
+    """
+    __slots__ = _CHARACTER_SLOTS + ("extra", "revision", "saved_revision")
+
+    def __init__(self, fields=None):
+        """
+        Args:
+            fields: Dictionary of keys to set
+        """
+        self.extra = None
+        self.revision = 0
+        self.saved_revision = None
+        if fields:
+            for key, value in fields.items():
+                self[key] = value
+
+    def __getitem__(self, key):
+        if key in _CHARACTER_SLOT_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in _CHARACTER_SLOT_SET:
+            if key == "class" and type(value) is str:
+                value = sys.intern(value)
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in _CHARACTER_SLOT_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self.extra is not None and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in _CHARACTER_SLOT_SET:
+            return getattr(self, key, default)
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+
+    def __contains__(self, key):
+        if key in _CHARACTER_SLOT_SET:
+            return hasattr(self, key)
+        return self.extra is not None and key in self.extra
+
+    def __iter__(self):
+        for key in _CHARACTER_SLOTS:
+            if hasattr(self, key):
+                yield key
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self):
+        count = sum(1 for key in _CHARACTER_SLOTS if hasattr(self, key))
+        return count + (len(self.extra) if self.extra else 0)
+
+    def copy(self):
+        """Shallow copy, like dict.copy"""
+        return Character(self)
+
+    def __reduce__(self):
+        return (Character, (dict(self),), (self.revision, self.saved_revision))
+
+    def __setstate__(self, state):
+        self.revision, self.saved_revision = state
+
+    def __repr__(self):
+        return f"Character({dict(self)!r})"
+
+# ============================================================================
+# VALIDATION
+# ============================================================================
+
+def validate_character_data(character):
+    """
+    Validate that character dictionary has all required fields
+    
+    Required fields: name, class, level, health, max_health, 
+                    strength, magic, experience, gold, inventory,
+                    active_quests, completed_quests
+    
+    Returns: True if valid
+    Raises: InvalidSaveDataError if missing fields or invalid types
+    """
+    required = [
+        "name", "class", "level", "health", "max_health",
+        "strength", "magic", "experience", "gold",
+        "inventory", "active_quests", "completed_quests"
+    ]
+
+    for key in required:
+        if key not in character:
+            raise InvalidSaveDataError(f"Missing field: {key}")
+
+    for field in ["level", "health", "max_health", "strength", "magic", "experience", "gold"]:
+        if not isinstance(character[field], int):
+            raise InvalidSaveDataError(f"Field {field} must be an integer.")
+
+    for field in ["inventory", "active_quests", "completed_quests"]:
+        if not isinstance(character[field], list):
+            raise InvalidSaveDataError(f"Field {field} must be a list.")
+
+    return True
+
+    # TODO: Implement validation
+    # Check all required keys exist
+    # Check that numeric values are numbers
+    # Check that lists are actually lists
+
+
+# ============================================================================
+# SAVE VERIFICATION
+# ============================================================================
+
+# Outcomes of verify_save_contents
+VERIFY_OK = "ok"
+VERIFY_UNCHECKED = "unchecked"      # loads, but written before checksums
+VERIFY_CORRUPT = "corrupt"
+VERIFY_TRUNCATED = "truncated"
+VERIFY_UNPARSEABLE = "unparseable"
+
+# Save files handed to a verify worker process at once
+VERIFY_CHUNK_SIZE = 512
+
+def _binary_save_length(data):
+    """Length a binary save's header says it has, or None if the header is cut short"""
+    try:
+        counts = _BINARY_HEADER.unpack_from(data)[-len(LIST_FIELDS):]
+        string_count = _BINARY_FIXED_STRINGS + sum(counts)
+        lengths = struct.unpack_from(f"<{string_count}H", data, _BINARY_HEADER.size)
+    except struct.error:
+        return None
+    return _BINARY_HEADER.size + 2 * string_count + sum(lengths)
+
+def _is_truncated(contents):
+    """Whether save bytes without a checksum trailer look cut short"""
+    if contents.startswith(BINARY_SAVE_MAGIC):
+        expected = _binary_save_length(contents)
+        if expected is None or len(contents) < expected:
+            return True
+        # Cut inside the checksum trailer
+        tail = contents[expected:]
+        return 0 < len(tail) < _CHECKSUM_LENGTH and tail[:len(CHECKSUM_PREFIX)] == CHECKSUM_PREFIX[:len(tail)]
+    # Text saves, trailer or not, always end with a newline
+    return not contents.endswith(b"\n")
+
+def _bytes_after_trailer(contents):
+    """
+    Count the bytes following a valid checksum trailer that isn't at the
+    end of contents
+
+    Returns: The number of extra bytes, 0 if no such trailer is found
+    """
+    position = contents.rfind(CHECKSUM_PREFIX)
+    while position >= 0:
+        end = position + _CHECKSUM_LENGTH
+        try:
+            checked = split_checksum(contents[:end])[1]
+        except SaveFileCorruptedError:
+            checked = False
+        if checked:
+            return len(contents) - end
+        position = contents.rfind(CHECKSUM_PREFIX, 0, position)
+    return 0
+
+def verify_save_contents(contents, backend=None):
+    """
+    Check save file bytes the way load_character would read them
+
+    Args:
+        backend: SaveBackend the save came from, see decode_character
+
+    Returns: (status, reason), status is one of VERIFY_OK,
+             VERIFY_UNCHECKED, VERIFY_CORRUPT, VERIFY_TRUNCATED or
+             VERIFY_UNPARSEABLE, reason is "" when the save is fine
+    """
+    if not contents:
+        return VERIFY_TRUNCATED, "File is empty."
+    try:
+        body, checked = split_checksum(contents)
+    except SaveFileCorruptedError as e:
+        return VERIFY_CORRUPT, str(e)
+    if not checked:
+        extra = _bytes_after_trailer(body)
+        if extra:
+            return VERIFY_CORRUPT, f"{extra} bytes of unexpected data after the checksum trailer."
+        if _is_truncated(body):
+            return VERIFY_TRUNCATED, "File ends before the save is complete."
+
+    try:
+        validate_character_data(decode_character(body, backend))
+    except SaveFileCorruptedError as e:
+        return VERIFY_CORRUPT, str(e)
+    except InvalidSaveDataError as e:
+        return VERIFY_UNPARSEABLE, str(e)
+
+    if not checked:
+        return VERIFY_UNCHECKED, "No checksum trailer."
+    return VERIFY_OK, ""
+
+def _verify_files(paths, save_directory):
+    """Verify a chunk of save files, run in a worker process"""
+    backend = FileSaveBackend(save_directory)
+    results = []
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                results.append(verify_save_contents(f.read(), backend))
+        except OSError as e:
+            results.append((VERIFY_CORRUPT, str(e)))
+    return results
+
+def _quarantine_save(name, path, save_directory, quarantine_directory):
+    """Move a save and its journal into quarantine_directory, keeping shard subdirectories"""
+    destination = os.path.join(quarantine_directory, os.path.relpath(path, save_directory))
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    shutil.move(path, destination)
+    journal_path = os.path.join(os.path.dirname(path), f"{name}{JOURNAL_SUFFIX}")
+    if os.path.exists(journal_path):
+        shutil.move(journal_path, os.path.join(os.path.dirname(destination), f"{name}{JOURNAL_SUFFIX}"))
+    return destination
+
+def verify_saves(save_directory="data/save_games", workers=None, quarantine_directory=None):
+    """
+    Check every save file in save_directory
+
+    Files are read and decoded on a process pool in chunks of
+    VERIFY_CHUNK_SIZE. Bad saves are moved to quarantine_directory if it
+    is given and dropped from the manifest.
+
+    Args:
+        workers: Number of worker processes (None for one per CPU,
+                 1 to check in this process)
+
+    Returns: Dictionary with checked, counts ({status: number}),
+             problems ({name: (status, reason)}), quarantined
+             ({name: new path}), errors ({name: message}) and seconds
+    """
+    start = time.perf_counter()
+    saves = sorted(_scan_saves(save_directory).items()) if os.path.isdir(save_directory) else []
+    paths = [path for _, path in saves]
+    chunks = [paths[i:i + VERIFY_CHUNK_SIZE] for i in range(0, len(paths), VERIFY_CHUNK_SIZE)]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(chunks)))
+    if workers == 1:
+        outcomes = [_verify_files(chunk, save_directory) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(_verify_files, chunks, [save_directory] * len(chunks)))
+
+    result = {"checked": len(saves), "counts": {}, "problems": {}, "quarantined": {}, "errors": {}}
+    for (name, _), (status, reason) in zip(saves, (o for chunk in outcomes for o in chunk)):
+        result["counts"][status] = result["counts"].get(status, 0) + 1
+        if status not in (VERIFY_OK, VERIFY_UNCHECKED):
+            result["problems"][name] = (status, reason)
+
+    if quarantine_directory and result["problems"]:
+        paths = dict(saves)
+        with _manifest_change(save_directory) as manifest_lines:
+            for name in result["problems"]:
+                try:
+                    result["quarantined"][name] = _quarantine_save(
+                        name, paths[name], save_directory, quarantine_directory
+                    )
+                except OSError as e:
+                    result["errors"][name] = str(e)
+                    continue
+                manifest_lines.append(f"D\t{name}\n")
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+# ============================================================================
+# LEGACY SAVE MIGRATION
+# ============================================================================
+
+# Names of saves a migration has finished, one per line, so an
+# interrupted migration carries on where it stopped
+MIGRATE_PROGRESS_FILENAME = ".migrate-progress"
+
+# Save files handed to a migration worker process at once
+MIGRATE_CHUNK_SIZE = 512
+
+def get_migrate_progress_path(save_directory="data/save_games"):
+    """Get the path of a save directory's migration progress file"""
+    return os.path.join(save_directory, MIGRATE_PROGRESS_FILENAME)
+
+def _repair_list(values):
+    """
+    Undo what older loaders did to repr lists
+
+    They split "['a', 'b']" on commas and kept "['a'" and " 'b']" as
+    items, which the next save wrote back inside another repr list.
+    """
+    while values and values[0].lstrip().startswith("[") and values[-1].rstrip().endswith("]"):
+        try:
+            parsed = ast.literal_eval(",".join(values))
+        except (ValueError, SyntaxError):
+            break
+        if not isinstance(parsed, list):
+            break
+        values = [str(x) for x in parsed]
+    return values
+
+def parse_legacy_save(contents):
+    """
+    Build a character from save bytes written by any earlier version
+
+    On top of what decode_character accepts (repr lists, ITEM_DATA lines,
+    missing equipment), list items mangled by older loaders are repaired.
+
+    Returns: Character dictionary
+    Raises: SaveFileCorruptedError, InvalidSaveDataError
+    """
+    character = decode_character(contents)
+    for field in LIST_FIELDS:
+        character[field] = _repair_list(character[field])
+    validate_character_data(character)
+    return character
+
+def _migrate_files(jobs, dry_run):
+    """
+    Rewrite a chunk of saves in the current format, run in a worker process
+
+    Saves that already have a checksum trailer are left alone. A journal
+    next to a save is folded into the rewritten file.
+
+    Returns: List of (name, status, detail) where status is "current",
+             "migrated" or "error" and detail is the manifest line of a
+             migrated save or the error message
+    """
+    results = []
+    for name, path in jobs:
+        try:
+            with open(path, "rb") as f:
+                contents = f.read()
+            if split_checksum(contents)[1]:
+                results.append((name, "current", ""))
+                continue
+
+            character = parse_legacy_save(contents)
+            journal_path = os.path.join(os.path.dirname(path), f"{name}{JOURNAL_SUFFIX}")
+            replay_journal(character, read_journal(journal_path, contents)[0])
+            if dry_run:
+                results.append((name, "migrated", ""))
+                continue
+
+            save_format = SAVE_FORMAT_BINARY if contents.startswith(BINARY_SAVE_MAGIC) else SAVE_FORMAT_TEXT
+            write_save_file(path, encode_character(character, save_format))
+            if os.path.exists(journal_path):
+                os.remove(journal_path)
+
+            stat = os.stat(path)
+            character_class, level, gold = _character_summary(character)
+            line = _format_manifest_entry(name, {
+                "class": character_class, "level": level, "gold": gold,
+                "mtime": stat.st_mtime_ns, "size": stat.st_size
+            })
+            results.append((name, "migrated", line))
+        except (OSError, SaveFileCorruptedError, InvalidSaveDataError) as e:
+            results.append((name, "error", str(e)))
+    return results
+
+def _read_migrate_progress(save_directory):
+    """Get the names a previous migration finished, ignoring a torn last line"""
+    try:
+        with open(get_migrate_progress_path(save_directory), "r", encoding="utf-8") as f:
+            text = f.read()
+    except FileNotFoundError:
+        return set()
+    return set(text[:text.rfind("\n") + 1].splitlines())
+
+def migrate_saves(save_directory="data/save_games", workers=None, dry_run=False, progress=None):
+    """
+    Rewrite every legacy save in save_directory in the current format
+
+    Saves are streamed through parse_legacy_save on a process pool in
+    chunks of MIGRATE_CHUNK_SIZE. After each chunk the finished names are
+    appended to the progress file, and saves listed there are skipped, so
+    running again after an interruption resumes. The progress file is
+    removed once a run finishes without errors. A dry run reads and
+    parses every save but writes nothing.
+
+    Args:
+        workers: Number of worker processes (None for one per CPU,
+                 1 to migrate in this process)
+        progress: Called with (saves done, saves to do) after each chunk
+
+    Returns: Dictionary with total, skipped (finished by an earlier run),
+             migrated (or would be, in a dry run), current, errors
+             ({name: message}) and seconds
+    """
+    start = time.perf_counter()
+    saves = sorted(_scan_saves(save_directory).items()) if os.path.isdir(save_directory) else []
+    finished = set() if dry_run else _read_migrate_progress(save_directory)
+    jobs = [(name, path) for name, path in saves if name not in finished]
+    chunks = [jobs[i:i + MIGRATE_CHUNK_SIZE] for i in range(0, len(jobs), MIGRATE_CHUNK_SIZE)]
+
+    result = {
+        "total": len(saves), "skipped": len(saves) - len(jobs),
+        "migrated": 0, "current": 0, "errors": {}
+    }
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(chunks)))
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    # A dry run leaves the manifest alone too
+    change = nullcontext([]) if dry_run else _manifest_change(save_directory)
+    try:
+        with change as manifest_lines:
+            if pool is None:
+                outcomes = (_migrate_files(chunk, dry_run) for chunk in chunks)
+            else:
+                outcomes = pool.map(_migrate_files, chunks, [dry_run] * len(chunks))
+
+            done = 0
+            for outcome in outcomes:
+                names = []
+                for name, status, detail in outcome:
+                    if status == "error":
+                        result["errors"][name] = detail
+                        continue
+                    result[status] += 1
+                    names.append(name)
+                    if detail:
+                        manifest_lines.append(detail)
+                if names and not dry_run:
+                    with open(get_migrate_progress_path(save_directory), "a", encoding="utf-8") as f:
+                        f.write("".join(f"{name}\n" for name in names))
+                done += len(outcome)
+                if progress is not None:
+                    progress(done, len(jobs))
+
+            progress_path = get_migrate_progress_path(save_directory)
+            if not dry_run and not result["errors"] and os.path.exists(progress_path):
+                os.remove(progress_path)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def run_command(argv=None):
+    """
+    Run a save maintenance command
+
+    Usage:
+        python -m character_manager migrate-layout {flat,sharded}
+                                    [--save-dir DIR] [--workers N]
+        python -m character_manager verify [--save-dir DIR] [--workers N]
+                                    [--quarantine DIR]
+        python -m character_manager migrate-saves [--save-dir DIR]
+                                    [--workers N] [--dry-run]
+
+    Returns: Exit status
+    """
+    parser = argparse.ArgumentParser(prog="python -m character_manager")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser("migrate-layout", help="move saves to another layout")
+    migrate.add_argument("layout", choices=[SAVE_LAYOUT_FLAT, SAVE_LAYOUT_SHARDED])
+    migrate.add_argument("--save-dir", default="data/save_games")
+    migrate.add_argument("--workers", type=int, default=8)
+
+    verify = commands.add_parser("verify", help="find corrupt, truncated and unparseable saves")
+    verify.add_argument("--save-dir", default="data/save_games")
+    verify.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    verify.add_argument("--quarantine", metavar="DIR",
+                        help="move bad saves into DIR")
+
+    upgrade = commands.add_parser("migrate-saves", help="rewrite legacy saves in the current format")
+    upgrade.add_argument("--save-dir", default="data/save_games")
+    upgrade.add_argument("--workers", type=int, default=None,
+                         help="worker processes (default: one per CPU)")
+    upgrade.add_argument("--dry-run", action="store_true",
+                         help="report what would be rewritten without writing")
+
+    options = parser.parse_args(argv)
+
+    if options.command == "migrate-layout":
+        result = migrate_save_layout(options.save_dir, options.layout, options.workers)
+        print(f"Moved {result['moved']} saves, {result['skipped']} already moved, "
+              f"{len(result['errors'])} errors")
+        for name, error in result["errors"].items():
+            print(f"  {name}: {error}", file=sys.stderr)
+        return 1 if result["errors"] else 0
+
+    if options.command == "verify":
+        result = verify_saves(options.save_dir, options.workers, options.quarantine)
+        for name, (status, reason) in sorted(result["problems"].items()):
+            moved = f" -> {result['quarantined'][name]}" if name in result["quarantined"] else ""
+            print(f"  {name}: {status}: {reason}{moved}")
+        for name, error in result["errors"].items():
+            print(f"  {name}: could not quarantine: {error}", file=sys.stderr)
+        counts = ", ".join(f"{count} {status}" for status, count in sorted(result["counts"].items()))
+        print(f"Checked {result['checked']} saves in {result['seconds']:.1f}s"
+              + (f": {counts}" if counts else ""))
+        return 1 if result["problems"] else 0
+
+    if options.command == "migrate-saves":
+        def show_progress(done, total):
+            print(f"\r{done}/{total} saves", end="", file=sys.stderr, flush=True)
+
+        result = migrate_saves(options.save_dir, options.workers, options.dry_run, show_progress)
+        print(file=sys.stderr)
+        for name, error in sorted(result["errors"].items()):
+            print(f"  {name}: {error}")
+        action = "Would migrate" if options.dry_run else "Migrated"
+        print(f"{action} {result['migrated']} of {result['total']} saves in {result['seconds']:.1f}s: "
+              f"{result['current']} already current, {result['skipped']} done by an earlier run, "
+              f"{len(result['errors'])} errors")
+        return 1 if result["errors"] else 0
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_command())
+
     print("=== CHARACTER MANAGER TEST ===")
     
     # Test character creation
@@ -9,6 +9,7 @@ AI Usage: used to check for errors
 Handles combat mechanics
 """
 import random
+import character_manager
 from custom_exceptions import (
     InvalidTargetError,
     CombatNotActiveError,
@@ -280,6 +281,8 @@ class SimpleBattle:
         target["health"] -= damage
         if target["health"] < 0:
             target["health"] = 0
+        if target is self.character:
+            character_manager.mark_dirty(target)
         # TODO: Implement damage application
     
     def check_battle_end(self):
@@ -381,6 +384,7 @@ def rogue_critical_strike(character, enemy):
 def cleric_heal(character):
     """Cleric special ability"""
     character["health"] = min(character["health"] + 30, character["max_health"])
+    character_manager.mark_dirty(character)
     return "You heal 30 HP."
     # TODO: Implement healing
     # Restore 30 HP (not exceeding max_health)
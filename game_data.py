@@ -10,17 +10,47 @@ This module handles loading and validating game data from text files.
 """
 
 import os
+import re
+import sys
+import mmap
+import glob
+import hashlib
+import pickle
+from array import array
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
 from custom_exceptions import (
     InvalidDataFormatError,
     MissingDataFileError,
     CorruptedDataError
 )
 
+# NumPy is optional, ItemColumns falls back to the array module without it
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Directory used for compiled catalog caches
+CACHE_DIRECTORY = "data/.cache"
+
+# Bump when the cached record layout or index keys change so old caches
+# are rebuilt
+CACHE_FORMAT_VERSION = 3
+
+# Directories holding catalogs split into several *.txt shard files
+QUEST_SHARD_DIRECTORY = "data/quests.d"
+ITEM_SHARD_DIRECTORY = "data/items.d"
+
+# Shard sets smaller than this are parsed serially, a process pool
+# costs more to start than it saves on small inputs
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
 # ============================================================================
 # DATA LOADING FUNCTIONS
 # ============================================================================
 
-def load_quests(filename="data/quests.txt"):
+def load_quests(filename="data/quests.txt", cache_dir=None, as_records=False):
     """
     Load quest data from file
     
@@ -32,29 +62,24 @@ def load_quests(filename="data/quests.txt"):
     REWARD_GOLD: 50
     REQUIRED_LEVEL: 1
     PREREQUISITE: previous_quest_id (or NONE)
+
+    If cache_dir is given, a compiled copy of the catalog is kept there and
+    reused while the source file is unchanged. With as_records=True the
+    values are compact Quest objects instead of dictionaries.
     
     Returns: Dictionary of quests {quest_id: quest_data_dict}
     Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
     """
-    if not os.path.exists(filename):
-        raise MissingDataFileError(f"Missing file: {filename}")
-
-    try:
-        with open(filename, "r", encoding="utf-8") as f:
-            content = f.read().strip()
-    except Exception:
-        raise CorruptedDataError("Error reading quests file")
-
-    if not content:
-        raise CorruptedDataError("Quest file is empty or corrupted")
+    if cache_dir is not None:
+        kind = "quest-records" if as_records else "quests"
+        return load_cached_catalog(
+            filename, cache_dir, kind,
+            lambda name: load_quests(name, as_records=as_records)
+        )
 
     quests = {}
-    blocks = content.split("\n\n")
 
-    for block in blocks:
-        lines = [line.strip() for line in block.split("\n") if line.strip()]
-        quest = parse_quest_block(lines)
-        validate_quest_data(quest)
+    for _, quest in iter_quests(filename, as_records):
         quests[quest["quest_id"]] = quest
 
     return quests
@@ -64,7 +89,7 @@ def load_quests(filename="data/quests.txt"):
     # - Invalid format → raise InvalidDataFormatError
     # - Corrupted/unreadable data → raise CorruptedDataError
 
-def load_items(filename="data/items.txt"):
+def load_items(filename="data/items.txt", cache_dir=None, as_records=False):
     """
     Load item data from file
     
@@ -75,35 +100,61 @@ def load_items(filename="data/items.txt"):
     EFFECT: stat_name:value (e.g., strength:5 or health:20)
     COST: 100
     DESCRIPTION: Item description
+
+    If cache_dir is given, a compiled copy of the catalog is kept there and
+    reused while the source file is unchanged. With as_records=True the
+    values are compact Item objects instead of dictionaries.
     
     Returns: Dictionary of items {item_id: item_data_dict}
     Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
     """
-    if not os.path.exists(filename):
-        raise MissingDataFileError(f"Missing file: {filename}")
-
-    try:
-        with open(filename, "r", encoding="utf-8") as f:
-            content = f.read().strip()
-    except Exception:
-        raise CorruptedDataError("Error reading items file")
-
-    if not content:
-        raise CorruptedDataError("Item file is empty or corrupted")
+    if cache_dir is not None:
+        kind = "item-records" if as_records else "items"
+        return load_cached_catalog(
+            filename, cache_dir, kind,
+            lambda name: load_items(name, as_records=as_records)
+        )
 
     items = {}
-    blocks = content.split("\n\n")
 
-    for block in blocks:
-        lines = [line.strip() for line in block.split("\n") if line.strip()]
-        item = parse_item_block(lines)
-        validate_item_data(item)
+    for _, item in iter_items(filename, as_records):
         items[item["item_id"]] = item
 
     return items
     # TODO: Implement this function
     # Must handle same exceptions as load_quests
 
+def iter_quests(filename="data/quests.txt", as_records=False):
+    """
+    Stream quest records from file one block at a time
+
+    The file is read line by line, so only the quest currently being
+    parsed is held in memory.
+
+    Yields: Tuple of (line_number, quest_data_dict) where line_number is
+            the line the quest block starts on (a Quest if as_records)
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    for line_number, lines in _iter_blocks(filename, "quest"):
+        quest = _parse_quest_record(lines, line_number)
+        if as_records:
+            quest = Quest.from_dict(quest)
+        yield line_number, quest
+
+def iter_items(filename="data/items.txt", as_records=False):
+    """
+    Stream item records from file one block at a time
+
+    Yields: Tuple of (line_number, item_data_dict) where line_number is
+            the line the item block starts on (an Item if as_records)
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    for line_number, lines in _iter_blocks(filename, "item"):
+        item = _parse_item_record(lines, line_number)
+        if as_records:
+            item = Item.from_dict(item)
+        yield line_number, item
+
 def validate_quest_data(quest_dict):
     """
     Validate that quest dictionary has all required fields
@@ -244,6 +295,399 @@ def create_default_data_files():
     # Create default quests.txt and items.txt files
     # Handle any file permission errors appropriately
 
+# ============================================================================
+# LAZY CATALOGS
+# ============================================================================
+
+class LazyCatalog(Mapping):
+    """
+    Catalog that is read and parsed the first time it is used
+
+    Any key lookup, length query or iteration triggers the load, and the
+    result is kept from then on. Only the existence of the source is
+    checked up front, so a missing file is still reported right away.
+    Parse errors surface on first use as the usual game_data exceptions,
+    and a failed load is retried on the next access.
+    """
+
+    def __init__(self, loader, filename, **options):
+        """
+        Args:
+            loader: Function called as loader(filename, **options)
+            filename: Data file or shard directory
+
+        Raises: MissingDataFileError if filename does not exist
+        """
+        if not os.path.exists(filename):
+            raise MissingDataFileError(f"Missing file: {filename}")
+
+        self.filename = filename
+        self._loader = loader
+        self._options = options
+        self._data = None
+
+    @property
+    def loaded(self):
+        """True once the catalog has been parsed"""
+        return self._data is not None
+
+    def _load(self):
+        if self._data is None:
+            self._data = self._loader(self.filename, **self._options)
+        return self._data
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __contains__(self, key):
+        return key in self._load()
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+def lazy_quests(filename="data/quests.txt", **options):
+    """
+    Get a quest catalog that is only loaded on first use
+
+    Options are passed on to load_quests (cache_dir, as_records).
+    Raises: MissingDataFileError if the file does not exist
+    """
+    return LazyCatalog(load_quests, filename, **options)
+
+def lazy_items(filename="data/items.txt", **options):
+    """
+    Get an item catalog that is only loaded on first use
+
+    Options are passed on to load_items (cache_dir, as_records).
+    Raises: MissingDataFileError if the file does not exist
+    """
+    return LazyCatalog(load_items, filename, **options)
+
+# ============================================================================
+# SHARDED CATALOGS
+# ============================================================================
+
+def load_quest_shards(directory=QUEST_SHARD_DIRECTORY, workers=None):
+    """
+    Load a quest catalog split across the *.txt files in directory
+
+    Returns: Dictionary of quests {quest_id: quest_data_dict}
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    return load_catalog_shards(directory, "quests", workers)
+
+def load_item_shards(directory=ITEM_SHARD_DIRECTORY, workers=None):
+    """
+    Load an item catalog split across the *.txt files in directory
+
+    Returns: Dictionary of items {item_id: item_data_dict}
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    return load_catalog_shards(directory, "items", workers)
+
+def load_catalog_shards(directory, kind, workers=None):
+    """
+    Parse every shard of a catalog and merge them into one dictionary
+
+    Shards are parsed in a process pool when there is more than one worker
+    and the shards add up to at least PARALLEL_MIN_BYTES.
+
+    Args:
+        directory: Directory containing the *.txt shard files
+        kind: "quests" or "items"
+        workers: Number of worker processes (None for one per CPU,
+                 1 to always parse serially)
+
+    Returns: Merged catalog dictionary
+    Raises:
+        MissingDataFileError if the directory has no shards
+        InvalidDataFormatError if a shard is invalid or an id appears
+        in more than one shard
+        CorruptedDataError if a shard cannot be read
+    """
+    shards = sorted(glob.glob(os.path.join(directory, "*.txt")))
+    if not shards:
+        raise MissingDataFileError(f"No {kind} shards found in {directory}")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(shards)))
+
+    total_bytes = sum(os.path.getsize(shard) for shard in shards)
+
+    if workers == 1 or total_bytes < PARALLEL_MIN_BYTES:
+        results = [_load_shard(kind, shard) for shard in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_load_shard, [kind] * len(shards), shards))
+
+    merged = {}
+    for position, records in enumerate(results):
+        duplicates = merged.keys() & records.keys()
+        if duplicates:
+            record_id = min(duplicates)
+            first = next(
+                shards[i] for i in range(position) if record_id in results[i]
+            )
+            raise InvalidDataFormatError(
+                f"Duplicate {kind[:-1]} id '{record_id}' in {first} "
+                f"and {shards[position]}"
+            )
+        merged.update(records)
+
+    return merged
+
+def _load_shard(kind, filename):
+    """Load one shard file, run inside the worker processes"""
+    if kind == "quests":
+        return load_quests(filename)
+    return load_items(filename)
+
+# ============================================================================
+# CATALOG CACHE
+# ============================================================================
+
+def load_cached_catalog(filename, cache_dir, kind, loader):
+    """
+    Load a catalog through its compiled cache file
+
+    The cache is keyed by the source file's size, modification time and
+    content hash. When the key matches, the records are read straight from
+    the cache without any parsing or validation. Otherwise the catalog is
+    loaded with loader(filename) and the cache is rewritten.
+
+    Args:
+        filename: Source data file
+        cache_dir: Directory holding the cache files
+        kind: "quests" or "items"
+        loader: Function that parses filename into a catalog dictionary
+
+    Returns: Catalog dictionary
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    if not os.path.exists(filename):
+        raise MissingDataFileError(f"Missing file: {filename}")
+
+    try:
+        fingerprint = file_fingerprint(filename)
+    except OSError:
+        raise CorruptedDataError(f"Error reading {kind} file")
+
+    cache_path = get_cache_path(filename, cache_dir, kind)
+
+    records = _read_cache(cache_path, fingerprint)
+    if records is not None:
+        return records
+
+    records = loader(filename)
+    _write_cache(cache_path, fingerprint, records)
+    return records
+
+def file_fingerprint(filename):
+    """
+    Fingerprint a data file for cache invalidation
+
+    Returns: Tuple of (size, mtime_ns, blake2b hex digest of the content)
+    Raises: OSError if the file cannot be read
+    """
+    stat = os.stat(filename)
+    digest = hashlib.blake2b(digest_size=16)
+
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+
+    return (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+
+def get_cache_path(filename, cache_dir, kind):
+    """
+    Get the cache file path for a data file
+
+    The absolute source path is hashed into the name so two catalogs with
+    the same file name never share a cache file.
+    """
+    source = os.path.abspath(filename).encode("utf-8")
+    tag = hashlib.blake2b(source, digest_size=8).hexdigest()
+    return os.path.join(cache_dir, f"{kind}-{tag}.cache")
+
+def _read_cache(cache_path, fingerprint):
+    """
+    Read records from a cache file
+
+    Returns: Catalog dictionary, or None if the cache is missing, stale
+             or unreadable
+    """
+    try:
+        with open(cache_path, "rb") as f:
+            header = pickle.load(f)
+            if header != {"version": CACHE_FORMAT_VERSION, "source": fingerprint}:
+                return None
+            return pickle.load(f)
+    except Exception:
+        # A broken cache is never fatal, the catalog is simply rebuilt
+        return None
+
+def _write_cache(cache_path, fingerprint, records):
+    """
+    Write records to a cache file
+
+    The file is written next to its final location and renamed into place
+    so a crash never leaves a half-written cache behind.
+    """
+    temp_path = cache_path + ".tmp"
+    header = {"version": CACHE_FORMAT_VERSION, "source": fingerprint}
+
+    try:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        with open(temp_path, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(records, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # Caching is an optimization only, loading already succeeded
+        pass
+
+# ============================================================================
+# INDEXED CATALOG
+# ============================================================================
+
+# Runs of non-blank lines, i.e. one record block each
+_BLOCK_PATTERN = re.compile(rb"(?:^[^\S\n]*\S[^\n]*(?:\n|\Z))+", re.MULTILINE)
+
+_ID_PATTERNS = {
+    "quests": re.compile(rb"^[ \t]*QUEST_ID: (.*?)\s*$", re.MULTILINE | re.IGNORECASE),
+    "items": re.compile(rb"^[ \t]*ITEM_ID: (.*?)\s*$", re.MULTILINE | re.IGNORECASE)
+}
+
+class CatalogIndex(Mapping):
+    """
+    Read-only catalog backed by a memory-mapped data file
+
+    An index of {record_id: (offset, length)} is built on first use and
+    saved in index_dir, so later opens of an unchanged file skip the scan.
+    A record is only parsed and validated the first time it is requested.
+    Works anywhere a quest or item dictionary is expected.
+    """
+
+    def __init__(self, filename, kind, index_dir=CACHE_DIRECTORY):
+        """
+        Open a catalog file
+
+        Args:
+            filename: Quest or item data file
+            kind: "quests" or "items"
+            index_dir: Directory for the saved index (None to not save it)
+
+        Raises: MissingDataFileError, CorruptedDataError
+        """
+        if kind not in _ID_PATTERNS:
+            raise ValueError(f"Unknown catalog kind: {kind}")
+        if not os.path.exists(filename):
+            raise MissingDataFileError(f"Missing file: {filename}")
+
+        self.filename = filename
+        self.kind = kind
+        self._records = {}
+
+        try:
+            stat = os.stat(filename)
+            with open(filename, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # mmap refuses empty files with ValueError
+            raise CorruptedDataError(f"{kind.capitalize()} file is empty or corrupted")
+
+        # The index is keyed by size and mtime only, hashing the whole file
+        # would cost as much as the scan the index is there to avoid
+        fingerprint = (stat.st_size, stat.st_mtime_ns)
+        index_path = None
+        index = None
+
+        if index_dir is not None:
+            index_path = get_cache_path(filename, index_dir, kind + "-index")
+            index = _read_cache(index_path, fingerprint)
+
+        if index is None:
+            index = self._build_index()
+            if index_path is not None:
+                _write_cache(index_path, fingerprint, index)
+
+        if not index:
+            self.close()
+            raise CorruptedDataError(f"{kind.capitalize()} file is empty or corrupted")
+
+        self._index = index
+
+    def _build_index(self):
+        """
+        Scan the mapped file for record blocks
+
+        A block with several id lines is keyed by the last one, which is
+        the id the record parser keeps.
+
+        Returns: Dictionary of {record_id: (offset, length)}
+        """
+        id_pattern = _ID_PATTERNS[self.kind]
+        index = {}
+
+        for block in _BLOCK_PATTERN.finditer(self._map):
+            start, end = block.span()
+            match = None
+            for match in id_pattern.finditer(self._map, start, end):
+                pass
+            if match is None:
+                raise InvalidDataFormatError(
+                    f"Record at byte {start} of {self.filename} has no id"
+                )
+            index[match.group(1).decode("utf-8")] = (start, end - start)
+
+        return index
+
+    def __getitem__(self, record_id):
+        record = self._records.get(record_id)
+        if record is not None:
+            return record
+
+        offset, length = self._index[record_id]
+        try:
+            text = self._map[offset:offset + length].decode("utf-8")
+        except UnicodeDecodeError:
+            raise CorruptedDataError(f"Record '{record_id}' is not valid UTF-8")
+
+        lines = [line.strip() for line in text.split("\n") if line.strip()]
+        parse_record = _parse_quest_record if self.kind == "quests" else _parse_item_record
+        try:
+            record = parse_record(lines)
+        except InvalidDataFormatError:
+            # Only count lines on the error path, so the message is exact
+            first_line = self._map[:offset].count(b"\n") + 1
+            record = parse_record(lines, first_line)
+
+        self._records[record_id] = record
+        return record
+
+    def __contains__(self, record_id):
+        return record_id in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def close(self):
+        """Release the memory map"""
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -310,6 +754,502 @@ def parse_item_block(lines):
     return item
     # TODO: Implement parsing logic
 
+def _iter_blocks(filename, record_name):
+    """
+    Read a data file line by line and yield one block of lines at a time
+
+    Blocks are separated by blank lines. Lines are stripped and blank
+    lines are never included in a block.
+
+    Args:
+        filename: Path of the data file
+        record_name: "quest" or "item", used in error messages
+
+    Yields: Tuple of (starting line number, list of lines)
+    Raises: MissingDataFileError, CorruptedDataError
+    """
+    if not os.path.exists(filename):
+        raise MissingDataFileError(f"Missing file: {filename}")
+
+    found_block = False
+    start = 0
+    lines = []
+
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if line:
+                    if not lines:
+                        start = line_number
+                    lines.append(line)
+                elif lines:
+                    found_block = True
+                    yield start, lines
+                    lines = []
+    except (OSError, UnicodeDecodeError):
+        raise CorruptedDataError(f"Error reading {record_name}s file")
+
+    if lines:
+        found_block = True
+        yield start, lines
+
+    if not found_block:
+        raise CorruptedDataError(
+            f"{record_name.capitalize()} file is empty or corrupted"
+        )
+
+# ============================================================================
+# RECORD SCHEMAS
+# ============================================================================
+
+def _prerequisite(value):
+    """Normalize any spelling of NONE to "NONE" """
+    return "NONE" if value.upper() == "NONE" else value
+
+# Parsed effect strings, shared between items since the tuples are
+# immutable. Catalogs repeat a small number of distinct effects.
+_effect_cache = {}
+EFFECT_CACHE_LIMIT = 4096
+
+def parse_effects(effect_string):
+    """
+    Parse an item effect string into (stat_name, value) pairs
+
+    Example: "strength:5,magic:2" → (("strength", 5), ("magic", 2))
+
+    Returns: Tuple of (stat_name, value) tuples
+    Raises: ValueError if the string is not in "stat:value[,stat:value]" form
+    """
+    effects = _effect_cache.get(effect_string)
+    if effects is not None:
+        return effects
+
+    effects = []
+    for part in effect_string.split(","):
+        stat, separator, value = part.partition(":")
+        stat = stat.strip()
+        if not separator or not stat:
+            raise ValueError(f"Invalid effect: {effect_string}")
+        effects.append((sys.intern(stat), int(value)))
+    effects = tuple(effects)
+
+    if len(_effect_cache) < EFFECT_CACHE_LIMIT:
+        _effect_cache[effect_string] = effects
+    return effects
+
+# Field name -> converter. None keeps the text as is and a tuple lists the
+# only accepted values. Every field is required.
+QUEST_SCHEMA = {
+    "quest_id": None,
+    "title": None,
+    "description": None,
+    "reward_xp": int,
+    "reward_gold": int,
+    "required_level": int,
+    "prerequisite": _prerequisite
+}
+
+ITEM_SCHEMA = {
+    "item_id": None,
+    "name": None,
+    "type": ("weapon", "armor", "consumable"),
+    "effect": None,
+    "cost": int,
+    "description": None
+}
+
+def compile_record_parser(record_name, schema, derived=None):
+    """
+    Build a parser function for one record type
+
+    The returned parse(lines, first_line) does the work of parse_*_block
+    and validate_*_data in a single pass. The generated fast path matches
+    a whole block laid out in schema order with one regular expression and
+    builds the dictionary with the converters inlined. Any other block
+    (keys in another order or case, extra keys, bad values) goes through
+    a line-by-line loop that maps keys with a dictionary lookup and reports
+    the exact line of an error. Both paths give the same result as
+    parse_*_block followed by validate_*_data, plus any derived fields.
+
+    Args:
+        record_name: "quest" or "item", used in error messages
+        schema: Dictionary of {field_name: converter or None}
+        derived: Dictionary of {new_field: (source_field, function)} for
+                 fields computed from another field's value
+
+    Returns: Function taking (lines, first_line) and returning a dictionary
+    Raises (from the function): InvalidDataFormatError with the line number
+    """
+    derived = derived or {}
+    fields = {}
+    for field, converter in schema.items():
+        fields[field.upper()] = (field, converter)
+    required = frozenset(schema)
+
+    def parse_lines(lines, first_line):
+        record = {}
+        field_lines = {}
+        line_number = first_line
+
+        for line in lines:
+            key, separator, value = line.partition(": ")
+            if not separator:
+                raise InvalidDataFormatError(
+                    f"Line {line_number}: invalid {record_name} line: {line}"
+                )
+
+            spec = fields.get(key)
+            if spec is None:
+                key = key.strip()
+                spec = fields.get(key.upper(), (key.lower(), None))
+            field, converter = spec
+
+            value = value.strip()
+            if type(converter) is tuple:
+                if value not in converter:
+                    raise InvalidDataFormatError(
+                        f"Line {line_number}: invalid {field} value: {value}"
+                    )
+            elif converter is not None:
+                try:
+                    value = converter(value)
+                except ValueError:
+                    raise InvalidDataFormatError(
+                        f"Line {line_number}: invalid {field} value: {value}"
+                    )
+
+            record[field] = value
+            field_lines[field] = line_number
+            line_number += 1
+
+        if not required <= record.keys():
+            missing = next(f for f in schema if f not in record)
+            raise InvalidDataFormatError(
+                f"Line {first_line}: missing {record_name} field: {missing}"
+            )
+
+        for field, (source, function) in derived.items():
+            try:
+                record[field] = function(record[source])
+            except ValueError:
+                raise InvalidDataFormatError(
+                    f"Line {field_lines[source]}: invalid {source} value: {record[source]}"
+                )
+
+        return record
+
+    block_pattern = "\n".join(
+        re.escape(field.upper()) + r": [^\S\n]*(.*)" for field in schema
+    )
+    namespace = {
+        "block_pattern": re.compile(block_pattern),
+        "parse_lines": parse_lines
+    }
+
+    values = []
+    for position, (field, converter) in enumerate(schema.items()):
+        name = f"value_{position}"
+        if converter is None:
+            values.append(f"{field!r}: {name}")
+        elif type(converter) is tuple:
+            # A lookup in {choice: choice} raises KeyError for anything else
+            namespace[f"choices_{position}"] = {choice: choice for choice in converter}
+            values.append(f"{field!r}: choices_{position}[{name}]")
+        else:
+            namespace[f"convert_{position}"] = converter
+            values.append(f"{field!r}: convert_{position}({name})")
+
+    positions = {field: position for position, field in enumerate(schema)}
+    for field, (source, function) in derived.items():
+        namespace[f"derive_{field}"] = function
+        values.append(f"{field!r}: derive_{field}(value_{positions[source]})")
+
+    source = (
+        "def parse_record(lines, first_line=1):\n"
+        "    match = block_pattern.fullmatch('\\n'.join(lines))\n"
+        "    if match is not None:\n"
+        f"        {', '.join(f'value_{i}' for i in range(len(schema)))}, = match.groups()\n"
+        "        try:\n"
+        f"            return {{{', '.join(values)}}}\n"
+        "        except (ValueError, KeyError):\n"
+        "            pass\n"
+        "    return parse_lines(lines, first_line)\n"
+    )
+    exec(source, namespace)
+
+    return namespace["parse_record"]
+
+_parse_quest_record = compile_record_parser("quest", QUEST_SCHEMA)
+_parse_item_record = compile_record_parser(
+    "item", ITEM_SCHEMA, derived={"effects": ("effect", parse_effects)}
+)
+
+# ============================================================================
+# RECORD TYPES
+# ============================================================================
+
+class CatalogRecord(Mapping):
+    """
+    Base class for compact catalog records
+
+    Fields live in __slots__ rather than a per-record dictionary, which
+    saves most of the memory of a large catalog. Records still read like
+    the loader dictionaries (record["cost"], record.get("name"),
+    "title" in record), so quest_handler and inventory_system accept
+    either form. Keys that are not part of the schema are kept in extra.
+    """
+    __slots__ = ("extra",)
+    _fields = ()
+    _field_set = frozenset()
+
+    @classmethod
+    def from_dict(cls, record):
+        """Build a record from a parsed dictionary"""
+        values = [record[field] for field in cls._fields]
+        extra = None
+        if len(record) > len(cls._fields):
+            extra = {k: v for k, v in record.items() if k not in cls._field_set}
+        return cls(*values, extra)
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self._field_set or (self.extra is not None and key in self.extra)
+
+    def __iter__(self):
+        yield from self._fields
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self):
+        return len(self._fields) + (len(self.extra) if self.extra else 0)
+
+    def __reduce__(self):
+        values = tuple(getattr(self, field) for field in self._fields)
+        return (self.__class__, values + (self.extra,))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({dict(self)!r})"
+
+class Quest(CatalogRecord):
+    """Compact quest record, see CatalogRecord"""
+    __slots__ = tuple(QUEST_SCHEMA)
+    _fields = __slots__
+    _field_set = frozenset(__slots__)
+
+    def __init__(self, quest_id, title, description, reward_xp,
+                 reward_gold, required_level, prerequisite, extra=None):
+        # Ids are interned so prerequisites share storage with the quest
+        # they point to
+        self.quest_id = sys.intern(quest_id)
+        self.title = title
+        self.description = description
+        self.reward_xp = reward_xp
+        self.reward_gold = reward_gold
+        self.required_level = required_level
+        self.prerequisite = sys.intern(prerequisite)
+        self.extra = extra
+
+class Item(CatalogRecord):
+    """Compact item record, see CatalogRecord"""
+    __slots__ = tuple(ITEM_SCHEMA) + ("effects",)
+    _fields = __slots__
+    _field_set = frozenset(__slots__)
+
+    def __init__(self, item_id, name, type, effect, cost, description,
+                 effects, extra=None):
+        self.item_id = sys.intern(item_id)
+        self.name = name
+        self.type = sys.intern(type)
+        self.effect = effect
+        self.cost = cost
+        self.description = description
+        self.effects = effects
+        self.extra = extra
+
+# ============================================================================
+# COLUMNAR ITEM CATALOG
+# ============================================================================
+
+ITEM_TYPES = ("weapon", "armor", "consumable")
+
+class ItemColumns:
+    """
+    Column view of an item catalog for shop queries
+
+    Cost, type, effect stat and effect value are stored as one array each
+    (NumPy when installed, otherwise the array module), so filtering and
+    sorting the whole catalog is done per column instead of per item.
+    Queries return lists of item IDs.
+    """
+
+    def __init__(self, items):
+        """
+        Build the columns from a loaded item catalog
+
+        Args:
+            items: Dictionary of {item_id: item_data} from load_items
+        """
+        self.ids = list(items)
+        self.stats = []
+        stat_codes = {}
+        type_codes = {item_type: code for code, item_type in enumerate(ITEM_TYPES)}
+
+        costs = array("q")
+        types = array("b")
+        stats = array("q")
+        values = array("q")
+
+        for item in items.values():
+            stat, value = _first_effect(item)
+            if stat not in stat_codes:
+                stat_codes[stat] = len(self.stats)
+                self.stats.append(stat)
+            costs.append(item["cost"])
+            types.append(type_codes[item["type"]])
+            stats.append(stat_codes[stat])
+            values.append(value)
+
+        self._type_codes = type_codes
+        self._stat_codes = stat_codes
+
+        if numpy is not None:
+            self._id_array = numpy.array(self.ids, dtype=object)
+            costs = numpy.frombuffer(costs, dtype=numpy.int64)
+            types = numpy.frombuffer(types, dtype=numpy.int8)
+            stats = numpy.frombuffer(stats, dtype=numpy.int64)
+            values = numpy.frombuffer(values, dtype=numpy.int64)
+
+        self.cost = costs
+        self.type_code = types
+        self.stat_code = stats
+        self.effect_value = values
+
+    def __len__(self):
+        return len(self.ids)
+
+    def filter(self, item_type=None, stat=None, min_cost=None, max_cost=None):
+        """
+        Get the IDs of items matching every given condition
+
+        Returns: List of item IDs in catalog order
+        """
+        return self._to_ids(self._select(item_type, stat, min_cost, max_cost))
+
+    def affordable(self, gold, item_type=None):
+        """Get the IDs of items costing at most gold, cheapest first"""
+        return self.sort_by_cost(item_type=item_type, max_cost=gold)
+
+    def sort_by_cost(self, item_type=None, stat=None, max_cost=None, descending=False):
+        """
+        Get matching item IDs ordered by cost
+
+        Items with equal cost keep their catalog order.
+        """
+        rows = self._select(item_type, stat, None, max_cost)
+
+        if numpy is not None:
+            keys = self.cost[rows]
+            order = numpy.argsort(-keys if descending else keys, kind="stable")
+            return self._to_ids(rows[order])
+
+        cost = self.cost
+        rows.sort(key=lambda row: -cost[row] if descending else cost[row])
+        return self._to_ids(rows)
+
+    def top_k(self, k, by="cost", item_type=None, stat=None, max_cost=None):
+        """
+        Get the k matching items with the highest cost or effect value
+
+        Args:
+            k: Number of items to return
+            by: "cost" or "effect_value"
+
+        Returns: List of up to k item IDs, highest first, items with equal
+                 values in catalog order
+        """
+        if by not in ("cost", "effect_value"):
+            raise ValueError(f"Cannot rank items by {by}")
+        column = getattr(self, by)
+        rows = self._select(item_type, stat, None, max_cost)
+
+        if k <= 0 or len(rows) == 0:
+            return []
+
+        if numpy is not None:
+            keys = -column[rows]
+            if k < len(rows):
+                # argpartition picks arbitrary rows among ties with the k-th
+                # value, so take every better row and the first tied ones
+                kth = numpy.partition(keys, k - 1)[k - 1]
+                better = numpy.flatnonzero(keys < kth)
+                tied = numpy.flatnonzero(keys == kth)[:k - len(better)]
+                chosen = numpy.concatenate((better, tied))
+                rows, keys = rows[chosen], keys[chosen]
+            # rows are in catalog order, so they break ties
+            return self._to_ids(rows[numpy.lexsort((rows, keys))])
+
+        rows.sort(key=lambda row: -column[row])
+        return self._to_ids(rows[:k])
+
+    def _select(self, item_type, stat, min_cost, max_cost):
+        """
+        Find the rows matching the given conditions
+
+        Returns: Row numbers (a NumPy array or a list)
+        """
+        type_code = None if item_type is None else self._type_codes.get(item_type, -1)
+        stat_code = None if stat is None else self._stat_codes.get(stat, -1)
+
+        if numpy is not None:
+            mask = numpy.ones(len(self.ids), dtype=bool)
+            if type_code is not None:
+                mask &= self.type_code == type_code
+            if stat_code is not None:
+                mask &= self.stat_code == stat_code
+            if min_cost is not None:
+                mask &= self.cost >= min_cost
+            if max_cost is not None:
+                mask &= self.cost <= max_cost
+            return numpy.flatnonzero(mask)
+
+        rows = range(len(self.ids))
+        if type_code is not None:
+            rows = [row for row in rows if self.type_code[row] == type_code]
+        if stat_code is not None:
+            rows = [row for row in rows if self.stat_code[row] == stat_code]
+        if min_cost is not None:
+            rows = [row for row in rows if self.cost[row] >= min_cost]
+        if max_cost is not None:
+            rows = [row for row in rows if self.cost[row] <= max_cost]
+        return list(rows)
+
+    def _to_ids(self, rows):
+        """Turn row numbers into item IDs"""
+        if numpy is not None:
+            return self._id_array[rows].tolist()
+        return [self.ids[row] for row in rows]
+
+def _first_effect(item):
+    """
+    Get an item's first (stat_name, value) effect
+
+    Only the first stat of a multi-stat effect is used for the columns.
+    """
+    effects = item.get("effects")
+    if effects is None:
+        try:
+            effects = parse_effects(item["effect"])
+        except ValueError:
+            return "", 0
+    return effects[0]
+
 # ============================================================================
 # TESTING
 # ============================================================================
@@ -9,6 +9,8 @@ AI Usage: used to check for errors]
 This module handles inventory management, item usage, and equipment.
 """
 
+import character_manager
+import game_data
 from custom_exceptions import (
     InventoryFullError,
     ItemNotFoundError,
@@ -40,6 +42,7 @@ def add_item_to_inventory(character, item_id):
         raise InventoryFullError("Inventory is full.")
 
     inventory.append(item_id)
+    character_manager.mark_dirty(character)
     return True
     # TODO: Implement adding items
     # Check if inventory is full (>= MAX_INVENTORY_SIZE)
@@ -62,6 +65,7 @@ def remove_item_from_inventory(character, item_id):
         raise ItemNotFoundError(f"Item '{item_id}' not in inventory.")
 
     inventory.remove(item_id)
+    character_manager.mark_dirty(character)
     return True
     # TODO: Implement item removal
     # Check if item exists in inventory
@@ -103,6 +107,7 @@ def clear_inventory(character):
     """
     removed_items = character.get("inventory", []).copy()
     character["inventory"] = []
+    character_manager.mark_dirty(character)
     return removed_items
     # TODO: Implement inventory clearing
     # Save current inventory before clearing
@@ -136,14 +141,15 @@ def use_item(character, item_id, item_data):
     if item_data["type"] != "consumable":
         raise InvalidItemTypeError(f"{item_id} is not a consumable.")
 
-    stat, value = parse_item_effect(item_data["effect"])
+    effects = get_item_effects(item_data)
 
-    apply_stat_effect(character, stat, value)
+    apply_item_effects(character, effects)
 
     remove_item_from_inventory(character, item_id)
 
     item_name = item_data.get("name", item_id)
-    return f"Used {item_name} and gained {value} {stat}."
+    gained = ", ".join(f"{value} {stat}" for stat, value in effects)
+    return f"Used {item_name} and gained {gained}."
     # TODO: Implement item usage
     # Check if character has the item
     # Check if item type is 'consumable'
@@ -181,16 +187,15 @@ def equip_weapon(character, item_id, item_data):
         old_weapon_id = character["equipped_weapon"]
         old_weapon_data = character["item_data"][old_weapon_id]
 
-        stat, value = parse_item_effect(old_weapon_data["effect"])
-        apply_stat_effect(character, stat, -value)
+        apply_item_effects(character, get_item_effects(old_weapon_data), -1)
 
         add_item_to_inventory(character, old_weapon_id)
 
-    stat, value = parse_item_effect(item_data["effect"])
-    apply_stat_effect(character, stat, value)
+    apply_item_effects(character, get_item_effects(item_data))
 
     character["equipped_weapon"] = item_id
     remove_item_from_inventory(character, item_id)
+    character_manager.mark_dirty(character)
 
     weapon_name = item_data.get("name", item_id)
     return f"Equipped weapon: {weapon_name}"
@@ -232,17 +237,16 @@ def equip_armor(character, item_id, item_data):
         old_armor_id = character["equipped_armor"]
         old_armor_data = character["item_data"][old_armor_id]
 
-        stat, value = parse_item_effect(old_armor_data["effect"])
-        apply_stat_effect(character, stat, -value)
+        apply_item_effects(character, get_item_effects(old_armor_data), -1)
 
         add_item_to_inventory(character, old_armor_id)
 
         # Equip new armor
-    stat, value = parse_item_effect(item_data["effect"])
-    apply_stat_effect(character, stat, value)
+    apply_item_effects(character, get_item_effects(item_data))
 
     character["equipped_armor"] = item_id
     remove_item_from_inventory(character, item_id)
+    character_manager.mark_dirty(character)
 
     armor_name = item_data.get("name", item_id)
     return f"Equipped armor: {armor_name}"
@@ -262,14 +266,14 @@ def unequip_weapon(character):
     weapon_id = character["equipped_weapon"]
     weapon_data = character["item_data"][weapon_id]
 
-    stat, value = parse_item_effect(weapon_data["effect"])
-    apply_stat_effect(character, stat, -value)
+    apply_item_effects(character, get_item_effects(weapon_data), -1)
 
     if get_inventory_space_remaining(character) == 0:
         raise InventoryFullError("No space to unequip weapon.")
 
     add_item_to_inventory(character, weapon_id)
     character["equipped_weapon"] = None
+    character_manager.mark_dirty(character)
 
     return weapon_id
     # TODO: Implement weapon unequipping
@@ -291,14 +295,14 @@ def unequip_armor(character):
     armor_id = character["equipped_armor"]
     armor_data = character["item_data"][armor_id]
 
-    stat, value = parse_item_effect(armor_data["effect"])
-    apply_stat_effect(character, stat, -value)
+    apply_item_effects(character, get_item_effects(armor_data), -1)
 
     if get_inventory_space_remaining(character) == 0:
         raise InventoryFullError("No space to unequip armor.")
 
     add_item_to_inventory(character, armor_id)
     character["equipped_armor"] = None
+    character_manager.mark_dirty(character)
 
     return armor_id
     # TODO: Implement armor unequipping
@@ -331,6 +335,7 @@ def purchase_item(character, item_id, item_data):
 
     character["gold"] -= cost
     add_item_to_inventory(character, item_id)
+    character_manager.mark_dirty(character)
 
     return True
     # TODO: Implement purchasing
@@ -358,6 +363,7 @@ def sell_item(character, item_id, item_data):
 
     remove_item_from_inventory(character, item_id)
     character["gold"] += price
+    character_manager.mark_dirty(character)
 
     return price
     # TODO: Implement selling
@@ -389,6 +395,41 @@ def parse_item_effect(effect_string):
     # Split on ":"
     # Convert value to integer
 
+def parse_item_effects(effect_string):
+    """
+    Parse an effect string that may list several stats
+
+    Example: "strength:5,magic:2" → (("strength", 5), ("magic", 2))
+
+    Returns: Tuple of (stat_name, value) tuples
+    Raises: InvalidItemTypeError if the format is wrong
+    """
+    try:
+        return game_data.parse_effects(effect_string)
+    except ValueError:
+        raise InvalidItemTypeError("Invalid effect format.")
+
+def get_item_effects(item_data):
+    """
+    Get an item's effects as (stat_name, value) pairs
+
+    Items from game_data.load_items carry them pre-parsed under "effects".
+    Item dictionaries built by hand fall back to parsing "effect".
+    """
+    effects = item_data.get("effects")
+    if effects is None:
+        effects = parse_item_effects(item_data["effect"])
+    return effects
+
+def apply_item_effects(character, effects, sign=1):
+    """
+    Apply every (stat_name, value) effect to character
+
+    Use sign=-1 to remove the bonuses again when unequipping.
+    """
+    for stat, value in effects:
+        apply_stat_effect(character, stat, sign * value)
+
 def apply_stat_effect(character, stat_name, value):
     """
     Apply a stat modification to character
@@ -405,6 +446,7 @@ def apply_stat_effect(character, stat_name, value):
     # Cap health at max_health
     if stat_name == "health":
         character["health"] = min(character["health"], character.get("max_health", 9999))
+    character_manager.mark_dirty(character)
     # TODO: Implement stat application
     # Add value to character[stat_name]
     # If stat is health, ensure it doesn't exceed max_health
@@ -0,0 +1,116 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Level Curve Module
+
+Experience needed for each level. Cumulative thresholds are precomputed
+so the level reached from any amount of experience is found by binary
+search (or directly, for the default curve) instead of by stepping
+through every level.
+"""
+
+import bisect
+import math
+
+# Going from level L to L + 1 takes L * LEVEL_XP_STEP experience by default
+LEVEL_XP_STEP = 100
+
+# ============================================================================
+# LEVEL CURVES
+# ============================================================================
+
+class LevelCurve:
+    """
+    Experience requirements given as a function of level
+
+    Total experience needed to reach each level from level 1 is kept in a
+    table, which doubles in length whenever a larger total is looked up.
+    """
+
+    def __init__(self, xp_to_next, initial_levels=128):
+        """
+        Args:
+            xp_to_next: Function giving the (positive) experience needed
+                        to go from a level to the next
+        """
+        self.xp_to_next = xp_to_next
+        # _thresholds[i] is the total experience needed to reach level i + 1
+        self._thresholds = [0]
+        self._extend(initial_levels)
+
+    def _extend(self, levels):
+        """Grow the threshold table to cover at least levels levels"""
+        thresholds = list(self._thresholds)
+        while len(thresholds) < levels:
+            thresholds.append(thresholds[-1] + self.xp_to_next(len(thresholds)))
+        # Swapped in whole, so lookups on other threads never see a partial table
+        self._thresholds = thresholds
+
+    def threshold(self, level):
+        """Get the total experience needed to reach level from level 1"""
+        if level > len(self._thresholds):
+            self._extend(max(level, 2 * len(self._thresholds)))
+        return self._thresholds[level - 1]
+
+    def level_for(self, total_xp):
+        """
+        Get the level reached with total_xp experience earned from level 1
+
+        Returns: (level, experience earned towards the next level)
+        Raises: ValueError if total_xp is negative
+        """
+        if total_xp < 0:
+            raise ValueError(f"Experience cannot be negative: {total_xp}")
+        thresholds = self._thresholds
+        while thresholds[-1] <= total_xp:
+            self._extend(2 * len(thresholds))
+            thresholds = self._thresholds
+        level = bisect.bisect_right(thresholds, total_xp)
+        return level, total_xp - thresholds[level - 1]
+
+class LinearLevelCurve(LevelCurve):
+    """
+    Curve where going from level L to L + 1 takes L * step experience
+
+    The thresholds step * L * (L - 1) / 2 are inverted directly, so no
+    table is kept however high the level.
+    """
+
+    def __init__(self, step=LEVEL_XP_STEP):
+        self.step = step
+        self.xp_to_next = lambda level: level * step
+
+    def threshold(self, level):
+        return self.step * level * (level - 1) // 2
+
+    def level_for(self, total_xp):
+        if total_xp < 0:
+            raise ValueError(f"Experience cannot be negative: {total_xp}")
+        # Largest L with L * (L - 1) / 2 <= total_xp // step
+        steps = int(total_xp // self.step)
+        level = (1 + math.isqrt(1 + 8 * steps)) // 2
+        return level, total_xp - self.threshold(level)
+
+# ============================================================================
+# CLASS CURVES
+# ============================================================================
+
+DEFAULT_LEVEL_CURVE = LinearLevelCurve()
+
+# Curves for classes that don't use DEFAULT_LEVEL_CURVE
+_class_curves = {}
+
+def set_class_curve(character_class, curve):
+    """
+    Use curve for every character of character_class
+
+    Args:
+        curve: A LevelCurve, or None to go back to DEFAULT_LEVEL_CURVE
+    """
+    if curve is None:
+        _class_curves.pop(character_class, None)
+    else:
+        _class_curves[character_class] = curve
+
+def get_class_curve(character_class):
+    """Get the level curve characters of character_class follow"""
+    return _class_curves.get(character_class, DEFAULT_LEVEL_CURVE)
@@ -10,6 +10,9 @@ This is the main game file that ties all modules together.
 Demonstrates module integration and complete game flow.
 """
 
+import os
+import argparse
+
 # Import all our custom modules
 import character_manager
 import inventory_system
@@ -26,8 +29,15 @@ from custom_exceptions import *
 current_character = None
 all_quests = {}
 all_items = {}
+item_columns = None
 game_running = False
 
+# Background writer used by save_game, started by main()
+save_service = None
+
+# Set by main() with --journal: saves append changed fields to a journal
+journal_saver = None
+
 # ============================================================================
 # MAIN MENU
 # ============================================================================
@@ -71,6 +81,10 @@ def new_game():
     """
     global current_character
 
+    # A queued save of an earlier character with the same name must not
+    # land after (and overwrite) the new character's first save
+    flush_saves()
+
     print("\n=== NEW GAME ===")
     name = input("Enter character name: ").strip()
     
@@ -118,15 +132,21 @@ def load_game():
     """
     global current_character, all_items, all_quests
 
+    # Queued saves must reach disk before anything is read back
+    flush_saves()
+
     print("\n=== LOAD GAME ===")
-    saves = character_manager.list_saved_characters()
+    saves = character_manager.list_saved_character_summaries()
     if not saves:
         print("No saved characters found.")
         return None
 
     print("Saved characters:")
     for idx, s in enumerate(saves, start=1):
-        print(f"{idx}) {s}")
+        if s["class"]:
+            print(f"{idx}) {s['name']} - Level {s['level']} {s['class']}")
+        else:
+            print(f"{idx}) {s['name']} (unreadable save)")
 
     while True:
         choice = input(f"Select character (1-{len(saves)}) or 'b' to go back: ").strip()
@@ -138,12 +158,15 @@ def load_game():
 
         idx = int(choice)
         if 1 <= idx <= len(saves):
-            selected = saves[idx - 1]
+            selected = saves[idx - 1]["name"]
             break
         print("Invalid")
 
     try:
-        loaded = character_manager.load_character(selected)
+        if journal_saver is not None:
+            loaded = journal_saver.load(selected)
+        else:
+            loaded = character_manager.load_character(selected)
     except CharacterNotFoundError:
         print("Save file not found.")
         return None
@@ -207,9 +230,16 @@ def game_loop():
                 print("Invalid choice.")
         except CharacterDeadError:
             handle_character_death()
+        except (InvalidDataFormatError, CorruptedDataError):
+            # Catalogs are parsed on first use, so bad data files surface
+            # here: keep the character's progress and let main() report it
+            save_game()
+            game_running = False
+            raise
         except Exception as e:
             print(f"An error occurred: {e}")
 
+        # Skipped when the action didn't change the character
         try:
             save_game()
         except Exception as e:
@@ -502,17 +532,21 @@ def explore():
 
 def shop():
     """Shop menu for buying/selling items"""
-    global current_character, all_items
+    global current_character, all_items, item_columns
     
     if not current_character:
         print("No character loaded.")
         return
 
+    if item_columns is None:
+        item_columns = game_data.ItemColumns(all_items)
+    # Listed in catalog order, as before the columns existed
+    ids = item_columns.filter()
+
     while True:
         print("\n=== SHOP ===")
         print(f"Gold: {current_character.get('gold', 0)}")
         print("Available items:")
-        ids = list(all_items.keys())
         for idx, iid in enumerate(ids, start=1):
             it = all_items[iid]
             print(f"{idx}) {it['name']} (id: {iid}) - Cost: {it.get('cost',0)}")
@@ -562,15 +596,32 @@ def shop():
 # HELPER FUNCTIONS
 # ============================================================================
 
+def report_data_error(error):
+    """Tell the player the game data files can't be used"""
+    print(f"Error loading game data: {error}")
+    print("Check data files for errors.")
+
 def save_game():
-    """Save current game state"""
+    """
+    Save current game state if it changed since the last save
+
+    In journal mode only the changed fields are appended to the
+    character's journal. Otherwise, with a save service running, the
+    save is written in the background.
+    """
     global current_character
     
     if not current_character:
         return
 
     try:
-        character_manager.save_character(current_character)
+        if journal_saver is not None:
+            if character_manager.is_dirty(current_character):
+                journal_saver.save(current_character)
+        elif save_service is None:
+            character_manager.autosave_character(current_character)
+        elif character_manager.is_dirty(current_character):
+            save_service.submit(current_character)
     except Exception as e:
         print(f"Warning: failed to save game: {e}")
     
@@ -578,13 +629,48 @@ def save_game():
     # Use character_manager.save_character()
     # Handle any file I/O exceptions
 
-def load_game_data():
-    """Load all quest and item data from files"""
-    global all_quests, all_items
+def flush_saves():
+    """Wait for background saves to be written, warning about failures"""
+    if save_service is None:
+        return
+    try:
+        save_service.flush()
+    except SaveFileCorruptedError as e:
+        print(f"Warning: {e}")
+
+def load_game_data(workers=None):
+    """
+    Load all quest and item data from files
+
+    Shard directories (data/quests.d, data/items.d) are used in place of
+    the single data files when they exist, parsed by `workers` processes.
+    The catalogs are lazy: files are only parsed when first used, so
+    sessions that never touch them start without parsing anything. Parse
+    errors therefore surface during play, where game_loop() and main()
+    report them.
+    """
+    global all_quests, all_items, item_columns
     
     try:
-        all_quests = game_data.load_quests()
-        all_items = game_data.load_items()
+        if os.path.isdir(game_data.QUEST_SHARD_DIRECTORY):
+            all_quests = game_data.LazyCatalog(
+                game_data.load_quest_shards, game_data.QUEST_SHARD_DIRECTORY,
+                workers=workers
+            )
+        else:
+            all_quests = game_data.lazy_quests(cache_dir=game_data.CACHE_DIRECTORY)
+
+        if os.path.isdir(game_data.ITEM_SHARD_DIRECTORY):
+            all_items = game_data.LazyCatalog(
+                game_data.load_item_shards, game_data.ITEM_SHARD_DIRECTORY,
+                workers=workers
+            )
+        else:
+            all_items = game_data.lazy_items(cache_dir=game_data.CACHE_DIRECTORY)
+
+        # Built by the shop on first visit, so the items stay unparsed
+        # until something needs them
+        item_columns = None
         return True   # REQUIRED by autograder
     except MissingDataFileError:
         raise
@@ -624,6 +710,7 @@ def handle_character_death():
             else:
                 try:
                     current_character["gold"] = gold - revive_cost
+                    character_manager.mark_dirty(current_character)
                     revived = character_manager.revive_character(current_character)
                     if revived:
                         print("You were revived!")
@@ -659,38 +746,83 @@ def display_welcome():
 # MAIN EXECUTION
 # ============================================================================
 
-def main():
+def parse_arguments(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Quest Chronicles")
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="processes used to parse sharded catalogs (default: one per CPU)"
+    )
+    parser.add_argument(
+        "--journal", action="store_true",
+        help="save by appending changed fields to a journal per character"
+    )
+    parser.add_argument(
+        "--save-format", default=character_manager.SAVE_FORMAT_TEXT,
+        choices=[
+            character_manager.SAVE_FORMAT_TEXT, character_manager.SAVE_FORMAT_BINARY,
+            character_manager.SAVE_FORMAT_ZLIB, character_manager.SAVE_FORMAT_LZMA
+        ],
+        help="format new saves are written in (zlib loads the catalogs on the first save)"
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main game execution function"""
+    global save_service, journal_saver
+    options = parse_arguments(argv)
     
     # Display welcome message
     display_welcome()
     
     # Load game data
     try:
-        load_game_data()
+        load_game_data(options.workers)
         print("Game data loaded successfully!")
     except MissingDataFileError:
         print("Creating default game data...")
         game_data.create_default_data_files()
-        load_game_data()
-    except InvalidDataFormatError as e:
-        print(f"Error loading game data: {e}")
-        print("Check data files for errors.")
+        load_game_data(options.workers)
+    except (InvalidDataFormatError, CorruptedDataError) as e:
+        report_data_error(e)
         return
     
+    if options.save_format == character_manager.SAVE_FORMAT_ZLIB:
+        # Compress saves against the ids they are made of, built on the
+        # first save so the lazy catalogs aren't parsed at startup
+        character_manager.register_save_dictionary(
+            lambda: character_manager.build_save_dictionary(all_items, all_quests)
+        )
+
+    save_service = character_manager.SaveService(save_format=options.save_format)
+    if options.journal:
+        journal_saver = character_manager.JournalSaver(save_format=options.save_format)
+
     # Main menu loop
-    while True:
-        choice = main_menu()
-        
-        if choice == 1:
-            new_game()
-        elif choice == 2:
-            load_game()
-        elif choice == 3:
-            print("\nThanks for playing Quest Chronicles!")
-            break
-        else:
-            print("Invalid. Need to select 1-3.")
+    try:
+        while True:
+            choice = main_menu()
+            
+            if choice == 1:
+                new_game()
+            elif choice == 2:
+                load_game()
+            elif choice == 3:
+                print("\nThanks for playing Quest Chronicles!")
+                break
+            else:
+                print("Invalid. Need to select 1-3.")
+    except (InvalidDataFormatError, CorruptedDataError) as e:
+        # The catalogs are lazy, so bad data files are found on first use
+        report_data_error(e)
+    finally:
+        # Nothing queued may be lost on exit, even after Ctrl+C
+        try:
+            save_service.shutdown()
+        except SaveFileCorruptedError as e:
+            print(f"Warning: {e}")
+        save_service = None
+        journal_saver = None
 
 if __name__ == "__main__":
     main()
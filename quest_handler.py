@@ -9,6 +9,7 @@ AI Usage: used to chcek for errors
 This module handles quest management, dependencies, and completion.
 """
 
+import character_manager
 from custom_exceptions import (
     QuestNotFoundError,
     QuestRequirementsNotMetError,
@@ -66,6 +67,7 @@ def accept_quest(character, quest_id, quest_data_dict):
         )
 
     character["active_quests"].append(quest_id)
+    character_manager.mark_dirty(character)
     return True
 
     # TODO: Implement quest acceptance
@@ -110,6 +112,7 @@ def complete_quest(character, quest_id, quest_data_dict):
 
     character["experience"] += xp_reward
     character["gold"] += gold_reward
+    character_manager.mark_dirty(character)
 
     return {"xp": xp_reward, "gold": gold_reward}
 
@@ -133,6 +136,7 @@ def abandon_quest(character, quest_id):
         raise QuestNotActiveError(f"Quest '{quest_id}' is not active.")
 
     character["active_quests"].remove(quest_id)
+    character_manager.mark_dirty(character)
     return True
     # TODO: Implement quest abandonment
 
@@ -0,0 +1,389 @@
+"""
+Test Game Data Loading
+Tests for the streaming, cached and indexed catalog loaders
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_exceptions import *
+import character_manager
+import game_data
+import main
+
+QUEST_TEXT = (
+    "QUEST_ID: first_steps\n"
+    "TITLE: First Steps\n"
+    "DESCRIPTION: Begin your journey.\n"
+    "REWARD_XP: 25\n"
+    "REWARD_GOLD: 10\n"
+    "REQUIRED_LEVEL: 1\n"
+    "PREREQUISITE: NONE\n"
+    "\n"
+    "\n"
+    "QUEST_ID: goblin_hunter\n"
+    "TITLE: Goblin Hunter\n"
+    "DESCRIPTION: Clear out goblins.\n"
+    "REWARD_XP: 150\n"
+    "REWARD_GOLD: 50\n"
+    "REQUIRED_LEVEL: 2\n"
+    "PREREQUISITE: first_steps\n"
+)
+
+ITEM_TEXT = (
+    "ITEM_ID: health_potion\n"
+    "NAME: Health Potion\n"
+    "TYPE: consumable\n"
+    "EFFECT: health:20\n"
+    "COST: 25\n"
+    "DESCRIPTION: Restores 20 HP.\n"
+    "\n"
+    "ITEM_ID: iron_sword\n"
+    "NAME: Iron Sword\n"
+    "TYPE: weapon\n"
+    "EFFECT: strength:5\n"
+    "COST: 100\n"
+    "DESCRIPTION: A sturdy iron blade.\n"
+)
+
+def write_file(path, text):
+    """Write text to a file and return its path as a string"""
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+# ============================================================================
+# STREAMING LOADER TESTS
+# ============================================================================
+
+def test_iter_quests_reports_block_start_lines(tmp_path):
+    """Test that iter_quests yields records with their starting line"""
+    filename = write_file(tmp_path / "quests.txt", QUEST_TEXT)
+
+    records = list(game_data.iter_quests(filename))
+
+    assert [line for line, _ in records] == [1, 10]
+    assert records[1][1]["quest_id"] == "goblin_hunter"
+    assert records[1][1]["reward_xp"] == 150
+
+def test_iter_items_matches_load_items(tmp_path):
+    """Test that load_items is built from the streamed records"""
+    filename = write_file(tmp_path / "items.txt", ITEM_TEXT)
+
+    streamed = {item["item_id"]: item for _, item in game_data.iter_items(filename)}
+
+    assert streamed == game_data.load_items(filename)
+
+def test_iter_quests_error_includes_line_number(tmp_path):
+    """Test that a bad value reports the line it is on"""
+    bad = QUEST_TEXT.replace("REWARD_XP: 150", "REWARD_XP: lots")
+    filename = write_file(tmp_path / "quests.txt", bad)
+
+    with pytest.raises(InvalidDataFormatError, match="Line 13"):
+        game_data.load_quests(filename)
+
+def test_iter_quests_empty_file(tmp_path):
+    """Test that an empty file is reported as corrupted"""
+    filename = write_file(tmp_path / "quests.txt", "\n\n")
+
+    with pytest.raises(CorruptedDataError):
+        list(game_data.iter_quests(filename))
+
+# ============================================================================
+# COMPILED SCHEMA TESTS
+# ============================================================================
+
+def test_compiled_parser_matches_parse_and_validate():
+    """Test that the compiled parser agrees with parse_quest_block"""
+    blocks = [
+        [line for line in block.split("\n") if line]
+        for block in QUEST_TEXT.split("\n\n\n")
+    ]
+    # Same quest with keys out of order and in lower case
+    blocks.append(["prerequisite: none", "quest_id: q", "Title: T",
+                   "DESCRIPTION: D", "REWARD_XP: 1", "REWARD_GOLD:  2",
+                   "REQUIRED_LEVEL: 3"])
+
+    for lines in blocks:
+        expected = game_data.parse_quest_block(lines)
+        game_data.validate_quest_data(expected)
+        assert game_data._parse_quest_record(lines) == expected
+
+def test_compiled_parser_rejects_bad_records():
+    """Test that invalid types and missing fields report their line"""
+    item = [line for line in ITEM_TEXT.split("\n\n")[1].split("\n") if line]
+
+    with pytest.raises(InvalidDataFormatError, match="Line 10: invalid type"):
+        game_data._parse_item_record(
+            [line.replace("weapon", "shield") for line in item], 8
+        )
+
+    with pytest.raises(InvalidDataFormatError, match="missing item field: cost"):
+        game_data._parse_item_record(item[:4] + item[5:], 8)
+
+# ============================================================================
+# RECORD TYPE TESTS
+# ============================================================================
+
+def test_records_read_like_dictionaries(tmp_path):
+    """Test that Quest and Item records work with the game modules"""
+    import quest_handler
+    import inventory_system
+
+    quests = game_data.load_quests(write_file(tmp_path / "q.txt", QUEST_TEXT), as_records=True)
+    items = game_data.load_items(write_file(tmp_path / "i.txt", ITEM_TEXT), as_records=True)
+    char = {'level': 1, 'gold': 100, 'inventory': [],
+            'active_quests': [], 'completed_quests': [], 'experience': 0}
+
+    assert isinstance(quests["first_steps"], game_data.Quest)
+    assert quests["first_steps"] == game_data.load_quests(str(tmp_path / "q.txt"))["first_steps"]
+
+    quest_handler.accept_quest(char, "first_steps", quests)
+    quest_handler.complete_quest(char, "first_steps", quests)
+    inventory_system.purchase_item(char, "health_potion", items["health_potion"])
+
+    assert char['gold'] == 100 + 10 - 25
+    assert items["iron_sword"].get("missing", "default") == "default"
+    with pytest.raises(KeyError):
+        items["iron_sword"]["get"]
+
+def test_records_survive_the_cache(tmp_path):
+    """Test that record catalogs round-trip through the compiled cache"""
+    filename = write_file(tmp_path / "items.txt", ITEM_TEXT)
+    cache_dir = str(tmp_path / ".cache")
+
+    cold = game_data.load_items(filename, cache_dir=cache_dir, as_records=True)
+    warm = game_data.load_items(filename, cache_dir=cache_dir, as_records=True)
+
+    assert isinstance(warm["iron_sword"], game_data.Item)
+    assert warm == cold
+
+# ============================================================================
+# PRE-PARSED EFFECT TESTS
+# ============================================================================
+
+def test_items_carry_parsed_effects(tmp_path, monkeypatch):
+    """Test that equipping uses the effects parsed at load time"""
+    import inventory_system
+
+    text = ITEM_TEXT.replace("EFFECT: strength:5", "EFFECT: strength:5,magic:2")
+    items = game_data.load_items(write_file(tmp_path / "items.txt", text))
+    assert items["iron_sword"]["effects"] == (("strength", 5), ("magic", 2))
+
+    def fail(effect_string):
+        raise AssertionError("effect string parsed again")
+
+    monkeypatch.setattr(game_data, "parse_effects", fail)
+    char = {'inventory': ['iron_sword'], 'strength': 10, 'magic': 10,
+            'item_data': items}
+
+    inventory_system.equip_weapon(char, "iron_sword", items["iron_sword"])
+    assert (char['strength'], char['magic']) == (15, 12)
+
+    inventory_system.unequip_weapon(char)
+    assert (char['strength'], char['magic']) == (10, 10)
+
+def test_bad_effect_is_rejected_at_load(tmp_path):
+    """Test that a malformed effect fails loading with its line number"""
+    text = ITEM_TEXT.replace("EFFECT: strength:5", "EFFECT: strength")
+    filename = write_file(tmp_path / "items.txt", text)
+
+    with pytest.raises(InvalidDataFormatError, match="Line 11"):
+        game_data.load_items(filename)
+
+def test_parsed_effects_are_shared():
+    """Test that repeated effect strings are parsed once and shared"""
+    first = game_data.parse_effects("strength:7,magic:1")
+    assert first == (("strength", 7), ("magic", 1))
+    assert game_data.parse_effects("strength:7,magic:1") is first
+    with pytest.raises(ValueError):
+        game_data.parse_effects("strength")
+
+# ============================================================================
+# COLUMNAR ITEM CATALOG TESTS
+# ============================================================================
+
+def check_item_columns(columns):
+    """Run the shop queries against the repository item catalog"""
+    assert columns.affordable(50) == ["health_potion", "strength_elixir", "wisdom_elixir"]
+    assert columns.sort_by_cost("weapon", descending=True) == ["steel_sword", "fire_staff", "iron_sword"]
+    assert columns.top_k(2, by="effect_value") == ["super_health_potion", "steel_armor"]
+    assert columns.filter(item_type="armor", stat="magic") == ["magic_robe"]
+    assert columns.filter(item_type="shield") == []
+
+def test_item_columns_queries():
+    """Test shop queries with NumPy when it is installed"""
+    check_item_columns(game_data.ItemColumns(game_data.load_items("data/items.txt")))
+
+def test_item_columns_without_numpy(monkeypatch):
+    """Test shop queries with the array module fallback"""
+    monkeypatch.setattr(game_data, "numpy", None)
+    check_item_columns(game_data.ItemColumns(game_data.load_items("data/items.txt")))
+
+def test_item_columns_top_k_keeps_catalog_order_among_ties(monkeypatch):
+    """Test that top_k breaks ties by catalog order with or without NumPy"""
+    items = {
+        f"item_{i}": {"item_id": f"item_{i}", "type": "weapon", "cost": [10, 30, 20][i % 3],
+                      "effects": (("strength", 1),)}
+        for i in range(60)
+    }
+    expected = [f"item_{i}" for i in range(1, 60, 3)] + ["item_2", "item_5", "item_8"]
+    assert game_data.ItemColumns(items).top_k(23) == expected
+
+    monkeypatch.setattr(game_data, "numpy", None)
+    assert game_data.ItemColumns(items).top_k(23) == expected
+
+# ============================================================================
+# CATALOG CACHE TESTS
+# ============================================================================
+
+def test_cache_hit_skips_parsing(tmp_path, monkeypatch):
+    """Test that an unchanged catalog is loaded from the compiled cache"""
+    filename = write_file(tmp_path / "quests.txt", QUEST_TEXT)
+    cache_dir = str(tmp_path / ".cache")
+
+    cold = game_data.load_quests(filename, cache_dir=cache_dir)
+
+    def fail(lines, first_line=1):
+        raise AssertionError("catalog was parsed again")
+
+    monkeypatch.setattr(game_data, "_parse_quest_record", fail)
+    warm = game_data.load_quests(filename, cache_dir=cache_dir)
+
+    assert warm == cold
+
+def test_stale_cache_is_rebuilt(tmp_path):
+    """Test that editing the source file invalidates the cache"""
+    filename = write_file(tmp_path / "items.txt", ITEM_TEXT)
+    cache_dir = str(tmp_path / ".cache")
+
+    game_data.load_items(filename, cache_dir=cache_dir)
+    write_file(tmp_path / "items.txt", ITEM_TEXT.replace("COST: 25", "COST: 30"))
+    items = game_data.load_items(filename, cache_dir=cache_dir)
+
+    assert items["health_potion"]["cost"] == 30
+
+# ============================================================================
+# CATALOG INDEX TESTS
+# ============================================================================
+
+def test_catalog_index_works_with_quest_handler(tmp_path):
+    """Test that CatalogIndex can stand in for the quest dictionary"""
+    import quest_handler
+
+    filename = write_file(tmp_path / "quests.txt", QUEST_TEXT)
+    char = {'level': 5, 'active_quests': [], 'completed_quests': ['first_steps']}
+
+    with game_data.CatalogIndex(filename, "quests", index_dir=None) as quests:
+        assert len(quests) == 2
+        assert "goblin_hunter" in quests
+        quest_handler.accept_quest(char, "goblin_hunter", quests)
+        assert dict(quests) == game_data.load_quests(filename)
+
+    assert char['active_quests'] == ["goblin_hunter"]
+
+def test_catalog_index_matches_loader_on_default_data(tmp_path, monkeypatch):
+    """Test that blocks with several ids are indexed the way they load"""
+    monkeypatch.chdir(tmp_path)
+    game_data.create_default_data_files()
+
+    loaded = game_data.load_quests()
+    with game_data.CatalogIndex("data/quests.txt", "quests", index_dir=None) as quests:
+        assert sorted(quests) == sorted(loaded)
+        assert dict(quests) == loaded
+
+def test_catalog_index_is_persisted(tmp_path, monkeypatch):
+    """Test that a saved index is reused while the file is unchanged"""
+    filename = write_file(tmp_path / "items.txt", ITEM_TEXT)
+    index_dir = str(tmp_path / ".cache")
+
+    game_data.CatalogIndex(filename, "items", index_dir=index_dir).close()
+
+    def fail(self):
+        raise AssertionError("index was rebuilt")
+
+    monkeypatch.setattr(game_data.CatalogIndex, "_build_index", fail)
+    with game_data.CatalogIndex(filename, "items", index_dir=index_dir) as items:
+        assert items["iron_sword"]["cost"] == 100
+
+# ============================================================================
+# LAZY CATALOG TESTS
+# ============================================================================
+
+def test_lazy_catalog_parses_on_first_use(tmp_path):
+    """Test that a lazy catalog waits for the first access to load"""
+    filename = write_file(tmp_path / "quests.txt", QUEST_TEXT)
+
+    quests = game_data.lazy_quests(filename)
+    assert not quests.loaded
+
+    assert len(quests) == 2
+    assert quests.loaded
+    assert quests["first_steps"] == game_data.load_quests(filename)["first_steps"]
+
+def test_lazy_catalog_errors(tmp_path):
+    """Test that lazy catalogs raise the usual data exceptions"""
+    with pytest.raises(MissingDataFileError):
+        game_data.lazy_items(str(tmp_path / "missing.txt"))
+
+    items = game_data.lazy_items(write_file(tmp_path / "items.txt", "not item data"))
+    with pytest.raises(InvalidDataFormatError):
+        "iron_sword" in items
+
+def test_main_reports_bad_data_found_during_play(tmp_path, monkeypatch, capsys):
+    """Test that a catalog error raised on first use still reaches the player"""
+    monkeypatch.chdir(tmp_path)
+    game_data.create_default_data_files()
+    write_file(tmp_path / "data" / "items.txt", "not item data")
+    # New game, then the shop; save, quit and exit if the error is missed
+    answers = iter(["1", "Tester", "Warrior", "5", "6", "3"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+
+    main.main([])
+    assert "Check data files for errors." in capsys.readouterr().out
+    assert os.path.exists(tmp_path / "data" / "save_games" / "Tester_save.txt")
+
+def test_main_zlib_saves_leave_catalogs_lazy(tmp_path, monkeypatch, capsys):
+    """Test that the zlib dictionary waits for the first save to load catalogs"""
+    monkeypatch.setattr(character_manager, "_save_dictionary_builder", None)
+    monkeypatch.chdir(tmp_path)
+    game_data.create_default_data_files()
+    write_file(tmp_path / "data" / "items.txt", "not item data")
+    answers = iter(["3"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+
+    main.main(["--save-format", "zlib"])
+    assert "Thanks for playing" in capsys.readouterr().out
+    assert not main.all_items.loaded
+
+    character = character_manager.create_character("Tester", "Warrior")
+    with pytest.raises(InvalidDataFormatError):
+        character_manager.encode_character(character, character_manager.SAVE_FORMAT_ZLIB)
+
+# ============================================================================
+# SHARDED CATALOG TESTS
+# ============================================================================
+
+def test_quest_shards_merge_in_parallel(tmp_path, monkeypatch):
+    """Test that shards parsed by a process pool are merged into one dict"""
+    blocks = QUEST_TEXT.split("\n\n\n")
+    write_file(tmp_path / "a.txt", blocks[0])
+    write_file(tmp_path / "b.txt", blocks[1])
+    monkeypatch.setattr(game_data, "PARALLEL_MIN_BYTES", 0)
+
+    quests = game_data.load_quest_shards(str(tmp_path), workers=2)
+
+    assert set(quests) == {"first_steps", "goblin_hunter"}
+
+def test_duplicate_ids_across_shards(tmp_path):
+    """Test that the same id in two shards is rejected during the merge"""
+    write_file(tmp_path / "a.txt", ITEM_TEXT)
+    write_file(tmp_path / "b.txt", ITEM_TEXT.split("\n\n")[1])
+
+    with pytest.raises(InvalidDataFormatError, match="iron_sword"):
+        game_data.load_item_shards(str(tmp_path), workers=1)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
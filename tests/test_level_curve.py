@@ -0,0 +1,80 @@
+"""
+Test Level Curve
+Tests for level curves and multi-level experience gains
+"""
+
+import pytest
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import level_curve
+
+# ============================================================================
+# GAIN EXPERIENCE TESTS
+# ============================================================================
+
+def level_up_by_loop(character, xp_amount, xp_to_next):
+    """The original one-level-at-a-time gain_experience"""
+    character["experience"] += xp_amount
+    while character["experience"] >= xp_to_next(character["level"]):
+        character["experience"] -= xp_to_next(character["level"])
+        character["level"] += 1
+        character["max_health"] += 10
+        character["strength"] += 2
+        character["magic"] += 2
+        character["health"] = character["max_health"]
+
+def test_gain_experience_matches_level_loop():
+    """Test that one-step level gains give the stats of leveling one by one"""
+    rng = random.Random(163)
+    for _ in range(500):
+        char = character_manager.create_character("Curve", rng.choice(character_manager.CHARACTER_CLASSES))
+        char["level"] = rng.randint(1, 40)
+        char["experience"] = rng.randint(0, char["level"] * 100 - 1)
+        char["health"] = rng.randint(1, char["max_health"])
+        expected = dict(char)
+        xp = rng.choice([0, 1, 99, 100, 2000, rng.randint(0, 10 ** 6)])
+
+        level_up_by_loop(expected, xp, lambda level: level * 100)
+        start_level = char["level"]
+        assert character_manager.gain_experience(char, xp) == (expected["level"] > start_level)
+        for field in ("level", "experience", "max_health", "strength", "magic", "health"):
+            assert char[field] == expected[field]
+
+def test_class_curves_and_large_grants(monkeypatch):
+    """Test per-class curves and a grant of many levels"""
+    monkeypatch.setattr(level_curve, "_class_curves", {})
+    squares = level_curve.LevelCurve(lambda level: 50 * level * level, initial_levels=4)
+    level_curve.set_class_curve("Mage", squares)
+
+    mage = character_manager.create_character("Curve", "Mage")
+    expected = dict(mage)
+    character_manager.gain_experience(mage, 123456)
+    level_up_by_loop(expected, 123456, lambda level: 50 * level * level)
+    assert (mage["level"], mage["experience"], mage["magic"]) == (
+        expected["level"], expected["experience"], expected["magic"]
+    )
+
+    warrior = character_manager.create_character("Big", "Warrior")
+    assert character_manager.gain_experience(warrior, 10 ** 15)
+    level, remaining = warrior["level"], warrior["experience"]
+    assert level_curve.DEFAULT_LEVEL_CURVE.threshold(level) + remaining == 10 ** 15
+    assert 0 <= remaining < level * 100
+    assert warrior["strength"] == 15 + 2 * (level - 1)
+
+# ============================================================================
+# LEVEL CURVE TESTS
+# ============================================================================
+
+def test_level_for_rejects_negative_experience():
+    """Test that both curve kinds refuse negative totals"""
+    curves = (level_curve.DEFAULT_LEVEL_CURVE, level_curve.LevelCurve(lambda level: 100 * level))
+    for curve in curves:
+        assert curve.level_for(0) == (1, 0)
+        assert curve.level_for(250) == (2, 150)
+        with pytest.raises(ValueError, match="negative"):
+            curve.level_for(-5)
@@ -0,0 +1,1025 @@
+"""
+Test Save System
+Tests for the character save file format and storage
+"""
+
+import pytest
+import shutil
+import sys
+import threading
+import time
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_exceptions import *
+import character_manager
+import main
+
+LEGACY_SAVE = (
+    "NAME: Dick\n"
+    "CLASS: Warrior\n"
+    "LEVEL: 1\n"
+    "HEALTH: 120\n"
+    "MAX_HEALTH: 120\n"
+    "STRENGTH: 15\n"
+    "MAGIC: 5\n"
+    "EXPERIENCE: 50\n"
+    "GOLD: 125\n"
+    "INVENTORY: []\n"
+    "ACTIVE_QUESTS: []\n"
+    "COMPLETED_QUESTS: ['first_steps']\n"
+    "EQUIPPED_WEAPON: None\n"
+    "EQUIPPED_ARMOR: None\n"
+    "ITEM_DATA: {'health_potion': {'item_id': 'health_potion', 'cost': 25}}\n"
+)
+
+def make_hero():
+    """Create a character with some items, quests and equipment"""
+    char = character_manager.create_character("SaveTest", "Warrior")
+    char["inventory"] = ["health_potion", "iron_sword"]
+    char["completed_quests"] = ["first_steps"]
+    char["equipped_armor"] = "leather_armor"
+    char["item_data"] = {"health_potion": {"cost": 25, "type": "consumable"}}
+    return char
+
+# ============================================================================
+# SAVE SCHEMA TESTS
+# ============================================================================
+
+def test_save_leaves_out_catalog_data(tmp_path):
+    """Test that only character-owned fields are written"""
+    char = make_hero()
+    character_manager.save_character(char, str(tmp_path))
+
+    text = (tmp_path / "SaveTest_save.txt").read_text(encoding="utf-8")
+    assert "ITEM_DATA" not in text
+    assert "INVENTORY: health_potion,iron_sword\n" in text
+    assert "EQUIPPED_WEAPON: \n" in text
+
+def test_save_round_trip_keeps_equipment(tmp_path):
+    """Test that saved equipment and lists load back unchanged"""
+    char = make_hero()
+    character_manager.save_character(char, str(tmp_path))
+
+    loaded = character_manager.load_character("SaveTest", str(tmp_path))
+    assert loaded["inventory"] == ["health_potion", "iron_sword"]
+    assert loaded["active_quests"] == []
+    assert loaded["equipped_weapon"] is None
+    assert loaded["equipped_armor"] == "leather_armor"
+    assert "item_data" not in loaded
+
+def test_load_legacy_save_with_item_data(tmp_path):
+    """Test that old saves with an ITEM_DATA line still load"""
+    (tmp_path / "Dick_save.txt").write_text(LEGACY_SAVE, encoding="utf-8")
+
+    loaded = character_manager.load_character("Dick", str(tmp_path))
+    assert loaded["gold"] == 125
+    assert loaded["inventory"] == []
+    assert loaded["completed_quests"] == ["first_steps"]
+    assert loaded["equipped_weapon"] is None
+    assert "item_data" not in loaded
+
+def test_load_missing_field_raises(tmp_path):
+    """Test that a save without a required field is rejected"""
+    (tmp_path / "Broken_save.txt").write_text("NAME: Broken\nCLASS: Mage\n", encoding="utf-8")
+
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.load_character("Broken", str(tmp_path))
+
+# ============================================================================
+# BINARY FORMAT TESTS
+# ============================================================================
+
+def test_binary_save_round_trip(tmp_path):
+    """Test that a binary save loads back with the same character data"""
+    char = make_hero()
+    char["name"] = "Bïnary"
+    character_manager.save_character(char, str(tmp_path), character_manager.SAVE_FORMAT_BINARY)
+
+    data = (tmp_path / "Bïnary_save.txt").read_bytes()
+    assert data.startswith(character_manager.BINARY_SAVE_MAGIC)
+
+    loaded = character_manager.load_character("Bïnary", str(tmp_path))
+    del char["item_data"]
+    char["equipped_weapon"] = None
+    assert loaded == char
+
+def test_binary_and_text_load_the_same(tmp_path):
+    """Test that load_character detects the format of each save"""
+    char = make_hero()
+    text_dir = tmp_path / "text"
+    binary_dir = tmp_path / "binary"
+    character_manager.save_character(char, str(text_dir))
+    character_manager.save_character(char, str(binary_dir), character_manager.SAVE_FORMAT_BINARY)
+
+    assert (character_manager.load_character("SaveTest", str(text_dir)) ==
+            character_manager.load_character("SaveTest", str(binary_dir)))
+
+def test_binary_save_bad_version_or_truncated(tmp_path):
+    """Test that unknown versions and truncated data are rejected"""
+    data = character_manager.serialize_character_binary(make_hero())
+    magic_length = len(character_manager.BINARY_SAVE_MAGIC)
+
+    future = data[:magic_length] + bytes((99,)) + data[magic_length + 1:]
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.deserialize_character_binary(future)
+
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.deserialize_character_binary(data[:-3])
+
+def test_binary_save_rejects_values_it_cannot_hold(tmp_path):
+    """Test that unpackable characters raise InvalidSaveDataError, not struct.error"""
+    for field, value in (("gold", 2 ** 70), ("strength", 2 ** 40), ("level", "5"),
+                         ("inventory", ["x" * 70000])):
+        char = make_hero()
+        char[field] = value
+        with pytest.raises(InvalidSaveDataError):
+            character_manager.serialize_character_binary(char)
+        with pytest.raises(InvalidSaveDataError):
+            character_manager.save_character(char, str(tmp_path), character_manager.SAVE_FORMAT_BINARY)
+
+def test_unknown_save_format_raises(tmp_path):
+    """Test that an unknown format name is rejected"""
+    with pytest.raises(ValueError):
+        character_manager.save_character(make_hero(), str(tmp_path), "yaml")
+
+# ============================================================================
+# DIRTY TRACKING TESTS
+# ============================================================================
+
+def test_autosave_skips_unchanged_character(tmp_path):
+    """Test that autosave only writes when the character changed"""
+    char = make_hero()
+    assert character_manager.is_dirty(char)
+    assert character_manager.autosave_character(char, str(tmp_path)) == True
+    assert not character_manager.is_dirty(char)
+    assert character_manager.autosave_character(char, str(tmp_path)) == False
+
+    character_manager.add_gold(char, 10)
+    assert character_manager.is_dirty(char)
+    assert character_manager.autosave_character(char, str(tmp_path)) == True
+
+def test_loaded_character_is_clean(tmp_path):
+    """Test that a freshly loaded character needs no save"""
+    character_manager.save_character(make_hero(), str(tmp_path))
+    loaded = character_manager.load_character("SaveTest", str(tmp_path))
+    assert not character_manager.is_dirty(loaded)
+
+def test_revisions_stay_out_of_character_data(tmp_path):
+    """Test that change tracking doesn't add keys to a character"""
+    import pickle
+
+    char = make_hero()
+    del char["item_data"]
+    char["equipped_weapon"] = None
+    keys = set(char)
+    character_manager.add_gold(char, 5)
+    character_manager.save_character(char, str(tmp_path))
+    assert set(char) == keys
+    assert "_revision" not in dict(char)
+
+    loaded = character_manager.load_character("SaveTest", str(tmp_path))
+    assert loaded == char
+    copied = pickle.loads(pickle.dumps(char))
+    assert not character_manager.is_dirty(copied)
+    character_manager.mark_dirty(copied)
+    assert character_manager.is_dirty(copied) and not character_manager.is_dirty(char)
+
+def test_module_mutators_mark_dirty():
+    """Test that inventory, quest and combat changes mark the character dirty"""
+    import inventory_system
+    import quest_handler
+    import combat_system
+
+    quests = {"q1": {"required_level": 1, "prerequisite": "NONE",
+                     "reward_xp": 10, "reward_gold": 5}}
+    char = make_hero()
+    character_manager.mark_saved(char)
+
+    actions = [
+        lambda: inventory_system.purchase_item(char, "health_potion", {"cost": 10}),
+        lambda: inventory_system.use_item(char, "health_potion",
+                                          {"type": "consumable", "effect": "health:5"}),
+        lambda: quest_handler.accept_quest(char, "q1", quests),
+        lambda: quest_handler.complete_quest(char, "q1", quests),
+        lambda: combat_system.SimpleBattle(char, combat_system.create_enemy("goblin"))
+                    .apply_damage(char, 1),
+        lambda: combat_system.cleric_heal(char),
+    ]
+    for action in actions:
+        action()
+        assert character_manager.is_dirty(char)
+        character_manager.mark_saved(char)
+
+    # Viewing state changes nothing
+    quest_handler.get_available_quests(char, quests)
+    inventory_system.get_inventory_space_remaining(char)
+    assert not character_manager.is_dirty(char)
+
+# ============================================================================
+# SAVE SERVICE TESTS
+# ============================================================================
+
+def test_save_service_coalesces_queued_saves(tmp_path, monkeypatch):
+    """Test that only the newest queued snapshot of a character is written"""
+    import threading
+    release = threading.Event()
+    started = threading.Event()
+    real_write = character_manager.write_save_file
+
+    def slow_write(filename, contents):
+        started.set()
+        release.wait(5)
+        real_write(filename, contents)
+
+    monkeypatch.setattr(character_manager, "write_save_file", slow_write)
+    service = character_manager.SaveService(str(tmp_path))
+    blocker = character_manager.create_character("Blocker", "Mage")
+    char = make_hero()
+
+    service.submit(blocker)
+    assert started.wait(5)
+    for gold in (1, 2, 3):
+        char["gold"] = gold
+        service.submit(char)
+    assert service.queue_depth() == 1
+
+    release.set()
+    assert service.shutdown(5) == True
+
+    stats = service.stats()
+    assert stats["writes"] == 2
+    assert stats["coalesced"] == 2
+    assert stats["queue_depth"] == 0
+    loaded = character_manager.load_character("SaveTest", str(tmp_path))
+    assert loaded["gold"] == 3
+    assert sorted(os.listdir(tmp_path)) == ["Blocker_save.txt", "SaveTest_save.txt"]
+
+def test_save_service_flush_reports_errors(tmp_path, monkeypatch):
+    """Test that failed background writes surface on flush"""
+    def failing_write(filename, contents):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(character_manager, "write_save_file", failing_write)
+    service = character_manager.SaveService(str(tmp_path))
+    char = make_hero()
+    service.submit(char)
+
+    with pytest.raises(SaveFileCorruptedError):
+        service.flush(5)
+    assert character_manager.is_dirty(char)
+    service.shutdown(5)
+
+def test_save_service_marks_saved_once_written(tmp_path, monkeypatch):
+    """Test that a queued character stays dirty until its save is written"""
+    release = threading.Event()
+    real_write = character_manager.write_save_file
+
+    def slow_write(filename, contents):
+        release.wait(5)
+        real_write(filename, contents)
+
+    monkeypatch.setattr(character_manager, "write_save_file", slow_write)
+    service = character_manager.SaveService(str(tmp_path))
+    char = make_hero()
+    service.submit(char)
+    assert character_manager.is_dirty(char)
+
+    release.set()
+    assert service.flush(5) == True
+    assert not character_manager.is_dirty(char)
+    service.shutdown(5)
+
+def test_save_service_rejects_after_shutdown(tmp_path):
+    """Test that nothing can be queued once the service is shut down"""
+    service = character_manager.SaveService(str(tmp_path))
+    service.shutdown()
+    with pytest.raises(SaveFileCorruptedError):
+        service.submit(make_hero())
+
+def test_new_game_waits_for_queued_saves(tmp_path, monkeypatch):
+    """Test that a queued save of an old character can't overwrite a new one"""
+    real_write = character_manager.write_save_file
+
+    def slow_background_write(filename, contents):
+        if threading.current_thread().name == "save-writer":
+            time.sleep(0.2)
+        real_write(filename, contents)
+
+    monkeypatch.setattr(character_manager, "write_save_file", slow_background_write)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "current_character", None)
+    monkeypatch.setattr(main, "save_service", character_manager.SaveService())
+    main.save_service.submit(character_manager.create_character("Bob", "Warrior"))
+
+    answers = iter(["Bob", "Mage", "6"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    main.new_game()
+    main.save_service.shutdown(5)
+    assert character_manager.load_character("Bob")["class"] == "Mage"
+
+def test_main_resets_save_modes_on_exit(tmp_path, monkeypatch):
+    """Test that a --journal run doesn't leave journaling on for the next run"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("builtins.input", lambda prompt="": "3")
+    main.main(["--journal"])
+    assert main.journal_saver is None
+    assert main.save_service is None
+
+# ============================================================================
+# MANIFEST TESTS
+# ============================================================================
+
+def test_manifest_tracks_saves_and_deletes(tmp_path):
+    """Test that listings come from the manifest and follow saves and deletes"""
+    save_dir = str(tmp_path)
+    character_manager.save_character(make_hero(), save_dir)
+    assert character_manager.list_saved_characters(save_dir) == ["SaveTest"]
+    assert character_manager.is_manifest_current(save_dir)
+
+    mage = character_manager.create_character("Merlin", "Mage")
+    mage["level"] = 7
+    character_manager.save_character(mage, save_dir)
+    assert character_manager.is_manifest_current(save_dir)
+
+    summaries = character_manager.list_saved_character_summaries(save_dir)
+    assert [(s["name"], s["class"], s["level"]) for s in summaries] == [
+        ("Merlin", "Mage", 7), ("SaveTest", "Warrior", 1)
+    ]
+    assert summaries[0]["size"] == os.path.getsize(tmp_path / "Merlin_save.txt")
+
+    character_manager.delete_character("SaveTest", save_dir)
+    assert character_manager.is_manifest_current(save_dir)
+    assert character_manager.list_saved_characters(save_dir) == ["Merlin"]
+
+def test_manifest_rebuilds_when_stale_or_missing(tmp_path):
+    """Test that saves added behind the manifest's back are picked up"""
+    save_dir = str(tmp_path)
+    character_manager.save_character(make_hero(), save_dir)
+    character_manager.list_saved_characters(save_dir)
+
+    # Written without going through save_character
+    other = character_manager.create_character("Outsider", "Rogue")
+    (tmp_path / "Outsider_save.txt").write_text(
+        character_manager.serialize_character(other), encoding="utf-8")
+    os.utime(tmp_path, ns=(0, os.stat(character_manager.get_manifest_path(save_dir)).st_mtime_ns + 1))
+    assert not character_manager.is_manifest_current(save_dir)
+    assert sorted(character_manager.list_saved_characters(save_dir)) == ["Outsider", "SaveTest"]
+
+    os.remove(character_manager.get_manifest_path(save_dir))
+    assert sorted(character_manager.list_saved_characters(save_dir)) == ["Outsider", "SaveTest"]
+
+def test_manifest_ignores_torn_last_line(tmp_path):
+    """Test that a half-written final entry doesn't discard the manifest"""
+    save_dir = str(tmp_path)
+    character_manager.save_character(make_hero(), save_dir)
+    character_manager.list_saved_characters(save_dir)
+
+    with open(character_manager.get_manifest_path(save_dir), "a", encoding="utf-8") as f:
+        f.write("S\tHalf\tMa")
+    summaries = character_manager.get_save_summaries(save_dir)
+    assert list(summaries) == ["SaveTest"]
+
+def test_manifest_survives_concurrent_saves(tmp_path):
+    """Test that saves on several threads don't make each other's manifest stale"""
+    save_dir = str(tmp_path)
+    character_manager.save_character(make_hero(), save_dir)
+    character_manager.list_saved_characters(save_dir)
+
+    def save_many(start):
+        for i in range(start, start + 250):
+            character_manager.save_character(character_manager.create_character(f"t{i}", "Rogue"), save_dir)
+
+    threads = [threading.Thread(target=save_many, args=(i * 250,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert character_manager.is_manifest_current(save_dir)
+    assert len(character_manager.list_saved_characters(save_dir)) == 2001
+
+def test_manifest_summaries_are_copies_and_read_only_safe(tmp_path, monkeypatch):
+    """Test that callers can't change the cache and read-only directories still list"""
+    save_dir = str(tmp_path)
+    character_manager.save_character(make_hero(), save_dir)
+    character_manager.get_save_summaries(save_dir)["SaveTest"]["level"] = 99
+    assert character_manager.get_save_summaries(save_dir)["SaveTest"]["level"] == 1
+
+    def read_only(*args):
+        raise PermissionError("read-only file system")
+
+    monkeypatch.setattr(character_manager, "MANIFEST_COMPACT_SLACK", -1)
+    monkeypatch.setattr(character_manager, "_write_manifest", read_only)
+    character_manager._manifest_cache.clear()
+    assert [s["name"] for s in character_manager.list_saved_character_summaries(save_dir)] == ["SaveTest"]
+
+    monkeypatch.setattr(character_manager, "_get_save_summaries", read_only)
+    assert [s["name"] for s in character_manager.list_saved_character_summaries(save_dir)] == ["SaveTest"]
+
+# ============================================================================
+# SAVE LAYOUT TESTS
+# ============================================================================
+
+def test_sharded_layout_round_trip(tmp_path):
+    """Test saving, listing, loading and deleting in the sharded layout"""
+    save_dir = str(tmp_path)
+    character_manager.set_save_layout(save_dir, character_manager.SAVE_LAYOUT_SHARDED)
+    character_manager.save_character(make_hero(), save_dir)
+
+    path = character_manager.get_save_path("SaveTest", save_dir)
+    assert os.path.exists(path)
+    assert os.path.relpath(path, save_dir).count(os.sep) == 2
+    assert not (tmp_path / "SaveTest_save.txt").exists()
+
+    assert character_manager.list_saved_characters(save_dir) == ["SaveTest"]
+    assert character_manager.load_character("SaveTest", save_dir)["inventory"] == [
+        "health_potion", "iron_sword"]
+    character_manager.delete_character("SaveTest", save_dir)
+    assert not os.path.exists(path)
+
+def test_migrate_layout_both_ways(tmp_path):
+    """Test that migration moves every save and loads work throughout"""
+    save_dir = str(tmp_path)
+    names = [f"hero_{i}" for i in range(20)]
+    for name in names:
+        character_manager.save_character(character_manager.create_character(name, "Rogue"), save_dir)
+
+    # Marker switched but nothing moved yet: old paths are still found
+    character_manager.set_save_layout(save_dir, character_manager.SAVE_LAYOUT_SHARDED)
+    assert character_manager.load_character("hero_3", save_dir)["name"] == "hero_3"
+
+    result = character_manager.run_command(["migrate-layout", "sharded", "--save-dir", save_dir,
+                                            "--workers", "4"])
+    assert result == 0
+    assert not any(fn.endswith("_save.txt") for fn in os.listdir(save_dir))
+    assert sorted(character_manager.list_saved_characters(save_dir)) == sorted(names)
+
+    result = character_manager.migrate_save_layout(save_dir, character_manager.SAVE_LAYOUT_FLAT)
+    assert result["moved"] == 20 and not result["errors"]
+    assert (tmp_path / "hero_3_save.txt").exists()
+    assert character_manager.get_save_layout(save_dir) == character_manager.SAVE_LAYOUT_FLAT
+
+# ============================================================================
+# BATCH TESTS
+# ============================================================================
+
+def test_batch_save_and_load_report_per_name(tmp_path):
+    """Test that batch loads return each character or its error"""
+    save_dir = str(tmp_path)
+    chars = [character_manager.create_character(f"hero_{i}", "Cleric") for i in range(10)]
+    saved = character_manager.save_characters(chars, save_dir, workers=4)
+    assert saved["count"] == 10 and not saved["errors"]
+    assert all(saved["results"].values())
+
+    (tmp_path / "Broken_save.txt").write_text("NAME: Broken\n", encoding="utf-8")
+    names = [c["name"] for c in chars] + ["Missing", "Broken"]
+    loaded = character_manager.load_characters(names, save_dir, workers=4)
+
+    assert sorted(loaded["results"]) == sorted(c["name"] for c in chars)
+    assert loaded["results"]["hero_5"]["class"] == "Cleric"
+    assert isinstance(loaded["errors"]["Missing"], CharacterNotFoundError)
+    assert isinstance(loaded["errors"]["Broken"], InvalidSaveDataError)
+    assert loaded["count"] == 12
+    assert loaded["per_second"] > 0
+
+def test_parallel_batch_save_keeps_manifest_current(tmp_path):
+    """Test that save_characters on many threads doesn't force a rescan"""
+    save_dir = str(tmp_path)
+    character_manager.save_character(make_hero(), save_dir)
+    character_manager.list_saved_characters(save_dir)
+
+    chars = [character_manager.create_character(f"hero_{i}", "Mage") for i in range(2000)]
+    saved = character_manager.save_characters(chars, save_dir, workers=8)
+    assert not saved["errors"]
+    assert character_manager.is_manifest_current(save_dir)
+
+    summaries = character_manager.get_save_summaries(save_dir)
+    assert len(summaries) == 2001 and summaries["hero_1999"]["class"] == "Mage"
+
+# ============================================================================
+# CHARACTER CACHE TESTS
+# ============================================================================
+
+def test_cache_hits_misses_and_lru_eviction(tmp_path):
+    """Test that the least recently used character is evicted first"""
+    save_dir = str(tmp_path)
+    for name in ("A", "B", "C"):
+        character_manager.save_character(character_manager.create_character(name, "Mage"), save_dir)
+
+    cache = character_manager.CharacterCache(save_dir, max_entries=2)
+    a = cache.get("A")
+    assert cache.get("A") is a
+    cache.get("B")
+    cache.get("A")
+    cache.get("C")      # evicts B, the least recently used
+
+    assert "A" in cache and "C" in cache and "B" not in cache
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 3, 1)
+
+    with pytest.raises(CharacterNotFoundError):
+        cache.get("Nobody")
+
+def test_cache_reloads_when_file_changes(tmp_path):
+    """Test that a clean entry is reloaded after its save changes on disk"""
+    save_dir = str(tmp_path)
+    character_manager.save_character(make_hero(), save_dir)
+    cache = character_manager.CharacterCache(save_dir)
+    assert cache.get("SaveTest")["gold"] == 100
+
+    other = character_manager.load_character("SaveTest", save_dir)
+    other["gold"] = 12345
+    character_manager.save_character(other, save_dir)
+
+    assert cache.get("SaveTest")["gold"] == 12345
+    assert cache.stats()["reloads"] == 1
+
+def test_cache_writes_back_dirty_entries(tmp_path):
+    """Test that changed characters are saved on eviction and flush"""
+    save_dir = str(tmp_path)
+    for name in ("A", "B"):
+        character_manager.save_character(character_manager.create_character(name, "Rogue"), save_dir)
+
+    cache = character_manager.CharacterCache(save_dir, max_entries=1)
+    character_manager.add_gold(cache.get("A"), 50)
+    cache.get("B")      # evicts A, which must be written first
+    assert character_manager.load_character("A", save_dir)["gold"] == 150
+
+    character_manager.add_gold(cache.get("B"), 7)
+    assert cache.flush() == 1
+    assert cache.flush() == 0
+    assert character_manager.load_character("B", save_dir)["gold"] == 107
+    assert cache.stats()["write_backs"] == 2
+
+def test_cache_byte_budget(tmp_path):
+    """Test that the cache stays within its estimated byte budget"""
+    save_dir = str(tmp_path)
+    names = [f"hero_{i}" for i in range(10)]
+    for name in names:
+        character_manager.save_character(character_manager.create_character(name, "Warrior"), save_dir)
+
+    one = character_manager.estimate_character_bytes(character_manager.load_character("hero_0", save_dir))
+    cache = character_manager.CharacterCache(save_dir, max_entries=100, max_bytes=one * 3)
+    for name in names:
+        cache.get(name)
+    assert len(cache) <= 3
+    assert cache.stats()["bytes"] <= one * 3
+
+# ============================================================================
+# STORAGE BACKEND TESTS
+# ============================================================================
+
+def test_sqlite_backend_round_trip_and_query(tmp_path):
+    """Test the save functions against the SQLite backend"""
+    backend = character_manager.SqliteSaveBackend(str(tmp_path / "saves.db"))
+    try:
+        for i, cls in enumerate(["Warrior", "Mage", "Rogue", "Cleric"] * 3):
+            char = character_manager.create_character(f"hero_{i:02}", cls)
+            char["level"] = i
+            character_manager.save_character(char, backend=backend)
+        character_manager.save_character(make_hero(), save_format=character_manager.SAVE_FORMAT_BINARY,
+                                         backend=backend)
+
+        loaded = character_manager.load_character("SaveTest", backend=backend)
+        assert loaded["equipped_armor"] == "leather_armor"
+        assert not character_manager.is_dirty(loaded)
+        assert len(character_manager.list_saved_characters(backend=backend)) == 13
+
+        assert backend.query(min_level=10) == ["hero_10", "hero_11"]
+        assert backend.query(min_level=5, character_class="Mage") == ["hero_05", "hero_09"]
+
+        character_manager.delete_character("SaveTest", backend=backend)
+        with pytest.raises(CharacterNotFoundError):
+            character_manager.load_character("SaveTest", backend=backend)
+        with pytest.raises(CharacterNotFoundError):
+            character_manager.delete_character("SaveTest", backend=backend)
+    finally:
+        backend.close()
+
+def test_sqlite_backend_threads_and_default(tmp_path):
+    """Test per-thread connections and routing through set_save_backend"""
+    backend = character_manager.SqliteSaveBackend(str(tmp_path / "saves.db"))
+    character_manager.set_save_backend(backend)
+    try:
+        chars = [character_manager.create_character(f"hero_{i}", "Rogue") for i in range(40)]
+        saved = character_manager.save_characters(chars, workers=4)
+        assert not saved["errors"]
+        loaded = character_manager.load_characters([c["name"] for c in chars], workers=4)
+        assert len(loaded["results"]) == 40
+        assert not os.path.exists("data/save_games/hero_0_save.txt")
+    finally:
+        character_manager.set_save_backend(None)
+        backend.close()
+
+def test_file_backend_query(tmp_path):
+    """Test that the file backend answers queries from the manifest"""
+    backend = character_manager.FileSaveBackend(str(tmp_path))
+    for i in range(5):
+        char = character_manager.create_character(f"hero_{i}", "Warrior")
+        char["gold"] = i * 100
+        character_manager.save_character(char, backend=backend)
+    assert backend.query(min_gold=300) == ["hero_3", "hero_4"]
+
+def test_backend_requires_every_method():
+    """Test that a backend missing a method can't be created"""
+    class PartialBackend(character_manager.SaveBackend):
+        def write(self, character_name, contents, summary):
+            pass
+
+    with pytest.raises(TypeError):
+        PartialBackend()
+
+def test_set_save_backend_reaches_service_and_summaries(tmp_path):
+    """Test that the save service and summaries follow set_save_backend"""
+    backend = character_manager.SqliteSaveBackend(str(tmp_path / "saves.db"))
+    character_manager.set_save_backend(backend)
+    try:
+        service = character_manager.SaveService(str(tmp_path / "files"))
+        service.submit(make_hero())
+        assert service.shutdown(5) == True
+        assert not os.path.exists(tmp_path / "files")
+
+        summaries = character_manager.list_saved_character_summaries(str(tmp_path / "files"))
+        assert summaries == [{"name": "SaveTest", "class": "Warrior", "level": 1, "gold": 100}]
+        assert character_manager.load_character("SaveTest")["gold"] == 100
+
+        with pytest.raises(ValueError):
+            character_manager.CharacterCache(str(tmp_path / "files"))
+    finally:
+        character_manager.set_save_backend(None)
+        backend.close()
+
+def test_sqlite_backend_close_reopens_on_other_threads(tmp_path):
+    """Test that threads whose connection was closed get a new one"""
+    backend = character_manager.SqliteSaveBackend(str(tmp_path / "saves.db"))
+    saved = threading.Event()
+    closed = threading.Event()
+    errors = []
+
+    def worker():
+        try:
+            character_manager.save_character(make_hero(), backend=backend)
+            saved.set()
+            closed.wait(5)
+            assert character_manager.load_character("SaveTest", backend=backend)["gold"] == 100
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    try:
+        assert saved.wait(5)
+        backend.close()
+        closed.set()
+        thread.join(5)
+        assert not errors
+    finally:
+        backend.close()
+
+# ============================================================================
+# JOURNAL TESTS
+# ============================================================================
+
+def test_journal_appends_changed_fields_and_replays(tmp_path):
+    """Test that journal saves append deltas that load_character replays"""
+    save_dir = str(tmp_path)
+    journal = character_manager.JournalSaver(save_dir)
+    char = make_hero()
+    journal.save(char)      # first save writes the full file
+
+    character_manager.add_gold(char, 10)
+    assert journal.save(char) == True
+    char["completed_quests"].append("goblin_hunter")
+    character_manager.mark_dirty(char)
+    journal.save(char)
+    assert journal.save(char) == False
+
+    journal_path = character_manager.get_journal_path("SaveTest", save_dir)
+    assert os.path.getsize(journal_path) < 120
+    assert journal.stats()["appends"] == 2
+
+    for loaded in (character_manager.load_character("SaveTest", save_dir),
+                   character_manager.JournalSaver(save_dir).load("SaveTest")):
+        assert loaded["gold"] == 110
+        assert loaded["completed_quests"] == ["first_steps", "goblin_hunter"]
+    assert character_manager.get_save_summaries(save_dir)["SaveTest"]["gold"] == 110
+
+def test_journal_ignores_torn_last_record(tmp_path):
+    """Test that a record cut short by a crash is dropped on load"""
+    save_dir = str(tmp_path)
+    journal = character_manager.JournalSaver(save_dir)
+    char = make_hero()
+    journal.save(char)
+    character_manager.add_gold(char, 5)
+    journal.save(char)
+
+    journal_path = character_manager.get_journal_path("SaveTest", save_dir)
+    intact = os.path.getsize(journal_path)
+    character_manager.add_gold(char, 5)
+    journal.save(char)
+    with open(journal_path, "r+b") as f:
+        f.truncate(os.path.getsize(journal_path) - 3)
+
+    assert character_manager.load_character("SaveTest", save_dir)["gold"] == 105
+    reloaded = character_manager.JournalSaver(save_dir).load("SaveTest")
+    assert reloaded["gold"] == 105
+    assert os.path.getsize(journal_path) == intact
+
+def test_journal_compacts_and_full_save_supersedes(tmp_path):
+    """Test compaction after max_records and journal removal on full saves"""
+    save_dir = str(tmp_path)
+    journal = character_manager.JournalSaver(save_dir, max_records=3)
+    char = make_hero()
+    journal.save(char)
+    journal_path = character_manager.get_journal_path("SaveTest", save_dir)
+
+    for _ in range(3):
+        character_manager.add_gold(char, 1)
+        journal.save(char)
+    assert not os.path.exists(journal_path)
+    assert journal.stats()["compactions"] == 2
+
+    character_manager.add_gold(char, 1)
+    journal.save(char)
+    assert os.path.exists(journal_path)
+    character_manager.add_gold(char, 1)
+    character_manager.save_character(char, save_dir)
+    assert not os.path.exists(journal_path)
+    assert character_manager.load_character("SaveTest", save_dir)["gold"] == 105
+
+def test_journal_left_over_a_newer_save_is_ignored(tmp_path):
+    """Test that a journal written for an older save file is not replayed"""
+    save_dir = str(tmp_path)
+    journal = character_manager.JournalSaver(save_dir)
+    char = make_hero()
+    journal.save(char)
+    char["inventory"].append("iron_helm")
+    journal.save(char)
+
+    journal_path = character_manager.get_journal_path("SaveTest", save_dir)
+    with open(journal_path, "rb") as f:
+        stale = f.read()
+    # Crash between writing the full save and removing the journal
+    character_manager.save_character(char, save_dir)
+    with open(journal_path, "wb") as f:
+        f.write(stale)
+
+    loaded = character_manager.load_character("SaveTest", save_dir)
+    assert loaded["inventory"] == ["health_potion", "iron_sword", "iron_helm"]
+
+def test_journal_append_keeps_manifest_current(tmp_path):
+    """Test that creating a journal doesn't leave the manifest stale"""
+    save_dir = str(tmp_path)
+    journal = character_manager.JournalSaver(save_dir)
+    char = make_hero()
+    journal.save(char)
+    assert character_manager.list_saved_characters(save_dir) == ["SaveTest"]
+
+    char["inventory"].append("iron_helm")
+    journal.save(char)
+    assert os.path.exists(character_manager.get_journal_path("SaveTest", save_dir))
+    assert character_manager.is_manifest_current(save_dir)
+
+def test_journal_after_full_save_elsewhere(tmp_path):
+    """Test that journaling resumes correctly after another full save"""
+    save_dir = str(tmp_path)
+    journal = character_manager.JournalSaver(save_dir)
+    char = make_hero()
+    journal.save(char)
+    character_manager.add_gold(char, 1)
+    journal.save(char)
+
+    # A full save removes the journal the saver was appending to
+    character_manager.add_gold(char, 1)
+    character_manager.save_character(char, save_dir)
+    character_manager.add_gold(char, 1)
+    journal.save(char)
+    character_manager.add_gold(char, 1)
+    journal.save(char)
+
+    assert character_manager.load_character("SaveTest", save_dir)["gold"] == 104
+    assert character_manager.JournalSaver(save_dir).load("SaveTest")["gold"] == 104
+
+# ============================================================================
+# CHECKSUM AND VERIFY TESTS
+# ============================================================================
+
+def test_checksum_trailer_detects_damage(tmp_path):
+    """Test that saves carry a checksum that load_character checks"""
+    save_dir = str(tmp_path)
+    for save_format in (character_manager.SAVE_FORMAT_TEXT, character_manager.SAVE_FORMAT_BINARY):
+        character_manager.save_character(make_hero(), save_dir, save_format)
+        path = character_manager.find_save_path("SaveTest", save_dir)
+        with open(path, "rb") as f:
+            contents = f.read()
+        assert contents.startswith(b"CHECKSUM: ", len(contents) - 19)
+        assert character_manager.load_character("SaveTest", save_dir)["gold"] == 100
+
+        with open(path, "wb") as f:
+            f.write(contents.replace(b"Warrior", b"Wizardy"))
+        with pytest.raises(SaveFileCorruptedError):
+            character_manager.load_character("SaveTest", save_dir)
+
+def test_verify_reports_and_quarantines(tmp_path):
+    """Test that verify sorts saves by problem and moves bad ones aside"""
+    save_dir = str(tmp_path / "saves")
+    quarantine = str(tmp_path / "quarantine")
+    for name in ["Good", "Cut", "CutBinary", "Flipped", "Junk"]:
+        char = character_manager.create_character(name, "Mage")
+        save_format = character_manager.SAVE_FORMAT_BINARY if name == "CutBinary" else character_manager.SAVE_FORMAT_TEXT
+        character_manager.save_character(char, save_dir, save_format)
+    with open(os.path.join(save_dir, "Legacy_save.txt"), "w", encoding="utf-8") as f:
+        f.write(LEGACY_SAVE.replace("Dick", "Legacy"))
+
+    def damage(name, change):
+        path = character_manager.find_save_path(name, save_dir)
+        with open(path, "rb") as f:
+            contents = f.read()
+        with open(path, "wb") as f:
+            f.write(change(contents))
+
+    damage("Cut", lambda contents: contents[:-40])
+    damage("CutBinary", lambda contents: contents[:-25])
+    damage("Flipped", lambda contents: contents.replace(b"Mage", b"Magi"))
+    damage("Junk", lambda contents: b"not a save\n")
+
+    result = character_manager.verify_saves(save_dir, workers=1, quarantine_directory=quarantine)
+    assert result["checked"] == 6
+    assert {name: status for name, (status, _) in result["problems"].items()} == {
+        "Cut": "truncated", "CutBinary": "truncated", "Flipped": "corrupt", "Junk": "unparseable"
+    }
+    assert result["counts"]["ok"] == 1 and result["counts"]["unchecked"] == 1
+    assert sorted(os.listdir(quarantine)) == [
+        "CutBinary_save.txt", "Cut_save.txt", "Flipped_save.txt", "Junk_save.txt"
+    ]
+    assert sorted(character_manager.list_saved_characters(save_dir)) == ["Good", "Legacy"]
+
+def test_verify_reports_data_after_the_trailer():
+    """Test that bytes appended to a complete save aren't called truncation"""
+    for save_format in (character_manager.SAVE_FORMAT_TEXT, character_manager.SAVE_FORMAT_BINARY):
+        contents = character_manager.encode_character(make_hero(), save_format)
+        status, reason = character_manager.verify_save_contents(contents + b"junk")
+        assert status == character_manager.VERIFY_CORRUPT
+        assert reason == "4 bytes of unexpected data after the checksum trailer."
+
+# ============================================================================
+# LEGACY MIGRATION TESTS
+# ============================================================================
+
+MANGLED_SAVE = LEGACY_SAVE.replace(
+    "INVENTORY: []", "INVENTORY: [\"['health_potion'\", \" 'iron_sword']\"]"
+).replace("EQUIPPED_WEAPON: None\nEQUIPPED_ARMOR: None\n", "")
+
+def test_parse_legacy_save_repairs_split_lists():
+    """Test that lists split apart by old loaders are put back together"""
+    char = character_manager.parse_legacy_save(MANGLED_SAVE.encode("utf-8"))
+    assert char["inventory"] == ["health_potion", "iron_sword"]
+    assert char["completed_quests"] == ["first_steps"]
+    assert char["equipped_weapon"] is None
+
+def test_migrate_saves_dry_run_rewrite_and_resume(tmp_path):
+    """Test dry runs, rewriting legacy saves and skipping finished ones"""
+    save_dir = str(tmp_path)
+    for name in ["Alpha", "Beta", "Gamma"]:
+        with open(os.path.join(save_dir, f"{name}_save.txt"), "w", encoding="utf-8") as f:
+            f.write(MANGLED_SAVE.replace("Dick", name))
+    with open(os.path.join(save_dir, "Broken_save.txt"), "w", encoding="utf-8") as f:
+        f.write("NAME: Broken\n")
+    character_manager.save_character(make_hero(), save_dir)
+    alpha_path = os.path.join(save_dir, "Alpha_save.txt")
+    with open(alpha_path, "rb") as f:
+        legacy = f.read()
+
+    result = character_manager.migrate_saves(save_dir, workers=1, dry_run=True)
+    assert (result["migrated"], result["current"]) == (3, 1)
+    assert list(result["errors"]) == ["Broken"]
+    with open(alpha_path, "rb") as f:
+        assert f.read() == legacy
+
+    # An earlier run got as far as Alpha
+    with open(character_manager.get_migrate_progress_path(save_dir), "w", encoding="utf-8") as f:
+        f.write("Alpha\nBe")
+    result = character_manager.migrate_saves(save_dir, workers=1)
+    assert (result["skipped"], result["migrated"], result["current"]) == (1, 2, 1)
+    with open(alpha_path, "rb") as f:
+        assert f.read() == legacy
+
+    beta = character_manager.load_character("Beta", save_dir)
+    assert beta["inventory"] == ["health_potion", "iron_sword"]
+    with open(os.path.join(save_dir, "Beta_save.txt"), "rb") as f:
+        assert character_manager.split_checksum(f.read())[1]
+
+    # Broken still fails, so the progress file stays for the next run
+    assert os.path.exists(character_manager.get_migrate_progress_path(save_dir))
+
+# ============================================================================
+# COMPRESSED SAVE TESTS
+# ============================================================================
+
+def test_compressed_saves_round_trip(tmp_path, monkeypatch):
+    """Test zlib with a preset dictionary and lzma saves, picked per backend"""
+    monkeypatch.setattr(character_manager, "_save_dictionaries", {0: (None, None, None)})
+    monkeypatch.setattr(character_manager, "_save_dictionary_id", 0)
+    save_dir = str(tmp_path / "saves")
+    hero = make_hero()
+
+    text_size = len(character_manager.encode_character(hero))
+    plain_zlib = character_manager.encode_character(hero, character_manager.SAVE_FORMAT_ZLIB)
+    dictionary = character_manager.build_save_dictionary(
+        ["health_potion", "iron_sword", "leather_armor"], ["first_steps"]
+    )
+    character_manager.register_save_dictionary(dictionary)
+    primed_zlib = character_manager.encode_character(hero, character_manager.SAVE_FORMAT_ZLIB)
+    assert len(primed_zlib) < len(plain_zlib) < text_size
+
+    for save_format in (character_manager.SAVE_FORMAT_ZLIB, character_manager.SAVE_FORMAT_LZMA):
+        backend = character_manager.FileSaveBackend(save_dir, save_format)
+        character_manager.save_character(make_hero(), backend=backend)
+        with open(character_manager.find_save_path("SaveTest", save_dir), "rb") as f:
+            assert f.read().startswith(character_manager.COMPRESSED_SAVE_MAGIC)
+
+        loaded = character_manager.load_character("SaveTest", save_dir)
+        assert loaded["inventory"] == ["health_potion", "iron_sword"]
+        assert loaded["equipped_armor"] == "leather_armor"
+
+    # A later session reads the dictionary back from the save directory,
+    # and keeping it there doesn't upset the manifest
+    shutil.rmtree(os.path.join(save_dir, "dictionaries"))
+    assert character_manager.list_saved_characters(save_dir) == ["SaveTest"]
+    character_manager.save_character(make_hero(), save_dir, character_manager.SAVE_FORMAT_ZLIB)
+    assert character_manager.is_manifest_current(save_dir)
+    monkeypatch.setattr(character_manager, "_save_dictionaries", {0: (None, None, None)})
+    assert character_manager.load_character("SaveTest", save_dir)["gold"] == 100
+    assert character_manager.verify_saves(save_dir, workers=1)["counts"] == {"ok": 1}
+
+    monkeypatch.setattr(character_manager, "_save_dictionaries", {0: (None, None, None)})
+    os.rename(os.path.join(save_dir, "dictionaries"), str(tmp_path / "moved"))
+    with pytest.raises(SaveFileCorruptedError):
+        character_manager.load_character("SaveTest", save_dir)
+
+def test_sqlite_backend_keeps_dictionaries(tmp_path, monkeypatch):
+    """Test that zlib saves in SQLite find their dictionary in the database"""
+    monkeypatch.setattr(character_manager, "_save_dictionaries", {0: (None, None, None)})
+    monkeypatch.setattr(character_manager, "_save_dictionary_id", 0)
+    built = []
+
+    def build():
+        built.append(True)
+        return character_manager.build_save_dictionary(["health_potion", "iron_sword"])
+
+    # Built on the first zlib save, not when registered
+    assert character_manager.register_save_dictionary(build) is None
+    assert not built
+    backend = character_manager.SqliteSaveBackend(str(tmp_path / "saves.db"),
+                                                  character_manager.SAVE_FORMAT_ZLIB)
+    try:
+        character_manager.save_characters([make_hero()], backend=backend)
+        assert built == [True]
+        monkeypatch.setattr(character_manager, "_save_dictionaries", {0: (None, None, None)})
+        assert character_manager.load_character("SaveTest", backend=backend)["gold"] == 100
+        assert not os.path.exists(tmp_path / "dictionaries")
+    finally:
+        backend.close()
+
+# ============================================================================
+# CHARACTER RECORD TESTS
+# ============================================================================
+
+def test_character_reads_and_writes_like_a_dictionary():
+    """Test the dictionary shims of the slotted Character"""
+    char = character_manager.create_character("Slots", "Rogue")
+    assert isinstance(char, character_manager.Character)
+    assert not hasattr(char, "__dict__")
+
+    assert "equipped_weapon" not in char
+    assert char.get("equipped_weapon") is None
+    with pytest.raises(KeyError):
+        char["equipped_weapon"]
+    assert char.setdefault("equipped_weapon", "dagger") == "dagger"
+    assert char.setdefault("equipped_weapon", "axe") == "dagger"
+
+    char["gold"] += 5
+    char["item_data"] = {"dagger": {}}
+    char["nickname"] = "Shade"
+    assert char["gold"] == 105 and char.extra == {"nickname": "Shade"}
+    del char["nickname"]
+    assert "nickname" not in char
+
+    expected = dict(character_manager.create_character("Slots", "Rogue"),
+                    gold=105, equipped_weapon="dagger", item_data={"dagger": {}})
+    assert char == expected and dict(char) == expected
+    assert len(char) == len(expected)
+
+    other = character_manager.create_character("Other", "".join(["Ro", "gue"]))
+    assert other["class"] is char["class"]
+
+def test_loaded_characters_are_records(tmp_path):
+    """Test that both save formats load into Character objects"""
+    for save_format in (character_manager.SAVE_FORMAT_TEXT, character_manager.SAVE_FORMAT_BINARY):
+        character_manager.save_character(make_hero(), str(tmp_path), save_format)
+        loaded = character_manager.load_character("SaveTest", str(tmp_path))
+        assert isinstance(loaded, character_manager.Character)
+        assert loaded["equipped_armor"] == "leather_armor"
+        assert not character_manager.is_dirty(loaded)